@@ -2,26 +2,43 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from .database import RoutingSession
 
-db=SQLAlchemy()
+db=SQLAlchemy(session_options={'class_': RoutingSession})
 migrate=Migrate()
 jwt=JWTManager()
 
-def create_app():
+def create_app(env=None, overrides=None):
+    """
+    `env` picks the config class (default: FLASK_ENV, else development);
+    `overrides` are applied on top of it before any extension is set up,
+    so they also reach the database engines.
+    """
     app = Flask(__name__)
     
     # Load configuration
     from .config import config
     import os
-    env = os.environ.get('FLASK_ENV', 'development')
+    env = env or os.environ.get('FLASK_ENV', 'development')
     app.config.from_object(config[env])
+    app.config.update(overrides or {})
 
     # 1. Initialize the Extensions with  app
 
+    from . import database
+    database.configure(app)
     db.init_app(app)
+    database.init_app(app)
     migrate.init_app(app,db)
     jwt.init_app(app)
 
+    from . import cache, metrics
+    cache.init_app(app)
+    metrics.init_app(app)
+
+    from .scheduler.jobs import generation_jobs
+    generation_jobs.init_app(app)
+
     from .routes.auth import auth_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     from .routes.resources import resources_bp
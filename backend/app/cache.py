@@ -0,0 +1,168 @@
+"""
+In-process cache of reference data: rooms, courses and teachers.
+
+Entries live in a bounded LRU keyed by what they were built from plus the
+versions of every table they read. Writing to one of those tables bumps its
+version, so older entries are never looked up again and simply age out.
+
+Each table has two versions. The stored one, a row of `reference_versions`,
+is bumped in the writing transaction by an `after_flush` listener for any
+ORM change and by `bump_reference_versions()` for Core-level bulk writes
+that bypass the ORM; every lookup reads it, so writes committed by other
+processes are seen at once. The local one is bumped by the resource handlers
+after they commit, by the same listener, and again when the transaction
+commits or rolls back, so an entry built from uncommitted data is never
+served once that data is rolled back.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from . import db
+from .models import (Course, Department, ReferenceVersion, Room, Teacher, teacher_departments,
+                     teacher_qualifications)
+
+DEFAULT_MAXSIZE = 256
+
+TRACKED_TABLES = frozenset({
+    Room.__table__.name, Course.__table__.name, Teacher.__table__.name, Department.__table__.name,
+    teacher_qualifications.name, teacher_departments.name,
+})
+
+
+class ReferenceCache:
+    """
+    `stored_versions(tables)`, if given, returns the shared versions of
+    `tables`, which become part of every key.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, stored_versions=None):
+        self.maxsize = maxsize
+        self.stored_versions = stored_versions
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._versions = dict.fromkeys(TRACKED_TABLES, 0)
+        self._lock = threading.Lock()
+
+    def get(self, name, tables, load, *args):
+        """
+        Cached `load()` for `name`/`args`, valid while none of `tables`
+        has changed since it was built.
+        """
+        stored = self.stored_versions(tables) if self.stored_versions is not None and tables else ()
+        with self._lock:
+            key = (name, args, tuple(self._versions[t] for t in tables), stored)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = load()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables:
+                if table in self._versions:
+                    self._versions[table] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "maxsize": self.maxsize,
+                "versions": dict(self._versions),
+            }
+
+
+def reference_cache():
+    """The current app's ReferenceCache."""
+    return current_app.extensions['reference_cache']
+
+
+def stored_versions(tables):
+    """Versions of `tables` in `reference_versions`, in order; a missing row reads as 0."""
+    versions = dict(db.session.execute(
+        db.select(ReferenceVersion.table_name, ReferenceVersion.version)
+        .where(ReferenceVersion.table_name.in_(tables))
+    ).tuples().all())
+    return tuple(versions.get(t, 0) for t in tables)
+
+
+def bump_reference_versions(tables, session=None):
+    """
+    Mark `tables` as written for every process. Call inside the writing
+    transaction; ORM flushes do this on their own.
+    """
+    (session or db.session).execute(
+        update(ReferenceVersion)
+        .where(ReferenceVersion.table_name.in_(sorted(tables)))
+        .values(version=ReferenceVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@event.listens_for(ReferenceVersion.__table__, 'after_create')
+def _seed_versions(table, connection, **kw):
+    connection.execute(table.insert(), [{'table_name': name, 'version': 0} for name in sorted(TRACKED_TABLES)])
+
+
+def init_app(app):
+    app.extensions['reference_cache'] = ReferenceCache(app.config.get('REFERENCE_CACHE_SIZE', DEFAULT_MAXSIZE),
+                                                       stored_versions)
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_commit', _after_transaction)
+        event.listen(Session, 'after_rollback', _after_transaction)
+
+
+def _flushed_tables(session):
+    tables = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, '__table__', None)
+        if table is not None and table.name in TRACKED_TABLES:
+            tables.add(table.name)
+    return tables
+
+
+def _app_cache():
+    if has_app_context():
+        return current_app.extensions.get('reference_cache')
+    return None
+
+
+def _after_flush(session, flush_context):
+    tables = _flushed_tables(session)
+    if not tables:
+        return
+    # Teacher dirty may mean a changed qualification or department link
+    if Teacher.__table__.name in tables:
+        tables |= {teacher_qualifications.name, teacher_departments.name}
+    bump_reference_versions(tables, session)
+    session.info.setdefault('reference_tables', set()).update(tables)
+    cache = _app_cache()
+    if cache is not None:
+        cache.invalidate(*tables)
+
+
+def _after_transaction(session):
+    tables = session.info.pop('reference_tables', None)
+    cache = _app_cache()
+    if tables and cache is not None:
+        cache.invalidate(*tables)
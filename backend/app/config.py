@@ -4,6 +4,36 @@ class Config:
     """Base Configuration."""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-affair'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Rows per executemany batch when writing a generated timetable
+    TIMETABLE_WRITE_CHUNK_SIZE = int(os.environ.get('TIMETABLE_WRITE_CHUNK_SIZE', 1000))
+    # Background threads running generation jobs (0 = run inline in the request)
+    GENERATION_WORKERS = int(os.environ.get('GENERATION_WORKERS', 2))
+    # A running job whose lease is not renewed for this long is taken to be orphaned
+    GENERATION_LEASE_SECONDS = int(os.environ.get('GENERATION_LEASE_SECONDS', 60))
+    # Processes for campus-wide generation (unset = one per CPU core)
+    CAMPUS_GENERATION_PROCESSES = int(os.environ.get('CAMPUS_GENERATION_PROCESSES', 0)) or None
+    # Entries kept by the in-process reference-data cache (rooms, courses, teachers)
+    REFERENCE_CACHE_SIZE = int(os.environ.get('REFERENCE_CACHE_SIZE', 256))
+    # Per-endpoint request and SQL metrics at /api/metrics (0 installs no hooks)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+    # Statements at least this slow are listed by normalized SQL
+    SLOW_QUERY_SECONDS = float(os.environ.get('SLOW_QUERY_SECONDS', 0.1))
+    # Set on every new SQLite connection; busy_timeout is in milliseconds
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+    }
+    # Connection pool of a server database (ignored for SQLite)
+    DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 5))
+    DATABASE_MAX_OVERFLOW = int(os.environ.get('DATABASE_MAX_OVERFLOW', 10))
+    DATABASE_POOL_RECYCLE = int(os.environ.get('DATABASE_POOL_RECYCLE', 1800))
+    DATABASE_POOL_TIMEOUT = int(os.environ.get('DATABASE_POOL_TIMEOUT', 30))
+    DATABASE_POOL_PRE_PING = os.environ.get('DATABASE_POOL_PRE_PING', '1') != '0'
+    # Engine for read-only GET endpoints, e.g. a replica (unset = the SQLite file opened read-only)
+    READONLY_DATABASE_URI = os.environ.get('READONLY_DATABASE_URL')
 
 class DevelopmentConfig(Config):
     """Development Configuration."""
@@ -15,6 +45,7 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    GENERATION_WORKERS = 0
 
 class ProductionConfig(Config):
     """Production Configuration."""
@@ -0,0 +1,141 @@
+"""
+Engine setup driven by configuration.
+
+SQLite connections get the pragmas in SQLITE_PRAGMAS on connect: WAL
+journaling lets readers proceed while a generation holds the write lock,
+synchronous=NORMAL is durable under WAL except across power loss, and
+busy_timeout makes a writer wait for the lock instead of failing at once.
+Server databases get a sized connection pool (DATABASE_POOL_*).
+
+GET endpoints that never write are marked with `read_only`; their
+statements go to a separate read-only engine: READONLY_DATABASE_URL if set
+(e.g. a replica), otherwise the same SQLite file opened with mode=ro. An
+in-memory SQLite database or a server database without a replica URL has
+no read-only engine and everything runs on the primary.
+"""
+import functools
+
+from flask import current_app, g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative sizes are in KiB
+    'cache_size': -64 * 1024,
+}
+
+# Pragmas that only a writable connection to a file database may set
+_WRITE_PRAGMAS = ('journal_mode', 'synchronous')
+
+
+def _is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def _is_memory(url):
+    database = make_url(url).database
+    return not database or database == ':memory:' or 'mode=memory' in database
+
+
+def engine_options(config, url=None):
+    """SQLALCHEMY_ENGINE_OPTIONS for `url` (default: the configured database URI)."""
+    url = url or config['SQLALCHEMY_DATABASE_URI']
+    if _is_sqlite(url):
+        pragmas = config.get('SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+        if _is_memory(url) or 'busy_timeout' not in pragmas:
+            return {}
+        # pysqlite waits this long for a lock before raising "database is locked"
+        return {'connect_args': {'timeout': pragmas['busy_timeout'] / 1000}}
+    return {
+        'pool_size': config.get('DATABASE_POOL_SIZE', 5),
+        'max_overflow': config.get('DATABASE_MAX_OVERFLOW', 10),
+        'pool_recycle': config.get('DATABASE_POOL_RECYCLE', 1800),
+        'pool_timeout': config.get('DATABASE_POOL_TIMEOUT', 30),
+        'pool_pre_ping': config.get('DATABASE_POOL_PRE_PING', True),
+    }
+
+
+def apply_sqlite_pragmas(engine, pragmas, read_only=False):
+    """Run `PRAGMA name=value` for each pragma on every new connection of `engine`."""
+    if _is_memory(engine.url):
+        pragmas = {name: value for name, value in pragmas.items() if name not in _WRITE_PRAGMAS + ('mmap_size',)}
+    if read_only:
+        pragmas = {name: value for name, value in pragmas.items() if name not in _WRITE_PRAGMAS}
+        pragmas['query_only'] = 'ON'
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def readonly_url(primary_url, config):
+    """URL of the read-only engine, or None when reads stay on the primary."""
+    if config.get('READONLY_DATABASE_URI'):
+        return make_url(config['READONLY_DATABASE_URI'])
+    if not _is_sqlite(primary_url) or _is_memory(primary_url):
+        return None
+    primary_url = make_url(primary_url)
+    return primary_url.set(database=f'file:{primary_url.database}', query={'mode': 'ro', 'uri': 'true'})
+
+
+def readonly_engine():
+    """The current app's read-only engine, or None."""
+    return current_app.extensions.get('readonly_engine')
+
+
+class RoutingSession(Session):
+    """`db.session` class: inside a `read_only` view, statements go to the read-only engine."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context() and g.get('read_only'):
+            engine = current_app.extensions.get('readonly_engine')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Mark a view that never writes; its queries may be served by the read-only engine."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def configure(app):
+    """Engine options from the config; call before `db.init_app`."""
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+
+def init_app(app):
+    from . import db
+
+    pragmas = app.config.get('SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+    with app.app_context():
+        primary = db.engine
+    if primary.dialect.name == 'sqlite':
+        apply_sqlite_pragmas(primary, pragmas)
+
+    url = readonly_url(primary.url, app.config)
+    if url is not None:
+        engine = create_engine(url, **engine_options(app.config, url))
+        if engine.dialect.name == 'sqlite':
+            apply_sqlite_pragmas(engine, pragmas, read_only=True)
+        app.extensions['readonly_engine'] = engine
+
+    @app.teardown_request
+    def clear_read_only(exc):
+        g.pop('read_only', None)
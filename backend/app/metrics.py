@@ -0,0 +1,205 @@
+"""
+Per-endpoint request and SQL metrics, served at /api/metrics in the
+Prometheus text format.
+
+Cursor events on the app's engines (primary and read-only) count
+statements and time spent in the database; request hooks attribute them to
+the matched URL rule and record the request latency in a histogram. Statements slower than
+SLOW_QUERY_SECONDS are kept by normalized SQL (bound-parameter lists
+collapsed), up to METRICS_MAX_SLOW_STATEMENTS of them. With METRICS_ENABLED
+off none of the hooks are installed.
+
+Statements issued outside a request (background jobs) only reach the
+totals and the slow-statement table. A streamed response runs its queries
+after the request has been recorded, so they are not attributed to it.
+"""
+import re
+import threading
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from . import db
+from .database import readonly_engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SLOW_QUERY_SECONDS = 0.1
+DEFAULT_MAX_SLOW_STATEMENTS = 100
+
+_PARAMETER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_VALUES_LIST = re.compile(r'(VALUES \(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r'\s+')
+
+
+def normalize_sql(statement):
+    """Statement text with literals replaced and parameter lists collapsed, for grouping."""
+    statement = _SPACE.sub(' ', statement).strip()
+    statement = _LITERAL.sub('?', statement)
+    statement = _PARAMETER_LIST.sub('(...)', statement)
+    return _VALUES_LIST.sub(r'\1', statement)
+
+
+class _Endpoint:
+
+    def __init__(self):
+        self.requests = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_count = 0
+        self.latency_sum = 0.0
+
+
+class Metrics:
+
+    def __init__(self, slow_seconds=DEFAULT_SLOW_QUERY_SECONDS, max_slow=DEFAULT_MAX_SLOW_STATEMENTS):
+        self.slow_seconds = slow_seconds
+        self.max_slow = max_slow
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.endpoints = {}
+        # normalized SQL -> [count, total seconds, max seconds]
+        self.slow = {}
+        self._lock = threading.Lock()
+
+    def record_statement(self, statement, seconds):
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            if seconds < self.slow_seconds:
+                return
+            key = normalize_sql(statement)
+            entry = self.slow.get(key)
+            if entry is None:
+                if len(self.slow) >= self.max_slow:
+                    # Make room by dropping the statement with the lowest max
+                    fastest = min(self.slow, key=lambda k: self.slow[k][2])
+                    if self.slow[fastest][2] >= seconds:
+                        return
+                    del self.slow[fastest]
+                entry = self.slow[key] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def record_request(self, endpoint, method, status, seconds, queries, db_seconds):
+        with self._lock:
+            stats = self.endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self.endpoints[(endpoint, method)] = _Endpoint()
+            stats.requests[status] = stats.requests.get(status, 0) + 1
+            stats.queries += queries
+            stats.db_seconds += db_seconds
+            stats.latency_count += 1
+            stats.latency_sum += seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            family('http_requests_total', 'counter', 'Requests by endpoint, method and status.')
+            for (endpoint, method), stats in endpoints:
+                for status, count in sorted(stats.requests.items()):
+                    labels = _labels(endpoint=endpoint, method=method, status=status)
+                    lines.append(f'http_requests_total{labels} {count}')
+            family('http_request_duration_seconds', 'histogram', 'Request latency by endpoint and method.')
+            for (endpoint, method), stats in endpoints:
+                for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                    lines.append(f'http_request_duration_seconds_bucket'
+                                 f'{_labels(endpoint=endpoint, method=method, le=bound)} {count}')
+                lines.append(f'http_request_duration_seconds_bucket'
+                             f'{_labels(endpoint=endpoint, method=method, le="+Inf")} {stats.latency_count}')
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(f'http_request_duration_seconds_sum{labels} {stats.latency_sum:.6f}')
+                lines.append(f'http_request_duration_seconds_count{labels} {stats.latency_count}')
+            family('http_request_db_queries_total', 'counter', 'SQL statements issued by requests.')
+            for (endpoint, method), stats in endpoints:
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(f'http_request_db_queries_total{labels} {stats.queries}')
+            family('http_request_db_seconds_total', 'counter', 'Time requests spent executing SQL.')
+            for (endpoint, method), stats in endpoints:
+                lines.append(f'http_request_db_seconds_total{_labels(endpoint=endpoint, method=method)} '
+                             f'{stats.db_seconds:.6f}')
+            family('db_queries_total', 'counter', 'SQL statements issued by the process.')
+            lines.append(f'db_queries_total {self.queries}')
+            family('db_seconds_total', 'counter', 'Time the process spent executing SQL.')
+            lines.append(f'db_seconds_total {self.db_seconds:.6f}')
+            slow = sorted(self.slow.items(), key=lambda item: -item[1][2])
+            family('db_slow_statements_total', 'counter', 'Executions of statements slower than the threshold.')
+            for statement, (count, _, _) in slow:
+                lines.append(f'db_slow_statements_total{_labels(statement=statement)} {count}')
+            family('db_slow_statement_seconds_total', 'counter', 'Time spent in those executions.')
+            for statement, (_, total, _) in slow:
+                lines.append(f'db_slow_statement_seconds_total{_labels(statement=statement)} {total:.6f}')
+            family('db_slow_statement_seconds_max', 'gauge', 'Slowest execution of each slow statement.')
+            for statement, (_, _, longest) in slow:
+                lines.append(f'db_slow_statement_seconds_max{_labels(statement=statement)} {longest:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def init_app(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    metrics = app.extensions['metrics'] = Metrics(
+        app.config.get('SLOW_QUERY_SECONDS', DEFAULT_SLOW_QUERY_SECONDS),
+        app.config.get('METRICS_MAX_SLOW_STATEMENTS', DEFAULT_MAX_SLOW_STATEMENTS),
+    )
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info['metrics_started'].pop()
+        metrics.record_statement(statement, seconds)
+        if has_request_context() and 'metrics_queries' in g:
+            g.metrics_queries += 1
+            g.metrics_db_seconds += seconds
+
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get('metrics_started'):
+            context.connection.info['metrics_started'].pop()
+
+    with app.app_context():
+        for engine in filter(None, (db.engine, readonly_engine())):
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+            event.listen(engine, 'handle_error', handle_error)
+
+    @app.before_request
+    def start_request():
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_seconds = 0.0
+
+    @app.after_request
+    def finish_request(response):
+        if 'metrics_started' in g:
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            metrics.record_request(endpoint, request.method, response.status_code,
+                                   time.perf_counter() - g.metrics_started, g.metrics_queries, g.metrics_db_seconds)
+        return response
+
+    def render_metrics():
+        return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/api/metrics', 'metrics', render_metrics)
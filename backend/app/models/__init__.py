@@ -1,4 +1,5 @@
 from .user import User
+from .time_grid import TimeGrid
 from .department import Department
 from .teacher import Teacher, teacher_departments, teacher_qualifications
 from .room import Room
@@ -7,4 +8,6 @@ from .program import Program
 from .batch import Batch
 from .section import Section
 from .workload import Workload
-from .timetable import TimetableEntry
+from .timetable import TimetableEntry, TimetableProjection
+from .job import GenerationJob
+from .reference_version import ReferenceVersion
@@ -5,6 +5,10 @@ class Department(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     code = db.Column(db.String(10), unique=True, nullable=False)
+    # Optional grid variant; departments without one use the default grid
+    time_grid_id = db.Column(db.Integer, db.ForeignKey('time_grids.id'), nullable=True)
+    # Bumped in the same transaction as every change to the department's timetable
+    timetable_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     courses = db.relationship('Course', backref='department', lazy=True)
     programs = db.relationship('Program', backref='department', lazy=True)
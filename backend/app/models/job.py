@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from .. import db
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class GenerationJob(db.Model):
+    __tablename__ = 'generation_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # None for campus-wide jobs, which list their departments in params
+    department_id = db.Column(db.Integer, db.ForeignKey('department.id'), nullable=True)
+    state = db.Column(db.String(20), nullable=False, default='queued', index=True) # queued, running, succeeded, failed
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    params = db.Column(db.JSON, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=_now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Run that holds a running job, and until when; the holder renews it while it works
+    lease_owner = db.Column(db.String(64), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<GenerationJob {self.id} {self.state}>'
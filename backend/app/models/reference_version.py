@@ -0,0 +1,13 @@
+from .. import db
+
+
+class ReferenceVersion(db.Model):
+    """Write counter of one reference table, shared by every process on the database."""
+    __tablename__ = 'reference_versions'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    # Bumped in the same transaction as every write to the table
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<ReferenceVersion {self.table_name} {self.version}>'
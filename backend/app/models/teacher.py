@@ -1,5 +1,20 @@
 from .. import db
 
+
+class Bitmask(db.TypeDecorator):
+    """Non-negative integer of any width, stored as little-endian bytes."""
+    impl = db.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return value.to_bytes(max(1, (value.bit_length() + 7) // 8), 'little')
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else int.from_bytes(value, 'little')
+
+
 # Association table for Many-to-Many relationship between Teacher and Department
 teacher_departments = db.Table('teacher_departments',
     db.Column('teacher_id', db.Integer, db.ForeignKey('teacher.id'), primary_key=True),
@@ -16,7 +31,10 @@ class Teacher(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    # {day: [slot, ...]} in the labels of the teacher's grid, as normalized on write
     availability = db.Column(db.JSON, nullable=True)
+    # The same cells as a bitmask (see scheduler/availability.py); NULL = always available
+    availability_mask = db.Column(Bitmask, nullable=True)
     
     # Many-to-Many relationship with Department (Administrative)
     departments = db.relationship('Department', secondary=teacher_departments, 
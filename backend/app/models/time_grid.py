@@ -0,0 +1,29 @@
+from .. import db
+
+
+class TimeGrid(db.Model):
+    """
+    Weekly time grid: teaching days and the ordered periods of each day.
+    Timetable entries and availability refer to positions in `days` and in
+    `slots` (the periods that are not breaks) by small integer index.
+    Department variants keep the default grid's days and slots, so an index
+    names the same cell for every department; only breaks may differ.
+    """
+    __tablename__ = 'time_grids'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False) # e.g., "Main Campus", "Evening College"
+    days = db.Column(db.JSON, nullable=False) # ["Monday", "Tuesday", ...]
+    periods = db.Column(db.JSON, nullable=False) # ["09:00-10:00", ..., "12:00-01:00", ...]
+    breaks = db.Column(db.JSON, nullable=False, default=list) # periods nobody is scheduled in
+    is_default = db.Column(db.Boolean, nullable=False, default=False)
+
+    departments = db.relationship('Department', backref='time_grid', lazy=True)
+
+    @property
+    def slots(self):
+        breaks = set(self.breaks or [])
+        return [p for p in self.periods if p not in breaks]
+
+    def __repr__(self):
+        return f'<TimeGrid {self.name}>'
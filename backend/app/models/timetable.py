@@ -2,16 +2,40 @@ from .. import db
 
 class TimetableEntry(db.Model):
     __tablename__ = 'timetable_entries'
+    # A teacher, room or section can hold at most one entry per (day, timeslot).
+    # The unique indexes double as the lookup path for conflict checks.
+    __table_args__ = (
+        db.UniqueConstraint('day_index', 'slot_index', 'room_id', name='uq_timetable_entries_room_slot'),
+        db.UniqueConstraint('day_index', 'slot_index', 'teacher_id', name='uq_timetable_entries_teacher_slot'),
+        db.UniqueConstraint('day_index', 'slot_index', 'section_id', name='uq_timetable_entries_section_slot'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    day = db.Column(db.String(10), nullable=False)
-    timeslot = db.Column(db.String(20), nullable=False)
+    # Positions in the department's TimeGrid (days / non-break slots)
+    day_index = db.Column(db.SmallInteger, nullable=False)
+    slot_index = db.Column(db.SmallInteger, nullable=False)
     
     section_id = db.Column(db.Integer, db.ForeignKey('sections.id'), nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
     teacher_id = db.Column(db.Integer, db.ForeignKey('teacher.id'), nullable=False)
     room_id = db.Column(db.Integer, db.ForeignKey('room.id'), nullable=False)
-    department_id = db.Column(db.Integer, db.ForeignKey('department.id'), nullable=False)
+    department_id = db.Column(db.Integer, db.ForeignKey('department.id'), nullable=False, index=True)
 
     def __repr__(self):
-        return f'<TimetableEntry {self.day} {self.timeslot}>'
+        return f'<TimetableEntry {self.day_index}:{self.slot_index}>'
+
+
+class TimetableProjection(db.Model):
+    """
+    Materialized weekly timetable of one teacher, room or section, kept
+    current by the timetable writers (see scheduler/projections.py).
+    """
+    __tablename__ = 'timetable_projections'
+
+    kind = db.Column(db.String(10), primary_key=True) # teacher, room or section
+    owner_id = db.Column(db.Integer, primary_key=True)
+    entry_count = db.Column(db.Integer, nullable=False, default=0)
+    body = db.Column(db.Text, nullable=False) # serialized JSON, served as is
+
+    def __repr__(self):
+        return f'<TimetableProjection {self.kind}:{self.owner_id}>'
@@ -0,0 +1,324 @@
+"""
+Bulk imports: many rows per request, as a JSON array or a CSV upload.
+
+Rows are validated set-wise before anything is written: each row's fields
+are parsed first, then unique columns are checked against the rest of the
+upload and against the database, and foreign keys against the referenced
+table, with one `IN` query per column (per IN_CHUNK values). Valid rows are
+inserted with executemany INSERTs in transactions of CHUNK_SIZE rows;
+invalid rows are skipped and reported as per-row errors, numbered from 0 in
+upload order.
+
+The INSERTs go through Core and so bypass the session's flush events; each
+import invalidates the reference cache for the tables it wrote.
+"""
+import csv
+import io
+import json
+
+from flask import jsonify, request
+
+from .. import db
+from ..cache import bump_reference_versions, reference_cache
+from ..models import Course, Department, Room, Section, Teacher, Workload, teacher_departments, teacher_qualifications
+from ..scheduler.availability import AvailabilityError, normalize, teacher_grids
+
+CSV = 'text/csv'
+# Rows per INSERT transaction
+CHUNK_SIZE = 5000
+# Values per IN query, below SQLite's bound-parameter limit
+IN_CHUNK = 5000
+# Row errors returned in one response; `error_count` has the full number
+MAX_ERRORS = 1000
+
+REQUIRED = object()
+
+
+class UploadError(ValueError):
+    """The upload as a whole could not be read."""
+
+
+def text(max_length):
+    def parse(value):
+        value = str(value).strip()
+        if not value:
+            raise ValueError("must not be empty")
+        if len(value) > max_length:
+            raise ValueError(f"must be at most {max_length} characters")
+        return value
+    return parse
+
+
+def integer(minimum):
+    def parse(value):
+        if isinstance(value, bool):
+            raise ValueError("must be an integer")
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError("must be an integer")
+        if value < minimum:
+            raise ValueError(f"must be at least {minimum}")
+        return value
+    return parse
+
+
+def choice(*options):
+    def parse(value):
+        if value not in options:
+            raise ValueError(f"must be one of {list(options)}")
+        return value
+    return parse
+
+
+def id_list(value):
+    """A list of ids; in CSV, ids separated by ';'."""
+    if isinstance(value, str):
+        value = [part for part in value.split(';') if part.strip()]
+    if not isinstance(value, list):
+        raise ValueError("must be a list of ids")
+    return [integer(1)(v) for v in value]
+
+
+def json_value(value):
+    """Any JSON value; in CSV, its JSON text."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            raise ValueError("must be valid JSON")
+    return value
+
+
+class Field:
+
+    def __init__(self, name, parse, default=REQUIRED, column=True):
+        self.name = name
+        self.parse = parse
+        self.default = default
+        # False for fields stored elsewhere than the model's own table
+        self.column = column
+
+
+class Importer:
+    """
+    How to validate and insert one kind of row. `unique` names fields that
+    must be unique on the model, `references` maps fields to the model their
+    ids must exist in, `check(rows, errors)` adds set-wise checks of its own
+    (and fills in the `derived` columns) and `links(ids, rows)` returns
+    (table, rows) to insert once the new primary keys are known.
+    """
+
+    def __init__(self, model, fields, unique=(), references=None, check=None, links=None, tables=(), derived=()):
+        self.model = model
+        # Models and plain association tables alike
+        self.table = getattr(model, '__table__', model)
+        self.fields = fields
+        self.unique = unique
+        self.references = references or {}
+        self.check = check
+        self.links = links
+        self.tables = tables or (self.table.name,)
+        self.columns = [f.name for f in fields if f.column] + list(derived)
+
+    def parse(self, raw):
+        if not isinstance(raw, dict):
+            return None, ["row must be an object"]
+        row, problems = {}, []
+        for field in self.fields:
+            value = raw.get(field.name)
+            if value is None or value == '':
+                if field.default is REQUIRED:
+                    problems.append(f"{field.name} is required")
+                else:
+                    row[field.name] = field.default
+                continue
+            try:
+                row[field.name] = field.parse(value)
+            except ValueError as e:
+                problems.append(f"{field.name} {e}")
+        return row, problems
+
+
+def existing(column, values):
+    """The subset of `values` present in `column`, one IN query per IN_CHUNK values."""
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), IN_CHUNK):
+        found.update(db.session.scalars(db.select(column).where(column.in_(values[start:start + IN_CHUNK]))))
+    return found
+
+
+def read_rows():
+    """Rows of the request: a JSON array, a CSV body or a CSV file upload."""
+    upload = request.files.get('file')
+    if upload is not None:
+        return list(csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig')))
+    if request.mimetype == CSV:
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('rows')
+    if not isinstance(data, list):
+        raise UploadError("Expected a JSON array of rows (or {\"rows\": [...]}) or a CSV upload")
+    return data
+
+
+def run_import(importer, raw_rows):
+    """Validate and insert `raw_rows`; returns the response payload."""
+    errors = {}
+    rows = {}
+    for index, raw in enumerate(raw_rows):
+        row, problems = importer.parse(raw)
+        if problems:
+            errors[index] = problems
+        else:
+            rows[index] = row
+
+    for name in importer.unique:
+        column = importer.table.c[name]
+        seen = {}
+        for index, row in rows.items():
+            if row[name] in seen:
+                errors.setdefault(index, []).append(f"{name} {row[name]!r} repeats row {seen[row[name]]}")
+            else:
+                seen[row[name]] = index
+        for value in existing(column, seen):
+            errors.setdefault(seen[value], []).append(f"{name} {value!r} already exists")
+
+    for name, model in importer.references.items():
+        wanted = set()
+        for row in rows.values():
+            value = row[name]
+            wanted.update(value if isinstance(value, list) else [value])
+        found = existing(model.id, wanted)
+        for index, row in rows.items():
+            value = row[name]
+            missing = [v for v in (value if isinstance(value, list) else [value]) if v not in found]
+            if missing:
+                errors.setdefault(index, []).append(f"{name} not found: {missing}")
+
+    if importer.check is not None:
+        importer.check({i: r for i, r in rows.items() if i not in errors}, errors)
+
+    valid = [row for index, row in rows.items() if index not in errors]
+    table = importer.table
+    for start in range(0, len(valid), CHUNK_SIZE):
+        chunk = valid[start:start + CHUNK_SIZE]
+        params = [{name: row[name] for name in importer.columns} for row in chunk]
+        if importer.links is None:
+            db.session.execute(table.insert(), params)
+        else:
+            ids = db.session.scalars(table.insert().returning(table.c.id, sort_by_parameter_order=True), params).all()
+            for link_table, link_rows in importer.links(ids, chunk):
+                if link_rows:
+                    db.session.execute(link_table.insert(), link_rows)
+        bump_reference_versions(importer.tables)
+        db.session.commit()
+    if valid:
+        reference_cache().invalidate(*importer.tables)
+
+    reported = sorted(errors.items())[:MAX_ERRORS]
+    return {
+        "received": len(raw_rows),
+        "inserted": len(valid),
+        "error_count": len(errors),
+        "errors": [{"row": index, "errors": problems} for index, problems in reported]
+    }
+
+
+def import_response(importer):
+    try:
+        raw_rows = read_rows()
+    except (UploadError, csv.Error, UnicodeDecodeError) as e:
+        return jsonify({'error': str(e)}), 400
+    result = run_import(importer, raw_rows)
+    return jsonify(result), 201 if result["inserted"] else 400
+
+
+# --- Importers ---
+
+def _teacher_links(ids, rows):
+    return [(teacher_departments, [
+        {'teacher_id': teacher_id, 'department_id': dept_id}
+        for teacher_id, row in zip(ids, rows) for dept_id in dict.fromkeys(row['department_ids'])
+    ])]
+
+
+def _check_teachers(rows, errors):
+    """Normalize availability on the grid of each teacher's first department."""
+    grids = teacher_grids(row['department_ids'][0] for row in rows.values() if row['department_ids'])
+    for index, row in rows.items():
+        grid = grids[row['department_ids'][0] if row['department_ids'] else None]
+        try:
+            row['availability'], row['availability_mask'] = normalize(row['availability'], grid)
+        except AvailabilityError as e:
+            errors.setdefault(index, []).append(str(e))
+
+
+def _known_qualifications(rows):
+    """(teacher_id, course_id) pairs already recorded for the teachers in `rows`."""
+    teacher_ids = list({row['teacher_id'] for row in rows})
+    pairs = set()
+    for start in range(0, len(teacher_ids), IN_CHUNK):
+        pairs.update(db.session.execute(
+            db.select(teacher_qualifications.c.teacher_id, teacher_qualifications.c.course_id)
+            .where(teacher_qualifications.c.teacher_id.in_(teacher_ids[start:start + IN_CHUNK]))
+        ).tuples())
+    return pairs
+
+
+def _check_qualifications(rows, errors):
+    known = _known_qualifications(rows.values())
+    seen = {}
+    for index, row in rows.items():
+        pair = (row['teacher_id'], row['course_id'])
+        if pair in known:
+            errors.setdefault(index, []).append("teacher is already qualified for this course")
+        elif pair in seen:
+            errors.setdefault(index, []).append(f"repeats row {seen[pair]}")
+        else:
+            seen[pair] = index
+
+
+def _check_workloads(rows, errors):
+    qualified = _known_qualifications(rows.values())
+    for index, row in rows.items():
+        if (row['teacher_id'], row['course_id']) not in qualified:
+            errors.setdefault(index, []).append(
+                f"teacher {row['teacher_id']} is not qualified to teach course {row['course_id']}")
+
+
+teachers = Importer(Teacher, [
+    Field('name', text(100)),
+    Field('email', text(120)),
+    Field('availability', json_value, default=None),
+    Field('department_ids', id_list, default=[], column=False),
+], unique=('email',), references={'department_ids': Department}, check=_check_teachers, links=_teacher_links,
+    tables=('teacher', 'teacher_departments'), derived=('availability_mask',))
+
+courses = Importer(Course, [
+    Field('name', text(100)),
+    Field('code', text(20)),
+    Field('credits', integer(0), default=3),
+    Field('course_type', choice('Theory', 'Lab'), default='Theory'),
+    Field('department_id', integer(1)),
+], unique=('code',), references={'department_id': Department})
+
+rooms = Importer(Room, [
+    Field('name', text(50)),
+    Field('capacity', integer(1)),
+    Field('room_type', text(20), default='Classroom'),
+], unique=('name',))
+
+qualifications = Importer(teacher_qualifications, [
+    Field('teacher_id', integer(1)),
+    Field('course_id', integer(1)),
+], references={'teacher_id': Teacher, 'course_id': Course}, check=_check_qualifications)
+
+workloads = Importer(Workload, [
+    Field('teacher_id', integer(1)),
+    Field('course_id', integer(1)),
+    Field('section_id', integer(1)),
+    Field('hours_per_week', integer(1), default=4),
+], references={'teacher_id': Teacher, 'course_id': Course, 'section_id': Section}, check=_check_workloads)
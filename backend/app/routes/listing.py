@@ -0,0 +1,100 @@
+"""
+Shared GET-listing behaviour: keyset pagination and NDJSON streaming.
+
+`?limit=N&after=ID` returns up to N rows with a primary key above ID; when a
+page is full the JSON response carries the cursor of the next page in
+`X-Next-After`. With `Accept: application/x-ndjson` rows are streamed one
+JSON object per line from a server-side cursor, so memory stays flat and the
+first row goes out before the last one is read. A plain full listing of
+reference data can be served from the reference cache with cached_listing().
+"""
+import json
+
+from flask import Response, jsonify, request, stream_with_context
+
+from .. import db
+from ..cache import reference_cache
+
+NDJSON = 'application/x-ndjson'
+MAX_LIMIT = 10000
+# Rows fetched from the database cursor per round trip while streaming
+YIELD_PER = 500
+
+
+class ListingError(ValueError):
+    pass
+
+
+def _int_arg(name, minimum):
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ListingError(f"{name} must be an integer")
+    if value < minimum:
+        raise ListingError(f"{name} must be at least {minimum}")
+    return value
+
+
+def page_args():
+    """(limit, after) from the query string; both None when absent."""
+    limit = _int_arg('limit', 1)
+    if limit is not None:
+        limit = min(limit, MAX_LIMIT)
+    return limit, _int_arg('after', 0)
+
+
+def wants_ndjson():
+    return request.accept_mimetypes.best_match(['application/json', NDJSON]) == NDJSON
+
+
+def wants_listing():
+    """Whether the request asks for a page or a stream rather than the plain full list."""
+    return 'limit' in request.args or 'after' in request.args or wants_ndjson()
+
+
+def listing(statement, key, serialize, scalars=True):
+    """
+    Respond with the rows of `statement` ordered by `key` (an integer
+    primary key column), paginated and/or streamed as the request asks.
+    `serialize` turns one row (an entity if `scalars`, else a Row) into a
+    dict that includes the key as "id".
+    """
+    try:
+        limit, after = page_args()
+    except ListingError as e:
+        return jsonify({'error': str(e)}), 400
+    if after is not None:
+        statement = statement.where(key > after)
+    statement = statement.order_by(key)
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    if wants_ndjson():
+        def rows():
+            result = db.session.execute(statement.execution_options(yield_per=YIELD_PER))
+            for row in (result.scalars() if scalars else result):
+                yield json.dumps(serialize(row)) + '\n'
+        return Response(stream_with_context(rows()), mimetype=NDJSON)
+
+    result = db.session.execute(statement)
+    items = [serialize(row) for row in (result.scalars() if scalars else result)]
+    response = jsonify(items)
+    if limit is not None and len(items) == limit:
+        response.headers['X-Next-After'] = str(items[-1]['id'])
+    return response
+
+
+def cached_listing(name, tables, statement, key, serialize, *args):
+    """
+    listing(), except that the plain full list is kept in the reference
+    cache under `name`/`args` until one of `tables` is written.
+    """
+    if wants_listing():
+        return listing(statement, key, serialize)
+
+    def load():
+        return json.dumps([serialize(obj) for obj in db.session.scalars(statement.order_by(key))])
+    return Response(reference_cache().get(name, tables, load, *args), mimetype='application/json')
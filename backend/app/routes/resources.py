@@ -1,34 +1,105 @@
 from flask import Blueprint, request, jsonify
-from ..models import Department, Program, Batch, Section, Teacher, Course, Room
+from ..models import (Department, Program, Batch, Section, Teacher, Course, Room, TimeGrid, TimetableEntry,
+                      teacher_departments)
 from .. import db
+from ..cache import reference_cache
+from ..scheduler.availability import SLOT_STRIDE, AvailabilityError, set_availability
+from ..scheduler.grid import GridMismatchError, check_compatible, grid_spec, load_grid
+from ..scheduler.persistence import bump_timetable_version
+from ..scheduler.projections import drop_projections, entry_owners, refresh_projections
+from . import bulk, serializers
+from ..database import read_only
+from .listing import cached_listing, listing
 
 resources_bp = Blueprint('resources', __name__)
 
 # --- Department Routes ---
 @resources_bp.route('/departments', methods=['GET'])
+@read_only
 def get_departments():
-    departments = Department.query.all()
-    return jsonify([{'id': d.id, 'name': d.name, 'code': d.code} for d in departments])
+    return listing(serializers.departments.select(), Department.id, serializers.departments)
 
 @resources_bp.route('/departments', methods=['POST'])
 def add_department():
     data = request.json
     if not data or 'name' not in data or 'code' not in data:
         return jsonify({'error': 'Missing name or code'}), 400
-    new_dept = Department(name=data['name'], code=data['code'])
+    if data.get('time_grid_id') is not None:
+        grid = db.session.get(TimeGrid, data['time_grid_id'])
+        if not grid:
+            return jsonify({'error': 'Time grid not found'}), 404
+        try:
+            check_compatible(grid_spec(grid), load_grid())
+        except GridMismatchError as e:
+            return jsonify({'error': str(e)}), 400
+    new_dept = Department(name=data['name'], code=data['code'], time_grid_id=data.get('time_grid_id'))
     db.session.add(new_dept)
     db.session.commit()
+    reference_cache().invalidate('department')
     return jsonify({'message': 'Department added!'}), 201
 
+# --- Time Grid Routes (days and periods a department schedules on) ---
+@resources_bp.route('/time-grids', methods=['GET'])
+@read_only
+def get_time_grids():
+    return listing(serializers.time_grids.select(), TimeGrid.id, serializers.time_grids)
+
+def _is_labels(value):
+    """True for a list of unique non-empty strings."""
+    return (isinstance(value, list) and all(isinstance(v, str) and v for v in value)
+            and len(set(value)) == len(value))
+
+@resources_bp.route('/time-grids', methods=['POST'])
+def add_time_grid():
+    data = request.json
+    if not isinstance(data, dict) or not data.get('name') or not data.get('days') or not data.get('periods'):
+        return jsonify({'error': 'Missing name, days or periods'}), 400
+    breaks = data.get('breaks', [])
+    for field, value in (('days', data['days']), ('periods', data['periods']), ('breaks', breaks)):
+        if not _is_labels(value):
+            return jsonify({'error': f'{field} must be a list of unique, non-empty strings'}), 400
+    if not set(breaks) <= set(data['periods']):
+        return jsonify({'error': 'Breaks must be listed in periods'}), 400
+    if len([p for p in data['periods'] if p not in breaks]) > SLOT_STRIDE:
+        return jsonify({'error': f'At most {SLOT_STRIDE} teachable periods per day'}), 400
+    new_grid = TimeGrid(name=data['name'], days=data['days'], periods=data['periods'],
+                        breaks=breaks, is_default=bool(data.get('is_default')))
+    if new_grid.is_default:
+        # Department variants must keep matching the default grid
+        in_use = db.session.scalars(
+            db.select(TimeGrid).where(TimeGrid.id.in_(db.select(Department.time_grid_id)))
+        ).all()
+        try:
+            for grid in in_use:
+                check_compatible(grid_spec(grid), grid_spec(new_grid))
+        except GridMismatchError as e:
+            return jsonify({'error': str(e)}), 400
+        # Stored entries and availability masks are positions on the current default grid
+        if db.session.scalar(db.select(
+                db.select(TimetableEntry.id).exists() | db.select(Teacher.id).where(
+                    Teacher.availability_mask.isnot(None)).exists())):
+            try:
+                check_compatible(grid_spec(new_grid), load_grid())
+            except GridMismatchError as e:
+                return jsonify({'error': f'{e}; timetables or teacher availability refer to its cells'}), 400
+        TimeGrid.query.update({TimeGrid.is_default: False})
+        # Departments without their own grid switch to the new labels
+        bump_timetable_version(db.select(Department.id).where(Department.time_grid_id.is_(None)))
+        # Projections carry day and timeslot labels; they are rebuilt as they are read
+        drop_projections()
+    db.session.add(new_grid)
+    db.session.commit()
+    return jsonify({'message': 'Time grid added!', 'id': new_grid.id}), 201
+
 # --- Program Routes (BCA, MCA etc) ---
 @resources_bp.route('/programs', methods=['GET'])
+@read_only
 def get_programs():
     dept_id = request.args.get('department_id')
-    query = Program.query
+    query = serializers.programs.select()
     if dept_id:
         query = query.filter_by(department_id=dept_id)
-    programs = query.all()
-    return jsonify([{'id': p.id, 'name': p.name, 'code': p.code, 'department_id': p.department_id} for p in programs])
+    return listing(query, Program.id, serializers.programs)
 
 @resources_bp.route('/programs', methods=['POST'])
 def add_program():
@@ -40,13 +111,13 @@ def add_program():
 
 # --- Batch Routes (2023-26 etc) ---
 @resources_bp.route('/batches', methods=['GET'])
+@read_only
 def get_batches():
     prog_id = request.args.get('program_id')
-    query = Batch.query
+    query = serializers.batches.select()
     if prog_id:
         query = query.filter_by(program_id=prog_id)
-    batches = query.all()
-    return jsonify([{'id': b.id, 'name': b.name, 'academic_year': b.academic_year} for b in batches])
+    return listing(query, Batch.id, serializers.batches)
 
 @resources_bp.route('/batches', methods=['POST'])
 def add_batch():
@@ -58,13 +129,13 @@ def add_batch():
 
 # --- Section Routes (A, B etc) ---
 @resources_bp.route('/sections', methods=['GET'])
+@read_only
 def get_sections():
     batch_id = request.args.get('batch_id')
-    query = Section.query
+    query = serializers.sections.select()
     if batch_id:
         query = query.filter_by(batch_id=batch_id)
-    sections = query.all()
-    return jsonify([{'id': s.id, 'name': s.name, 'batch_id': s.batch_id} for s in sections])
+    return listing(query, Section.id, serializers.sections)
 
 @resources_bp.route('/sections', methods=['POST'])
 def add_section():
@@ -76,32 +147,24 @@ def add_section():
 
 # --- Teacher Routes ---
 @resources_bp.route('/teachers', methods=['GET'])
+@read_only
 def get_teachers():
     dept_id = request.args.get('department_id')
+    query = serializers.teachers.select()
     if dept_id:
-        # Get teachers associated with this department via many-to-many
-        dept = db.session.get(Department, dept_id)
-        if not dept:
+        # Teachers associated with this department via many-to-many
+        if db.session.get(Department, dept_id) is None:
             return jsonify({'error': 'Department not found'}), 404
-        teachers = dept.teachers.all()
-    else:
-        teachers = Teacher.query.all()
-    
-    return jsonify([{
-        'id': t.id, 
-        'name': t.name, 
-        'email': t.email,
-        'departments': [d.name for d in t.departments],
-        'qualifications': [c.name for c in t.qualified_courses]
-    } for t in teachers])
+        query = query.join(teacher_departments).where(teacher_departments.c.department_id == dept_id)
+    return cached_listing('teachers', ('teacher', 'department', 'teacher_departments', 'teacher_qualifications',
+                                       'course'), query, Teacher.id, serializers.teachers, dept_id)
 
 @resources_bp.route('/teachers', methods=['POST'])
 def add_teacher():
     data = request.json
     new_teacher = Teacher(
         name=data['name'], 
-        email=data['email'],
-        availability=data.get('availability')
+        email=data['email']
     )
     
     # Handle departmental associations
@@ -111,10 +174,39 @@ def add_teacher():
             if dept:
                 new_teacher.departments.append(dept)
 
+    # Availability is read on the grid of the teacher's first department
+    try:
+        set_availability(new_teacher, data.get('availability'))
+    except AvailabilityError as e:
+        return jsonify({'error': str(e)}), 400
+
     db.session.add(new_teacher)
     db.session.commit()
+    reference_cache().invalidate('teacher', 'teacher_departments')
     return jsonify({'message': 'Teacher added!', 'id': new_teacher.id}), 201
 
+@resources_bp.route('/teachers/<int:teacher_id>/availability', methods=['PUT'])
+def update_availability(teacher_id):
+    """Replace a teacher's availability ({day: [slot, ...]}, or null for always available)."""
+    data = request.json
+    if not isinstance(data, dict) or 'availability' not in data:
+        return jsonify({'error': 'Missing availability'}), 400
+    teacher = db.session.get(Teacher, teacher_id)
+    if not teacher:
+        return jsonify({'error': 'Teacher not found'}), 404
+    try:
+        set_availability(teacher, data['availability'])
+    except AvailabilityError as e:
+        return jsonify({'error': str(e)}), 400
+    db.session.commit()
+    reference_cache().invalidate('teacher')
+    return jsonify({'id': teacher.id, 'availability': teacher.availability})
+
+@resources_bp.route('/teachers/bulk', methods=['POST'])
+def import_teachers():
+    """Many teachers at once (JSON array or CSV); see routes/bulk.py."""
+    return bulk.import_response(bulk.teachers)
+
 @resources_bp.route('/teachers/<int:teacher_id>/qualifications', methods=['POST'])
 def assign_expertise(teacher_id):
     """Link a teacher to a course they are qualified to teach."""
@@ -129,24 +221,24 @@ def assign_expertise(teacher_id):
     if course not in teacher.qualified_courses:
         teacher.qualified_courses.append(course)
         db.session.commit()
+        reference_cache().invalidate('teacher_qualifications')
     
     return jsonify({'message': f'Teacher {teacher.name} qualified for {course.name}'})
 
+@resources_bp.route('/qualifications/bulk', methods=['POST'])
+def import_qualifications():
+    """Many (teacher_id, course_id) qualifications at once."""
+    return bulk.import_response(bulk.qualifications)
+
 # --- Course Routes ---
 @resources_bp.route('/courses', methods=['GET'])
+@read_only
 def get_courses():
     dept_id = request.args.get('department_id')
-    query = Course.query
+    query = serializers.courses.select()
     if dept_id:
         query = query.filter_by(department_id=dept_id)
-    courses = query.all()
-    return jsonify([{
-        'id': c.id, 
-        'name': c.name, 
-        'code': c.code, 
-        'credits': c.credits,
-        'department_id': c.department_id
-    } for c in courses])
+    return cached_listing('courses', ('course',), query, Course.id, serializers.courses, dept_id)
 
 @resources_bp.route('/courses', methods=['POST'])
 def add_course():
@@ -159,18 +251,18 @@ def add_course():
     )
     db.session.add(new_course)
     db.session.commit()
+    reference_cache().invalidate('course')
     return jsonify({'message': 'Course added!', 'id': new_course.id}), 201
 
+@resources_bp.route('/courses/bulk', methods=['POST'])
+def import_courses():
+    return bulk.import_response(bulk.courses)
+
 # --- Room Routes ---
 @resources_bp.route('/rooms', methods=['GET'])
+@read_only
 def get_rooms():
-    rooms = Room.query.all()
-    return jsonify([{
-        'id': r.id, 
-        'name': r.name, 
-        'capacity': r.capacity, 
-        'room_type': r.room_type
-    } for r in rooms])
+    return cached_listing('rooms', ('room',), serializers.rooms.select(), Room.id, serializers.rooms)
 
 @resources_bp.route('/rooms', methods=['POST'])
 def add_room():
@@ -182,13 +274,29 @@ def add_room():
     )
     db.session.add(new_room)
     db.session.commit()
+    reference_cache().invalidate('room')
     return jsonify({'message': 'Room added!', 'id': new_room.id}), 201
 
+@resources_bp.route('/rooms/bulk', methods=['POST'])
+def import_rooms():
+    return bulk.import_response(bulk.rooms)
+
 @resources_bp.route('/rooms/<int:room_id>', methods=['DELETE'])
 def delete_room(room_id):
     room = db.session.get(Room, room_id)
     if not room:
         return jsonify({'error': 'Room not found'}), 404
+    bump_timetable_version(db.select(TimetableEntry.department_id).where(TimetableEntry.room_id == room_id))
+    owners = entry_owners(TimetableEntry.room_id == room_id)
     db.session.delete(room)
+    db.session.flush()
+    refresh_projections(owners)
+    drop_projections('room', [room_id])
     db.session.commit()
+    reference_cache().invalidate('room')
     return jsonify({'message': 'Room deleted!'})
+
+@resources_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters of the reference-data cache."""
+    return jsonify(reference_cache().stats())
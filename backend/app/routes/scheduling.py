@@ -1,8 +1,18 @@
-from flask import Blueprint, request, jsonify
-from ..models import Workload, Teacher, Course, Section, Room, TimetableEntry, Department
+from flask import Blueprint, current_app, request, jsonify, url_for
+from ..models import Workload, Teacher, Course, TimetableEntry, Department, GenerationJob, teacher_qualifications
 from .. import db
-from sqlalchemy.orm import sessionmaker
-import random
+from ..scheduler import GenerationError
+from ..scheduler.pipeline import ENGINES
+from ..scheduler.preflight import preflight
+from ..scheduler.problem import build_problem
+from ..scheduler.projections import projection_body
+from ..scheduler.grid import load_grid
+from ..scheduler.views import render_timetable, timetable_query, timetable_row
+from . import bulk
+from ..database import read_only
+from .listing import listing, wants_listing
+from ..scheduler.incremental import reschedule
+from ..scheduler.jobs import generation_jobs
 
 scheduling_bp = Blueprint('scheduling', __name__)
 
@@ -27,8 +37,10 @@ def create_workload():
     if not course:
         return jsonify({'error': 'Course not found'}), 404
 
-    # Qualification Check (Domain Protection)
-    if course not in teacher.qualified_courses:
+    # Qualification Check (Domain Protection): one indexed lookup, not a walk of qualified_courses
+    qualified = db.session.scalar(db.select(teacher_qualifications.c.teacher_id).where(
+        teacher_qualifications.c.teacher_id == teacher.id, teacher_qualifications.c.course_id == course.id))
+    if qualified is None:
         return jsonify({
             "error": f"Teacher {teacher.name} is not qualified to teach {course.name}."
         }), 400
@@ -45,203 +57,157 @@ def create_workload():
     
     return jsonify({"message": "Workload assigned successfully"}), 201
 
-# --- Conflict Detection Logic ---
-
-def check_conflict(day, timeslot, teacher_id=None, room_id=None, section_id=None):
+@scheduling_bp.route('/workloads/bulk', methods=['POST'])
+def import_workloads():
     """
-    Core engine logic to detect overlaps.
-    Returns error message if conflict exists, else None.
+    Many workloads at once, as a JSON array or CSV with teacher_id,
+    course_id, section_id and hours_per_week columns. Qualifications are
+    checked against one preloaded set; invalid rows come back as errors.
     """
-    query = TimetableEntry.query.filter_by(day=day, timeslot=timeslot)
-    
-    if teacher_id:
-        if query.filter_by(teacher_id=teacher_id).first():
-            return "Teacher occupied"
-    
-    if room_id:
-        if query.filter_by(room_id=room_id).first():
-            return "Room occupied"
-            
-    if section_id:
-        if query.filter_by(section_id=section_id).first():
-            return "Section occupied"
-            
-    return None
+    return bulk.import_response(bulk.workloads)
 
 # --- Timetable Generation ---
 
 @scheduling_bp.route('/generate', methods=['POST'])
 def generate_timetable():
     """
-    Advanced automated algorithm to generate timetable.
+    Queue an automated timetable generation for a department, or for several
+    departments at once with "department_ids" (a list or "all").
     Handles hierarchy, availability, capacity, and room types.
+    "engine" picks the solver: "greedy" (default) or "backtracking".
+    "optimize_seconds" > 0 adds a local-search pass over the solved timetable.
+    "profile": true attaches a cProfile/tracemalloc summary to the job result.
+    The solver runs on the background job pool; poll the returned job.
     """
     data = request.json
     dept_id = data.get('department_id')
-    if not dept_id:
+    dept_ids = data.get('department_ids')
+    if not dept_id and not dept_ids:
         return jsonify({"error": "Department ID is required"}), 400
+    params = {}
+    if 'engine' in data:
+        if not isinstance(data['engine'], str) or data['engine'] not in ENGINES:
+            return jsonify({"error": f"engine must be one of {sorted(ENGINES)}"}), 400
+        params['engine'] = data['engine']
+    if 'optimize_seconds' in data:
+        seconds = data['optimize_seconds']
+        if isinstance(seconds, bool) or not isinstance(seconds, (int, float)) or not 0 <= seconds <= 300:
+            return jsonify({"error": "optimize_seconds must be a number between 0 and 300"}), 400
+        params['optimize_seconds'] = seconds
+    if 'profile' in data:
+        if not isinstance(data['profile'], bool):
+            return jsonify({"error": "profile must be true or false"}), 400
+        params['profile'] = data['profile']
+
+    if dept_ids:
+        # Campus-wide mode: a list of departments, or "all"
+        if dept_ids == 'all':
+            dept_ids = db.session.scalars(db.select(Department.id).order_by(Department.id)).all()
+        elif not isinstance(dept_ids, list) or any(isinstance(d, bool) or not isinstance(d, int) for d in dept_ids):
+            return jsonify({"error": "department_ids must be a list of ids or \"all\""}), 400
+        # Each department is partitioned and written once
+        dept_ids = list(dict.fromkeys(dept_ids))
+        found = set(db.session.scalars(db.select(Department.id).where(Department.id.in_(dept_ids))))
+        missing = [d for d in dept_ids if d not in found]
+        if missing or not dept_ids:
+            return jsonify({'error': f'Department not found: {missing}'}), 404
+        job = GenerationJob(department_id=None, state='queued', params={'department_ids': list(dept_ids), **params})
+    else:
+        dept = db.session.get(Department, dept_id)
+        if not dept:
+            return jsonify({'error': 'Department not found'}), 404
+        job = GenerationJob(department_id=dept.id, state='queued', params=params)
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+
+    generation_jobs.submit(job_id)
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('scheduling.get_job', job_id=job_id)
+    }), 202
 
-    dept = db.session.get(Department, dept_id)
-    if not dept:
+@scheduling_bp.route('/preflight', methods=['POST'])
+def preflight_timetable():
+    """
+    Capacity checks for a department without placing anything: teacher
+    hours vs. availability, lab hours vs. lab room-slots, section hours vs.
+    grid size and sections without a large enough room.
+    """
+    data = request.json or {}
+    dept_id = data.get('department_id')
+    if not dept_id:
+        return jsonify({"error": "Department ID is required"}), 400
+    problem = build_problem(dept_id)
+    if problem is None:
         return jsonify({'error': 'Department not found'}), 404
-    TimetableEntry.query.filter_by(department_id=dept_id).delete()
-    
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
-    timeslots = ['09:00-10:00', '10:00-11:00', '11:00-12:00', '01:00-02:00', '02:00-03:00']
-
-    successful_entries = 0
-    errors = []
-
-    def is_teacher_available(teacher, day, slot):
-        """Check if teacher is available during the specific timeslot"""
-        if not teacher.availability: 
-            return True
-        return slot in teacher.availability.get(day, [])
-
-    def get_room_score(room, course, section):
-        """Calculate room suitability score"""
-        score = 0
-        
-        # Capacity check (higher score for better fit)
-        if room.capacity >= section.student_count:
-            if room.capacity == section.student_count:
-                score += 10  # Perfect fit
-            elif room.capacity <= section.student_count * 1.2:
-                score += 5   # Good fit
-            else:
-                score += 2   # Too big but usable
-        else:
-            return 0  # Too small, cannot use
-        
-        # Room type check
-        if course.course_type == 'Lab':
-            if 'lab' in room.room_type.lower():
-                score += 20  # Perfect for lab
-            else:
-                return 0  # Lab course in non-lab room - not allowed
-        else:
-            if 'lab' not in room.room_type.lower():
-                score += 10  # Perfect for theory
-            else:
-                score += 5   # Lab room for theory - acceptable but not ideal
-        
-        return score
-
-    def calculate_schedule_gaps(section_schedule, day, current_slot):
-        """Calculate gaps in schedule for optimization"""
-        if not section_schedule.get(day):
-            return 0
-        
-        slots = ['09:00-10:00', '10:00-11:00', '11:00-12:00', '01:00-02:00', '02:00-03:00']
-        current_index = slots.index(current_slot)
-        
-        # Count gaps before and after current slot
-        gaps_before = sum(1 for i, slot in enumerate(slots[:current_index]) 
-                         if slot not in section_schedule[day])
-        gaps_after = sum(1 for i, slot in enumerate(slots[current_index+1:]) 
-                       if slot not in section_schedule[day])
-        
-        return gaps_before + gaps_after
-
-    # Track section schedules for gap optimization
-    section_schedules = {}
-    
-    # Hierarchy Traversal: Programs -> Batches -> Sections
-    for program in dept.programs:
-        for batch in program.batches:
-            for section in batch.sections:
-                section_schedules[section.id] = {}
-                workloads = Workload.query.filter_by(section_id=section.id).all()
-                
-                for workload in workloads:
-                    teacher = db.session.get(Teacher, workload.teacher_id)
-                    course = db.session.get(Course, workload.course_id)
-                    allocated_hours = 0
-                    
-                    # Collect all possible slots and score them
-                    possible_slots = []
-                    for day in days:
-                        for slot in timeslots:
-                            if allocated_hours >= workload.hours_per_week: 
-                                break
-                            
-                            # 1. Teacher Availability Check
-                            if not is_teacher_available(teacher, day, slot): 
-                                continue
-                            
-                            # 2. Find and score suitable rooms
-                            all_rooms = Room.query.all()
-                            best_room = None
-                            best_room_score = 0
-                            
-                            for room in all_rooms:
-                                room_score = get_room_score(room, course, section)
-                                if room_score > 0:  # Room is suitable
-                                    if not check_conflict(day, slot, teacher_id=teacher.id, room_id=room.id, section_id=section.id):
-                                        if room_score > best_room_score:
-                                            best_room_score = room_score
-                                            best_room = room
-                            
-                            if best_room:
-                                # 3. Calculate gap penalty for optimization
-                                gap_penalty = calculate_schedule_gaps(section_schedules[section.id], day, slot)
-                                total_score = best_room_score - gap_penalty
-                                
-                                possible_slots.append({
-                                    'day': day,
-                                    'slot': slot,
-                                    'room': best_room,
-                                    'score': total_score
-                                })
-                    
-                    # Sort by score (highest first) and allocate best slots
-                    possible_slots.sort(key=lambda x: x['score'], reverse=True)
-                    
-                    for slot_info in possible_slots:
-                        if allocated_hours >= workload.hours_per_week: 
-                            break
-                        
-                        new_entry = TimetableEntry(
-                            day=slot_info['day'], 
-                            timeslot=slot_info['slot'], 
-                            section_id=section.id,
-                            course_id=workload.course_id, 
-                            teacher_id=workload.teacher_id,
-                            room_id=slot_info['room'].id, 
-                            department_id=dept_id
-                        )
-                        db.session.add(new_entry)
-                        
-                        # Track this slot for gap optimization
-                        day = slot_info['day']
-                        slot = slot_info['slot']
-                        if day not in section_schedules[section.id]:
-                            section_schedules[section.id][day] = []
-                        section_schedules[section.id][day].append(slot)
-                        
-                        allocated_hours += 1
-                        successful_entries += 1
-                    
-                    if allocated_hours < workload.hours_per_week:
-                        errors.append(f"Incomplete allocation for {course.name} in {section.name} - only {allocated_hours}/{workload.hours_per_week} hours scheduled")
+    return jsonify(preflight(problem)), 200
 
-    db.session.commit()
+@scheduling_bp.route('/reschedule', methods=['POST'])
+def reschedule_timetable():
+    """
+    Incrementally repair a department's timetable after a change.
+    Only entries of the given sections, teachers, rooms or workloads are
+    ripped up and re-placed; the rest of the timetable is left untouched.
+    """
+    data = request.json or {}
+    dept_id = data.get('department_id')
+    if not dept_id:
+        return jsonify({"error": "Department ID is required"}), 400
+
+    change = {}
+    for key in ('section_ids', 'teacher_ids', 'room_ids', 'workload_ids'):
+        ids = data.get(key, [])
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return jsonify({"error": f"{key} must be a list of ids"}), 400
+        change[key] = ids
+    if not any(change.values()):
+        return jsonify({"error": "Nothing to reschedule"}), 400
+
+    try:
+        result = reschedule(dept_id, **change)
+    except GenerationError as e:
+        return jsonify({"error": e.message}), e.status_code
+    return jsonify(result), 200
+
+@scheduling_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@read_only
+def get_job(job_id):
+    job = db.session.get(GenerationJob, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    live_progress = generation_jobs.progress(job.id)
     return jsonify({
-        "status": "success" if not errors else "partial_success",
-        "entries": successful_entries,
-        "errors": errors
-    }), 200
+        "id": job.id,
+        "department_id": job.department_id,
+        "state": job.state,
+        "progress": live_progress if live_progress is not None else job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    })
 
 @scheduling_bp.route('/view/<int:dept_id>', methods=['GET'])
+@read_only
 def view_timetable(dept_id):
-    entries = TimetableEntry.query.filter_by(department_id=dept_id).all()
-    result = []
-    for e in entries:
-        result.append({
-            "day": e.day, "timeslot": e.timeslot,
-            "section": db.session.get(Section, e.section_id).name,
-            "course": db.session.get(Course, e.course_id).name,
-            "teacher": db.session.get(Teacher, e.teacher_id).name,
-            "room": db.session.get(Room, e.room_id).name
-        })
-    return jsonify(result)
+    """
+    Full timetable from the version cache; `?limit=&after=` pages or
+    `Accept: application/x-ndjson` streams straight from the database.
+    """
+    if wants_listing():
+        return listing(timetable_query(dept_id), TimetableEntry.id, timetable_row(load_grid(dept_id)), scalars=False)
+    return current_app.response_class(render_timetable(dept_id), mimetype='application/json')
+
+@scheduling_bp.route('/<any(teachers, rooms, sections):kind>/<int:owner_id>/timetable', methods=['GET'])
+def owner_timetable(kind, owner_id):
+    """
+    Weekly timetable of one teacher, room or section across all departments,
+    served from its materialized projection.
+    """
+    body = projection_body(kind[:-1], owner_id)
+    if body is None:
+        return jsonify({'error': f'{kind[:-1].capitalize()} not found'}), 404
+    return current_app.response_class(body, mimetype='application/json')
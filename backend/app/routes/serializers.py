@@ -0,0 +1,73 @@
+"""
+Resource serializers: the fields each listing returns and the eager loads
+those fields need.
+
+Relationships are loaded with selectinload, one set-based `IN` query per
+relationship for the whole page (or each streamed batch), so a listing
+costs a fixed number of queries however many rows it returns.
+"""
+from sqlalchemy.orm import selectinload
+
+from .. import db
+from ..models import Department, Program, Batch, Section, Teacher, Course, Room, TimeGrid
+
+
+class Serializer:
+    """Turns `model` rows into dicts; `select()` starts a listing query with the loads the fields need."""
+
+    def __init__(self, model, fields, loads=()):
+        self.model = model
+        self.fields = fields
+        self.loads = loads
+
+    def select(self):
+        return db.select(self.model).options(*self.loads)
+
+    def __call__(self, obj):
+        return self.fields(obj)
+
+
+departments = Serializer(Department, lambda d: {
+    'id': d.id, 'name': d.name, 'code': d.code, 'time_grid_id': d.time_grid_id
+})
+
+time_grids = Serializer(TimeGrid, lambda g: {
+    'id': g.id, 'name': g.name, 'days': g.days, 'periods': g.periods,
+    'breaks': g.breaks, 'slots': g.slots, 'is_default': g.is_default
+})
+
+programs = Serializer(Program, lambda p: {
+    'id': p.id, 'name': p.name, 'code': p.code, 'department_id': p.department_id
+})
+
+batches = Serializer(Batch, lambda b: {
+    'id': b.id, 'name': b.name, 'academic_year': b.academic_year
+})
+
+sections = Serializer(Section, lambda s: {
+    'id': s.id, 'name': s.name, 'batch_id': s.batch_id
+})
+
+teachers = Serializer(Teacher, lambda t: {
+    'id': t.id,
+    'name': t.name,
+    'email': t.email,
+    'availability': t.availability,
+    'departments': [d.name for d in t.departments],
+    'qualifications': [c.name for c in t.qualified_courses]
+}, loads=(selectinload(Teacher.departments), selectinload(Teacher.qualified_courses)))
+
+courses = Serializer(Course, lambda c: {
+    'id': c.id,
+    'name': c.name,
+    'code': c.code,
+    'credits': c.credits,
+    'department_id': c.department_id
+})
+
+rooms = Serializer(Room, lambda r: {
+    'id': r.id,
+    'name': r.name,
+    'capacity': r.capacity,
+    'room_type': r.room_type
+})
@@ -0,0 +1,7 @@
+from .occupancy import OccupancyIndex
+from .problem import SchedulingProblem, build_problem
+from .greedy import solve_greedy
+from .backtracking import solve_backtracking
+from .rooms import RoomIndex, room_score
+from .pipeline import GenerationError, generate_department
+from .incremental import reschedule
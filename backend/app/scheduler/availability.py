@@ -0,0 +1,105 @@
+"""
+Teacher availability, validated and normalized when it is written.
+
+Clients send {day: [slot, ...]} with the labels (or integer indices) of the
+teacher's time grid: that of their first department, else the default
+grid. `normalize` rejects days and slots that are not on it and returns the
+availability twice: as JSON in the grid's own labels and order, kept in
+`Teacher.availability` for display, and as an integer bitmask with bit
+``day_index * SLOT_STRIDE + slot_index``, kept in
+`Teacher.availability_mask`. The mask is in index space, so it holds on any
+grid; `pack` lays it over a grid's cells in OccupancyIndex bit order when a
+problem is loaded, and from there availability checks are bitwise ANDs.
+NULL means available in every slot, an empty mask in none.
+"""
+from .. import db
+from ..models import Department, TimeGrid
+from .grid import grid_spec, load_grid
+
+# Bits reserved per day; grids with more teachable slots are rejected
+SLOT_STRIDE = 32
+
+
+class AvailabilityError(ValueError):
+    """Availability that does not fit the teacher's time grid."""
+
+
+def _index(value, labels, what):
+    if isinstance(value, int) and not isinstance(value, bool):
+        index = value
+    elif isinstance(value, str) and value.isdigit():
+        index = int(value)
+    else:
+        try:
+            index = labels.index(value)
+        except ValueError:
+            index = None
+    if index is None or not 0 <= index < len(labels):
+        raise AvailabilityError(f"{what} {value!r} is not on the time grid")
+    return index
+
+
+def normalize(availability, grid):
+    """(labels, mask) for raw availability on `grid`; (None, None) for no restriction."""
+    if availability is None or availability == {}:
+        return None, None
+    if not isinstance(availability, dict):
+        raise AvailabilityError("availability must map days to lists of slots")
+    mask = 0
+    for day, slots in availability.items():
+        d = _index(day, grid.days, "day")
+        if not isinstance(slots, list):
+            raise AvailabilityError(f"slots of {day!r} must be a list")
+        for slot in slots:
+            mask |= 1 << (d * SLOT_STRIDE + _index(slot, grid.slots, "slot"))
+    return labels(mask, grid), mask
+
+
+def labels(mask, grid):
+    """{day label: [slot label, ...]} of the cells set in `mask`, in grid order."""
+    result = {}
+    for d, day in enumerate(grid.days):
+        row = mask >> (d * SLOT_STRIDE)
+        slots = [slot for s, slot in enumerate(grid.slots) if row >> s & 1]
+        if slots:
+            result[day] = slots
+    return result
+
+
+def pack(mask, grid):
+    """`mask` as a bitmap over `grid`'s cells (bit day * slot_count + slot); None stays None."""
+    if mask is None:
+        return None
+    day_count, slot_count = grid.shape
+    row = (1 << slot_count) - 1
+    packed = 0
+    for d in range(day_count):
+        packed |= (mask >> (d * SLOT_STRIDE) & row) << (d * slot_count)
+    return packed
+
+
+def teacher_grids(department_ids):
+    """GridSpec of each department in `department_ids`, and of None (the default grid)."""
+    grids = {None: load_grid(None)}
+    wanted = list({d for d in department_ids if d is not None})
+    if wanted:
+        specs = {}
+        for dept_id, grid in db.session.execute(
+            db.select(Department.id, TimeGrid)
+            .join(TimeGrid, Department.time_grid_id == TimeGrid.id)
+            .where(Department.id.in_(wanted))
+        ).tuples():
+            grids[dept_id] = specs.setdefault(grid.id, grid_spec(grid))
+        for dept_id in wanted:
+            grids.setdefault(dept_id, grids[None])
+    return grids
+
+
+def set_availability(teacher, availability, grid=None):
+    """Validate `availability` and store it on `teacher`; raises AvailabilityError."""
+    if grid is None:
+        departments = sorted(teacher.departments, key=lambda d: d.id)
+        # A new teacher may not be in the session yet; don't flush it half-built
+        with db.session.no_autoflush:
+            grid = load_grid(departments[0].id if departments else None)
+    teacher.availability, teacher.availability_mask = normalize(availability, grid)
@@ -0,0 +1,359 @@
+"""
+Backtracking engine: most constrained workload first, conflict-directed backjumping.
+
+Every unplaced hour of a workload is a variable; its values are the free
+(cell, room) pairs of that workload, least constraining first: cells other
+open workloads of the same teacher or section are likely to need, or whose
+eligible rooms are nearly gone, go last, and the greedy scorer's order
+breaks ties. The workload with the least slack (free cells minus hours still needed) is
+extended next, so scarce teachers and lab rooms go to the workloads that
+cannot do without them. Each placement refreshes the slack of the workloads
+it touches (forward checking). A workload left with fewer free cells than
+hours is a dead end: the search jumps straight back to the latest placement
+that took one of its cells, undoing the unrelated decisions in between.
+
+Hours of one workload are interchangeable, so a workload never blames its
+own placements. A dead end nobody can be blamed for, or any dead end once the
+backjump/time budget is spent, drops the hours that cannot fit; they surface
+as the usual incomplete-allocation errors.
+"""
+import heapq
+import time
+
+from .domains import build_domains
+from .greedy import Placement, SolveResult, allocation_errors
+from .rooms import RoomIndex
+from .scoring import default_scorer
+
+DEFAULT_MAX_BACKJUMPS = 20000
+# Dead ends one workload may cause before its missing hours are dropped
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_TIME_LIMIT = 10.0  # seconds
+# Weight of room scarcity against teacher/section demand when ordering values
+ROOM_PRESSURE = 0.5
+
+
+def _cells(mask):
+    """Grid positions of the set bits of `mask`, lowest first."""
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        yield bit.bit_length() - 1
+
+
+class _Frame:
+    """One placed hour: the workload, its ordered values and the one in use."""
+    __slots__ = ('workload_id', 'values', 'index', 'conflicts')
+
+    def __init__(self, workload_id, values):
+        self.workload_id = workload_id
+        self.values = values
+        self.index = 0
+        self.conflicts = set()
+
+    @property
+    def value(self):
+        return self.values[self.index]
+
+
+class _Search:
+    def __init__(self, problem, occupancy, room_index, scorer, domains, max_backjumps, max_retries, time_limit,
+                 progress, stats=None):
+        self.problem = problem
+        self.occupancy = occupancy
+        self.room_index = room_index
+        self.scorer = scorer
+        self.max_backjumps = max_backjumps
+        self.max_retries = max_retries
+        self.deadline = time.perf_counter() + time_limit
+        self.progress = progress
+        self.stats = stats
+        self.backjumps = 0
+
+        self.info = {}
+        self.remaining = {}
+        self.retries = {}
+        self.by_teacher, self.by_section, self.by_class = {}, {}, {}
+        self.class_rooms, self.room_classes = {}, {}
+        self.free_count, self.class_free = {}, {}
+        for section in problem.sections:
+            for w in section.workloads:
+                course_type = problem.courses[w.course_id].course_type
+                key = ('Lab' if course_type == 'Lab' else 'Theory', section.student_count)
+                if key not in self.class_rooms:
+                    self._add_class(key)
+                # (order, section, teacher, class, feasible domain, course_type, student_count, course)
+                self.info[w.id] = (len(self.info), section.id, w.teacher_id, key, domains.masks[w.id],
+                                   course_type, section.student_count, w.course_id)
+                self.remaining[w.id] = w.hours_per_week
+                self.by_teacher.setdefault(w.teacher_id, []).append(w.id)
+                self.by_section.setdefault(section.id, []).append(w.id)
+                self.by_class[key].append(w.id)
+
+        self.total_hours = sum(self.remaining.values())
+        self.open_hours = self.total_hours
+        self.teacher_owner, self.section_owner, self.room_owner = {}, {}, {}
+        self.stack = []
+        self.heap = []
+        self.entries = {}
+        self.version = dict.fromkeys(self.info, 0)
+        for w_id in self.info:
+            self._refresh(w_id)
+
+    def _add_class(self, key):
+        """Track, per cell, how many rooms eligible for `key` are still free."""
+        rooms = [room.id for room, _ in self.room_index.eligible(*key)]
+        self.class_rooms[key] = rooms
+        self.by_class[key] = []
+        counts = [0] * self.occupancy.size
+        for room_id in rooms:
+            self.room_classes.setdefault(room_id, []).append(key)
+            busy = self.occupancy.rooms.get(room_id, 0)
+            for cell in range(self.occupancy.size):
+                if not busy >> cell & 1:
+                    counts[cell] += 1
+        self.free_count[key] = counts
+        self.class_free[key] = sum(1 << cell for cell, n in enumerate(counts) if n)
+
+    # --- domains and ordering ---
+
+    def _open_cells(self, w_id):
+        """Feasible cells where neither the teacher nor the section is booked."""
+        _, section_id, teacher_id, _, feasible = self.info[w_id][:5]
+        return (feasible
+                & ~self.occupancy.teachers.get(teacher_id, 0)
+                & ~self.occupancy.sections.get(section_id, 0))
+
+    def domain(self, w_id):
+        return self._open_cells(w_id) & self.class_free[self.info[w_id][3]]
+
+    def _refresh(self, w_id):
+        self.version[w_id] += 1
+        if self.remaining[w_id] > 0:
+            size = self.domain(w_id).bit_count()
+            key = (size - self.remaining[w_id], size, self.info[w_id][0])
+            self.entries[w_id] = entry = (key, self.version[w_id], w_id)
+            heapq.heappush(self.heap, entry)
+        else:
+            self.entries.pop(w_id, None)
+        if len(self.heap) > 4 * len(self.info):
+            # Mostly stale entries left behind by refreshes: rebuild from the live ones
+            self.heap = list(self.entries.values())
+            heapq.heapify(self.heap)
+
+    def _select(self):
+        """Workload with the least slack, hierarchy order breaking ties."""
+        while self.heap:
+            _, version, w_id = heapq.heappop(self.heap)
+            if version == self.version[w_id] and self.remaining[w_id] > 0:
+                return w_id
+        return None
+
+    def _touched(self, w_id, saturated, cell):
+        _, section_id, teacher_id = self.info[w_id][:3]
+        touched = set(self.by_teacher[teacher_id]) | set(self.by_section[section_id])
+        for key in saturated:
+            touched.update(w for w in self.by_class[key] if self._open_cells(w) >> cell & 1)
+        for w in touched:
+            self._refresh(w)
+
+    def _pressure(self, w_id, domain):
+        """
+        Least-constraining-value weight of each cell in `domain`: the expected
+        share of the cell other open workloads of the same teacher or section
+        still need, plus how close its eligible rooms are to running out.
+        """
+        _, section_id, teacher_id, key = self.info[w_id][:4]
+        counts = self.free_count[key]
+        pressure = {cell: ROOM_PRESSURE / counts[cell] for cell in _cells(domain)}
+        for other in set(self.by_teacher[teacher_id]) | set(self.by_section[section_id]):
+            if other == w_id or self.remaining[other] <= 0:
+                continue
+            other_domain = self.domain(other)
+            if not other_domain:
+                continue
+            weight = self.remaining[other] / other_domain.bit_count()
+            for cell in _cells(other_domain & domain):
+                pressure[cell] += weight
+        return pressure
+
+    # --- placing and undoing hours ---
+
+    def _place(self, depth, frame):
+        cell, room = frame.value
+        w_id = frame.workload_id
+        _, section_id, teacher_id = self.info[w_id][:3]
+        self.occupancy.book_cell(cell, teacher_id, room.id, section_id)
+        self.teacher_owner[teacher_id, cell] = depth
+        self.section_owner[section_id, cell] = depth
+        self.room_owner[room.id, cell] = depth
+        saturated = []
+        for key in self.room_classes.get(room.id, ()):
+            self.free_count[key][cell] -= 1
+            if not self.free_count[key][cell]:
+                self.class_free[key] &= ~(1 << cell)
+                saturated.append(key)
+        self.remaining[w_id] -= 1
+        self.open_hours -= 1
+        self._touched(w_id, saturated, cell)
+
+    def _unplace(self, frame):
+        cell, room = frame.value
+        w_id = frame.workload_id
+        _, section_id, teacher_id = self.info[w_id][:3]
+        self.occupancy.release_cell(cell, teacher_id, room.id, section_id)
+        del self.teacher_owner[teacher_id, cell]
+        del self.section_owner[section_id, cell]
+        del self.room_owner[room.id, cell]
+        freed = []
+        for key in self.room_classes.get(room.id, ()):
+            if not self.free_count[key][cell]:
+                self.class_free[key] |= 1 << cell
+                freed.append(key)
+            self.free_count[key][cell] += 1
+        self.remaining[w_id] += 1
+        self.open_hours += 1
+        self._touched(w_id, freed, cell)
+
+    def _drop(self, w_id, hours):
+        self.remaining[w_id] -= hours
+        self.open_hours -= hours
+        self._refresh(w_id)
+
+    # --- dead ends ---
+
+    def _blame(self, w_id):
+        """
+        Depths of the placements that took cells from `w_id`'s domain.
+        Each lost cell is explained by its earliest culprit; cells lost to
+        bookings outside the search, or to the workload itself, blame nobody.
+        """
+        _, section_id, teacher_id, key, feasible = self.info[w_id][:5]
+        lost = feasible & ~self.domain(w_id)
+        culprits = set()
+        for cell in _cells(lost):
+            bit = 1 << cell
+            holders = []
+            for owner, resource_id, table in ((self.teacher_owner, teacher_id, self.occupancy.teachers),
+                                              (self.section_owner, section_id, self.occupancy.sections)):
+                if table.get(resource_id, 0) & bit:
+                    holders.append(owner.get((resource_id, cell)))
+            if holders:
+                if None in holders:
+                    continue
+                depth = min(holders)
+                if self.stack[depth].workload_id != w_id:
+                    culprits.add(depth)
+                continue
+            # Teacher and section are free: every eligible room is taken
+            depths = [self.room_owner.get((room_id, cell)) for room_id in self.class_rooms[key]]
+            if None not in depths:
+                culprits.update(depths)
+        return culprits
+
+    def _out_of_budget(self):
+        return self.backjumps >= self.max_backjumps or time.perf_counter() > self.deadline
+
+    def _backjump(self, conflicts):
+        """Undo back to the latest culprit and move it to its next value."""
+        while conflicts and not self._out_of_budget():
+            self.backjumps += 1
+            target = max(conflicts)
+            while len(self.stack) - 1 > target:
+                self._unplace(self.stack.pop())
+            frame = self.stack[target]
+            frame.conflicts |= conflicts
+            frame.conflicts.discard(target)
+            self._unplace(frame)
+            frame.index += 1
+            if frame.index < len(frame.values):
+                self._place(target, frame)
+                return
+            # Every value of the culprit failed: it is now the dead end
+            self.stack.pop()
+            conflicts = frame.conflicts | self._blame(frame.workload_id)
+            if not conflicts:
+                self._drop(frame.workload_id, 1)
+                return
+        # Budget spent mid-jump: keep what is placed and carry on without jumping
+
+    def run(self):
+        reported = 0
+        while True:
+            w_id = self._select()
+            if w_id is None:
+                break
+            domain = self.domain(w_id)
+            free = domain.bit_count()
+            if self.stats is not None:
+                self.stats.count('workloads_considered')
+            if free < self.remaining[w_id]:
+                retries = self.retries.get(w_id, 0)
+                conflicts = set()
+                if retries < self.max_retries and not self._out_of_budget():
+                    conflicts = self._blame(w_id)
+                if conflicts:
+                    self.retries[w_id] = retries + 1
+                    self._backjump(conflicts)
+                else:
+                    self._drop(w_id, self.remaining[w_id] - free)
+                continue
+
+            _, section_id, _, _, _, course_type, student_count, _ = self.info[w_id]
+            if self.stats is not None:
+                started = time.perf_counter()
+            scored = self.scorer(self.occupancy, self.room_index, domain, course_type, student_count, section_id)
+            if self.stats is not None:
+                scored_at = time.perf_counter()
+            # Least constraining cells first; stable sort keeps the scorer's order on ties
+            pressure = self._pressure(w_id, domain)
+            scored = sorted(scored, key=lambda x: pressure[x[0]])
+            if self.stats is not None:
+                self.stats.add_time('room_scoring', scored_at - started)
+                self.stats.add_time('slot_sorting', time.perf_counter() - scored_at)
+                self.stats.count('candidate_cells', free)
+                self.stats.count('rooms_scored', free * len(self.room_index.eligible(course_type, student_count)))
+            frame = _Frame(w_id, [(cell, room) for cell, room, _ in scored])
+            self.stack.append(frame)
+            self._place(len(self.stack) - 1, frame)
+
+            if self.progress and self.total_hours:
+                done = (self.total_hours - self.open_hours) / self.total_hours
+                if done - reported >= 0.01:
+                    reported = done
+                    self.progress(done)
+
+        placements = []
+        for frame in self.stack:
+            cell, room = frame.value
+            day, slot = self.occupancy.position(cell)
+            _, section_id, teacher_id, _, _, _, _, course_id = self.info[frame.workload_id]
+            placements.append(Placement(day, slot, section_id, course_id, teacher_id, room.id, frame.workload_id))
+        return placements
+
+
+def solve_backtracking(problem, occupancy, room_index=None, scorer=None, progress=None, domains=None,
+                       max_backjumps=DEFAULT_MAX_BACKJUMPS, max_retries=DEFAULT_MAX_RETRIES,
+                       time_limit=DEFAULT_TIME_LIMIT, stats=None):
+    """
+    Same contract as solve_greedy: `occupancy` is updated in place and the
+    result lists placements plus incomplete-allocation errors. The search
+    stops backjumping after `max_backjumps` jumps or `time_limit` seconds and
+    finishes the remaining hours without revisiting earlier decisions.
+    `stats`, a RunStats, gets scoring and sorting time plus work counters.
+    """
+    if room_index is None:
+        room_index = RoomIndex.for_problem(problem)
+    if scorer is None:
+        scorer = default_scorer(occupancy)
+    if domains is None:
+        domains = build_domains(problem, occupancy, room_index)
+    search = _Search(problem, occupancy, room_index, scorer, domains, max_backjumps, max_retries, time_limit,
+                     progress, stats)
+    placements = search.run()
+    if stats is not None:
+        stats.count('backjumps', search.backjumps)
+        stats.count('placements', len(placements))
+    if progress:
+        progress(1.0)
+    return SolveResult(placements, allocation_errors(problem, placements))
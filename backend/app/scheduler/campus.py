@@ -0,0 +1,243 @@
+"""
+Campus-wide generation: several departments solved side by side.
+
+Rooms (and teachers who work for more than one department) are shared, so
+the free cells of the campus ledger are partitioned up front: every
+department solves in its own process against a view in which the cells
+granted to other departments are already booked. The partitions are
+disjoint, so the parallel results can never double-book. A sequential repair
+pass then offers the cells nobody used to the hours that are still missing.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import replace
+
+from sqlalchemy.exc import IntegrityError
+
+from .. import db
+from ..models import Department, TimetableEntry
+from .greedy import allocation_errors
+from .grid import GridMismatchError, check_compatible
+from .occupancy import OccupancyIndex
+from .persistence import DEFAULT_CHUNK_SIZE, bump_timetable_version, delete_department_entries, write_placements
+from .local_search import optimize
+from .pipeline import DEFAULT_ENGINE, GenerationError, get_engine, optimize_summary
+from .problem import build_problem
+from .projections import entry_owners, no_owners, placement_owners, refresh_projections
+from .stats import Profile, RunStats, log_stats
+
+
+def _weighted_owners(weights):
+    """
+    Endless smooth weighted round-robin over {owner: weight}: owners appear
+    in proportion to their weight and as evenly interleaved as possible.
+    """
+    owners = sorted(weights)
+    total = sum(weights.values())
+    current = dict.fromkeys(owners, 0)
+    while True:
+        for owner in owners:
+            current[owner] += weights[owner]
+        best = max(owners, key=lambda o: current[o])
+        current[best] -= total
+        yield best
+
+
+def _is_lab(room):
+    return 'lab' in room.room_type.lower()
+
+
+def partition_ledger(problems, occupancy):
+    """
+    Split the free cells of shared resources between departments.
+    Returns {department_id: OccupancyIndex} views of `occupancy` where cells
+    owned by other departments are marked as booked.
+
+    Lab rooms are shared out by lab hours, other rooms by theory hours, and a
+    teacher working for several departments by that teacher's hours in each.
+    """
+    views = {p.department_id: occupancy.copy() for p in problems}
+    if len(problems) < 2:
+        return views
+
+    lab_demand, theory_demand, teacher_demand = {}, {}, {}
+    for problem in problems:
+        d_id = problem.department_id
+        for w in problem.workloads:
+            demand = lab_demand if problem.courses[w.course_id].course_type == 'Lab' else theory_demand
+            demand[d_id] = demand.get(d_id, 0) + w.hours_per_week
+            per_teacher = teacher_demand.setdefault(w.teacher_id, {})
+            per_teacher[d_id] = per_teacher.get(d_id, 0) + w.hours_per_week
+
+    def grant(resources, busy, weights, key):
+        """Hand each free (cell, resource) to one department, cell by cell."""
+        # Every free cell needs exactly one owner, even without any demand
+        weights = {d: h for d, h in weights.items() if h > 0} or dict.fromkeys(views, 1)
+        owners = _weighted_owners(weights)
+        for cell in range(occupancy.size):
+            bit = 1 << cell
+            for resource_id in resources:
+                if busy.get(resource_id, 0) & bit:
+                    continue
+                owner = next(owners)
+                for d_id, view in views.items():
+                    if d_id != owner:
+                        table = getattr(view, key)
+                        table[resource_id] = table.get(resource_id, 0) | bit
+
+    rooms = problems[0].rooms
+    grant([r.id for r in rooms if _is_lab(r)], occupancy.rooms, lab_demand, 'rooms')
+    grant([r.id for r in rooms if not _is_lab(r)], occupancy.rooms, theory_demand, 'rooms')
+    for teacher_id, weights in sorted(teacher_demand.items()):
+        if len(weights) > 1:
+            grant([teacher_id], occupancy.teachers, weights, 'teachers')
+    return views
+
+
+def _solve_view(problem, view, engine=DEFAULT_ENGINE):
+    # Runs in a worker process: pure computation, no app or database
+    return get_engine(engine)(problem, view).placements
+
+
+def _residual(problem, placements):
+    """The part of `problem` still unplaced after `placements`."""
+    placed = {}
+    for p in placements:
+        placed[p.workload_id] = placed.get(p.workload_id, 0) + 1
+    sections = []
+    for section in problem.sections:
+        missing = tuple(
+            replace(w, hours_per_week=w.hours_per_week - placed.get(w.id, 0))
+            for w in section.workloads
+            if placed.get(w.id, 0) < w.hours_per_week
+        )
+        if missing:
+            sections.append(replace(section, workloads=missing))
+    return replace(problem, sections=tuple(sections))
+
+
+def solve_campus(problems, occupancy, processes=None, progress=None, engine=DEFAULT_ENGINE):
+    """
+    Solve several department problems against one shared ledger.
+    `occupancy` must hold every booking outside these departments; it ends up
+    holding the combined result. Returns {department_id: placements}.
+    """
+    views = partition_ledger(problems, occupancy)
+    processes = processes or os.cpu_count() or 1
+
+    results = {}
+    if processes > 1 and len(problems) > 1:
+        with ProcessPoolExecutor(max_workers=min(processes, len(problems))) as pool:
+            futures = {p.department_id: pool.submit(_solve_view, p, views[p.department_id], engine) for p in problems}
+            for done, problem in enumerate(problems, start=1):
+                results[problem.department_id] = futures[problem.department_id].result()
+                if progress:
+                    progress(0.9 * done / len(problems))
+    else:
+        for done, problem in enumerate(problems, start=1):
+            results[problem.department_id] = _solve_view(problem, views[problem.department_id], engine)
+            if progress:
+                progress(0.9 * done / len(problems))
+
+    # Reconcile into the shared ledger, then repair with the cells left over
+    for placements in results.values():
+        for p in placements:
+            occupancy.book(p.day_index, p.slot_index, p.teacher_id, p.room_id, p.section_id)
+    for problem in problems:
+        residual = _residual(problem, results[problem.department_id])
+        if residual.sections:
+            results[problem.department_id] += _solve_view(residual, occupancy, engine)
+    return results
+
+
+def generate_campus(department_ids=None, processes=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                    engine=DEFAULT_ENGINE, optimize_seconds=0, profile=False):
+    """
+    Generate timetables for several departments (all of them if
+    `department_ids` is None) and replace them in one transaction.
+    `optimize_seconds` is the local-search budget of each department, spent
+    one department after another on the combined ledger.
+    "stats" reports phase timings; the departments are solved in worker
+    processes, so it has no per-loop solver counters. `profile` adds a
+    cProfile/tracemalloc summary of this process under "profile".
+    """
+    get_engine(engine)  # reject an unknown engine before loading anything
+    stats = RunStats()
+    with Profile() if profile else nullcontext() as profiler:
+        result = _generate_campus(department_ids, processes, chunk_size, progress, engine, optimize_seconds,
+                                  stats, profiler)
+    result["stats"] = stats.as_dict()
+    if profiler is not None:
+        result["profile"] = profiler.summary()
+    log_stats(engine=engine, department_ids=[int(d) for d in result["departments"]], entries=result["entries"],
+              **result["stats"])
+    return result
+
+
+def _generate_campus(department_ids, processes, chunk_size, progress, engine, optimize_seconds, stats, profiler):
+    with stats.phase('load'):
+        if department_ids is None:
+            department_ids = db.session.scalars(db.select(Department.id).order_by(Department.id)).all()
+        problems = []
+        for dept_id in department_ids:
+            problem = build_problem(dept_id)
+            if problem is None:
+                raise GenerationError(f'Department {dept_id} not found', 404)
+            problems.append(problem)
+        if not problems:
+            raise GenerationError('No departments to generate', 400)
+        # One occupancy index serves every department, so their grids must line up
+        try:
+            for problem in problems[1:]:
+                check_compatible(problem.grid, problems[0].grid)
+        except GridMismatchError as e:
+            raise GenerationError(str(e), 400)
+        occupancy = OccupancyIndex.load(*problems[0].grid.shape, exclude_department_ids=department_ids)
+
+    with stats.phase('solve'):
+        results = solve_campus(problems, occupancy, processes=processes, progress=progress, engine=engine)
+    optimized = {}
+    if optimize_seconds > 0:
+        with stats.phase('optimize'):
+            for problem in problems:
+                optimized[problem.department_id] = optimize(problem, occupancy, results[problem.department_id],
+                                                            time_limit=optimize_seconds)
+                results[problem.department_id] = optimized[problem.department_id].placements
+
+    departments = {}
+    owners = no_owners()
+    persistence_started = time.perf_counter()
+    try:
+        for problem in problems:
+            placements = results[problem.department_id]
+            entry_owners(TimetableEntry.department_id == problem.department_id, owners=owners)
+            placement_owners(placements, owners)
+            delete_department_entries(problem.department_id)
+            write_stats = write_placements(problem.department_id, placements, chunk_size, profiler)
+            errors = allocation_errors(problem, placements)
+            departments[problem.department_id] = {
+                "status": "success" if not errors else "partial_success",
+                "entries": len(placements),
+                "errors": errors,
+                "persistence": write_stats._asdict()
+            }
+            if problem.department_id in optimized:
+                departments[problem.department_id]["objective"] = optimize_summary(optimized[problem.department_id])
+        bump_timetable_version(list(departments))
+        refresh_projections(owners)
+        stats.add_time('persistence', time.perf_counter() - persistence_started)
+        stats.count('departments', len(departments))
+        stats.count('placements', sum(d["entries"] for d in departments.values()))
+        with stats.phase('commit'):
+            db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise GenerationError("Timetable changed during generation, please retry", 409)
+
+    return {
+        "status": "success" if all(d["status"] == "success" for d in departments.values()) else "partial_success",
+        "entries": sum(d["entries"] for d in departments.values()),
+        "departments": {str(d_id): result for d_id, result in departments.items()}
+    }
@@ -0,0 +1,104 @@
+"""
+Feasible-domain pre-pass: which cells each workload may ever use.
+
+A workload's domain is the bitmap of cells where its teacher is available,
+neither the teacher nor the section is booked by a fixed timetable (other
+departments, or entries kept during incremental re-scheduling) and at least
+one room eligible for the course type and section size is still free.
+Solvers start from these masks instead of re-deriving them per workload.
+
+Domains are then made consistent the way arc consistency prunes a CSP: a
+workload whose domain holds exactly its weekly hours needs every one of those
+cells, so they are removed from the domains of the other workloads of the
+same teacher or section, which may in turn become forced. Workloads,
+sections and teachers whose demand already exceeds their feasible cells are
+reported as warnings before any placement happens.
+"""
+from collections import namedtuple
+
+from .rooms import RoomIndex
+
+Domains = namedtuple('Domains', 'masks warnings')
+
+
+def availability_mask(teacher, occupancy):
+    """Teacher availability as a bitmap over the occupancy grid."""
+    if teacher.availability is None:
+        return occupancy.full_mask
+    return teacher.availability & occupancy.full_mask
+
+
+def _free_cells(occupancy, room_index, course_type, student_count, cache):
+    """Cells where at least one room eligible for the class is unbooked."""
+    key = ('Lab' if course_type == 'Lab' else 'Theory', student_count)
+    if key not in cache:
+        free = 0
+        for room, _ in room_index.eligible(*key):
+            free |= occupancy.full_mask & ~occupancy.rooms.get(room.id, 0)
+        cache[key] = free
+    return cache[key]
+
+
+def _union(masks):
+    union = 0
+    for mask in masks:
+        union |= mask
+    return union
+
+
+def build_domains(problem, occupancy, room_index=None):
+    """Feasible cell bitmap of every workload of `problem` against the bookings in `occupancy`."""
+    if room_index is None:
+        room_index = RoomIndex.for_problem(problem)
+    availability, free_cells = {}, {}
+    masks, hours, section_of, teacher_of, by_teacher, by_section = {}, {}, {}, {}, {}, {}
+    for section in problem.sections:
+        for w in section.workloads:
+            if w.teacher_id not in availability:
+                availability[w.teacher_id] = availability_mask(problem.teachers[w.teacher_id], occupancy)
+            course_type = problem.courses[w.course_id].course_type
+            masks[w.id] = (availability[w.teacher_id]
+                           & ~occupancy.teachers.get(w.teacher_id, 0)
+                           & ~occupancy.sections.get(section.id, 0)
+                           & _free_cells(occupancy, room_index, course_type, section.student_count, free_cells))
+            hours[w.id] = w.hours_per_week
+            section_of[w.id] = section
+            teacher_of[w.id] = w.teacher_id
+            by_teacher.setdefault(w.teacher_id, []).append(w.id)
+            by_section.setdefault(section.id, []).append(w.id)
+
+    # Forced workloads take their cells away from their teacher's and section's other workloads
+    queue = [w_id for w_id in masks if masks[w_id] and masks[w_id].bit_count() == hours[w_id]]
+    while queue:
+        w_id = queue.pop()
+        forced = masks[w_id]
+        for other in set(by_teacher[teacher_of[w_id]]) | set(by_section[section_of[w_id].id]):
+            if other == w_id or not masks[other] & forced:
+                continue
+            masks[other] &= ~forced
+            if masks[other] and masks[other].bit_count() == hours[other]:
+                queue.append(other)
+
+    warnings = []
+    for section in problem.sections:
+        for w in section.workloads:
+            cells = masks[w.id].bit_count()
+            if cells < w.hours_per_week:
+                warnings.append(f"{problem.courses[w.course_id].name} in {section.name} needs "
+                                f"{w.hours_per_week} hours but only {cells} cells are feasible")
+        labs = [w for w in section.workloads if problem.courses[w.course_id].course_type == 'Lab']
+        groups = [(section.workloads, "")]
+        if labs and len(labs) < len(section.workloads):
+            groups.append((labs, "Lab "))
+        for group, label in groups:
+            needed = sum(w.hours_per_week for w in group)
+            cells = _union(masks[w.id] for w in group).bit_count()
+            if len(group) > 1 and cells < needed:
+                warnings.append(f"{section.name} needs {needed} {label}hours but only {cells} cells are feasible")
+    for teacher_id, w_ids in by_teacher.items():
+        needed = sum(hours[w_id] for w_id in w_ids)
+        cells = _union(masks[w_id] for w_id in w_ids).bit_count()
+        if len(w_ids) > 1 and cells < needed:
+            warnings.append(f"{problem.teachers[teacher_id].name} needs {needed} hours "
+                            f"but only {cells} cells are feasible")
+    return Domains(masks, warnings)
@@ -0,0 +1,89 @@
+import time
+from collections import Counter, namedtuple
+
+from .domains import availability_mask, build_domains
+from .rooms import RoomIndex
+from .scoring import candidate_mask, default_scorer
+
+Placement = namedtuple('Placement', 'day_index slot_index section_id course_id teacher_id room_id workload_id',
+                       defaults=(None,))
+SolveResult = namedtuple('SolveResult', 'placements errors')
+
+
+def incomplete_message(course, section, allocated_hours, hours_per_week):
+    return f"Incomplete allocation for {course.name} in {section.name} - only {allocated_hours}/{hours_per_week} hours scheduled"
+
+
+def allocation_errors(problem, placements):
+    """Incomplete-allocation errors for a problem, counted from its placements."""
+    placed = Counter(p.workload_id for p in placements)
+    return [
+        incomplete_message(problem.courses[w.course_id], section, placed[w.id], w.hours_per_week)
+        for section in problem.sections
+        for w in section.workloads
+        if placed[w.id] < w.hours_per_week
+    ]
+
+
+def solve_greedy(problem, occupancy, room_index=None, scorer=None, progress=None, domains=None, stats=None):
+    """
+    Single greedy pass in hierarchy order.
+    For every workload, score each free (day, timeslot) of its feasible
+    domain by its best room minus the section's gap penalty, then take the
+    highest-scoring cells. `domains` defaults to build_domains() against
+    `occupancy` as passed in.
+    `occupancy` is updated in place as hours are placed; `progress`, if given,
+    is called with the fraction of sections done; `stats`, a RunStats, gets
+    the time spent in conflict checks and room scoring plus work counters.
+    """
+    if room_index is None:
+        room_index = RoomIndex.for_problem(problem)
+    if scorer is None:
+        scorer = default_scorer(occupancy)
+    if domains is None:
+        domains = build_domains(problem, occupancy, room_index)
+    placements = []
+    errors = []
+
+    for done, section in enumerate(problem.sections, start=1):
+        for workload in section.workloads:
+            teacher = problem.teachers[workload.teacher_id]
+            course = problem.courses[workload.course_id]
+            allocated_hours = 0
+
+            # Feasible cells where teacher/section are still free,
+            # scored by best free room minus gap penalty (highest first)
+            if stats is not None:
+                started = time.perf_counter()
+            candidates = candidate_mask(occupancy, domains.masks[workload.id], teacher.id, section.id)
+            if stats is not None:
+                checked = time.perf_counter()
+            possible_slots = scorer(occupancy, room_index, candidates,
+                                    course.course_type, section.student_count, section.id)
+            if stats is not None:
+                stats.add_time('conflict_checks', checked - started)
+                stats.add_time('room_scoring', time.perf_counter() - checked)
+                open_cells = candidates.bit_count()
+                stats.count('workloads_considered')
+                stats.count('candidate_cells', open_cells)
+                stats.count('rooms_scored', open_cells * len(room_index.eligible(course.course_type,
+                                                                                  section.student_count)))
+
+            for cell, room, _ in possible_slots:
+                if allocated_hours >= workload.hours_per_week:
+                    break
+
+                day, slot = occupancy.position(cell)
+                placements.append(Placement(day, slot, section.id, course.id, teacher.id, room.id, workload.id))
+                occupancy.book_cell(cell, teacher.id, room.id, section.id)
+                allocated_hours += 1
+
+            if allocated_hours < workload.hours_per_week:
+                errors.append(incomplete_message(course, section, allocated_hours, workload.hours_per_week))
+
+        if progress:
+            progress(done / len(problem.sections))
+
+    if stats is not None:
+        stats.count('placements', len(placements))
+    return SolveResult(placements, errors)
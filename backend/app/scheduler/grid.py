@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+
+from .. import db
+from ..models import Department, TimeGrid
+
+DEFAULT_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+DEFAULT_TIMESLOTS = ('09:00-10:00', '10:00-11:00', '11:00-12:00', '01:00-02:00', '02:00-03:00')
+
+
+@dataclass(frozen=True)
+class GridSpec:
+    """Detached time grid: day labels, teachable slot labels and all periods (for display)."""
+    id: int
+    name: str
+    days: tuple
+    slots: tuple
+    periods: tuple = ()
+    breaks: tuple = ()
+
+    @property
+    def shape(self):
+        return len(self.days), len(self.slots)
+
+    def day_index(self, label):
+        try:
+            return self.days.index(label)
+        except ValueError:
+            return None
+
+    def slot_index(self, label):
+        try:
+            return self.slots.index(label)
+        except ValueError:
+            return None
+
+    def label(self, day_index, slot_index):
+        """Human-readable (day, timeslot) for integer positions."""
+        return self.days[day_index], self.slots[slot_index]
+
+    def positions(self, availability):
+        """
+        Convert a {day: [slot, ...]} availability dict into a frozenset of
+        (day_index, slot_index). Integer indices are accepted as well as
+        labels; anything not on this grid is dropped.
+        """
+        cells = set()
+        for day, slots in availability.items():
+            d = int(day) if str(day).isdigit() else self.day_index(day)
+            if d is None or d >= len(self.days):
+                continue
+            for slot in slots:
+                s = slot if isinstance(slot, int) else self.slot_index(slot)
+                if s is not None and 0 <= s < len(self.slots):
+                    cells.add((d, s))
+        return frozenset(cells)
+
+
+DEFAULT_GRID = GridSpec(None, 'Default', DEFAULT_DAYS, DEFAULT_TIMESLOTS, DEFAULT_TIMESLOTS)
+
+
+class GridMismatchError(ValueError):
+    """A department grid whose teachable cells differ from the default grid's."""
+
+
+def check_compatible(grid, default):
+    """
+    Raise GridMismatchError unless `grid` has the days and teachable slots of
+    `default`. Departments share teachers and rooms, and their timetables are
+    compared by (day_index, slot_index), so an index must name the same cell
+    on every grid; variants may only differ in name and where breaks fall.
+    """
+    if grid.days != default.days:
+        raise GridMismatchError(f"Grid {grid.name!r} has days {list(grid.days)}, "
+                                f"the default grid {list(default.days)}")
+    if grid.slots != default.slots:
+        raise GridMismatchError(f"Grid {grid.name!r} has teachable periods {list(grid.slots)}, "
+                                f"the default grid {list(default.slots)}")
+
+
+def grid_spec(grid):
+    """GridSpec for a TimeGrid row."""
+    return GridSpec(grid.id, grid.name, tuple(grid.days), tuple(grid.slots),
+                    tuple(grid.periods), tuple(grid.breaks or ()))
+
+
+def load_grid(dept_id=None):
+    """
+    Time grid a department schedules on: its own variant if it has one,
+    else the grid marked default, else the built-in Monday-Friday grid.
+    """
+    grid = None
+    if dept_id is not None:
+        grid = db.session.execute(
+            db.select(TimeGrid).join(Department, Department.time_grid_id == TimeGrid.id)
+            .where(Department.id == dept_id)
+        ).scalar_one_or_none()
+    if grid is None:
+        grid = db.session.execute(
+            db.select(TimeGrid).where(TimeGrid.is_default.is_(True)).order_by(TimeGrid.id).limit(1)
+        ).scalar_one_or_none()
+    return grid_spec(grid) if grid is not None else DEFAULT_GRID
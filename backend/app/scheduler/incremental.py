@@ -0,0 +1,132 @@
+"""
+Incremental re-scheduling: rip up and re-solve only what a change touches.
+
+A change is described by the sections, teachers, rooms or workloads it
+affects. Those are widened to the set of workloads whose hours may move,
+their entries are deleted, and the greedy solver places them again against
+the frozen rest of the campus timetable. Everyone else's entries stay put.
+"""
+from sqlalchemy import delete, or_
+from sqlalchemy.exc import IntegrityError
+
+from .. import db
+from ..models import Batch, Program, Section, TimetableEntry, Workload
+from .greedy import solve_greedy
+from .occupancy import OccupancyIndex
+from .persistence import DEFAULT_CHUNK_SIZE, bump_timetable_version, write_placements
+from .pipeline import GenerationError
+from .problem import build_problem
+from .projections import no_owners, placement_owners, refresh_projections
+
+
+def affected_workloads(dept_id, section_ids=(), teacher_ids=(), room_ids=(), workload_ids=()):
+    """
+    Workloads of the department touched by a change, as {workload_id: section_id}:
+    every workload of a changed section, every workload taught by a changed
+    teacher, every workload with an hour in a changed room, and the changed
+    workloads themselves.
+    """
+    conditions = []
+    if section_ids:
+        conditions.append(Workload.section_id.in_(list(section_ids)))
+    if teacher_ids:
+        conditions.append(Workload.teacher_id.in_(list(teacher_ids)))
+    if workload_ids:
+        conditions.append(Workload.id.in_(list(workload_ids)))
+    if room_ids:
+        in_rooms = (
+            db.select(TimetableEntry.id)
+            .where(TimetableEntry.department_id == dept_id,
+                   TimetableEntry.room_id.in_(list(room_ids)),
+                   TimetableEntry.section_id == Workload.section_id,
+                   TimetableEntry.course_id == Workload.course_id,
+                   TimetableEntry.teacher_id == Workload.teacher_id)
+        )
+        conditions.append(in_rooms.exists())
+    if not conditions:
+        return {}
+
+    rows = db.session.execute(
+        db.select(Workload.id, Workload.section_id)
+        .join(Section).join(Batch).join(Program)
+        .where(Program.department_id == dept_id, or_(*conditions))
+    )
+    return dict(rows.all())
+
+
+def _rip_up(dept_id, workload_keys, section_ids):
+    """
+    Entries to delete: those belonging to an affected workload, plus orphans
+    in affected sections that no longer match any workload.
+    Returns [(id, day_index, slot_index, teacher_id, room_id, section_id)].
+    """
+    live_keys = set(db.session.execute(
+        db.select(Workload.section_id, Workload.course_id, Workload.teacher_id)
+        .where(Workload.section_id.in_(list(section_ids)))
+    ).all())
+    rows = db.session.execute(
+        db.select(TimetableEntry.id, TimetableEntry.day_index, TimetableEntry.slot_index,
+                  TimetableEntry.section_id, TimetableEntry.course_id,
+                  TimetableEntry.teacher_id, TimetableEntry.room_id)
+        .where(TimetableEntry.department_id == dept_id, TimetableEntry.section_id.in_(list(section_ids)))
+    )
+    ripped = []
+    for e_id, day, slot, section_id, course_id, teacher_id, room_id in rows:
+        key = (section_id, course_id, teacher_id)
+        if key in workload_keys or key not in live_keys:
+            ripped.append((e_id, day, slot, teacher_id, room_id, section_id))
+    return ripped
+
+
+def reschedule(dept_id, section_ids=(), teacher_ids=(), room_ids=(), workload_ids=(),
+               chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Re-solve the neighbourhood of a change and commit only the delta.
+    Returns the removed/added counts and any incomplete-allocation errors.
+    """
+    affected = affected_workloads(dept_id, section_ids, teacher_ids, room_ids, workload_ids)
+    # Changed sections are rebuilt even if they no longer have any workload
+    touched_sections = set(affected.values()) | set(section_ids)
+
+    problem = build_problem(dept_id, section_ids=touched_sections, workload_ids=affected)
+    if problem is None:
+        raise GenerationError('Department not found', 404)
+
+    workload_keys = {(w.section_id, w.course_id, w.teacher_id) for w in problem.workloads}
+    ripped = _rip_up(dept_id, workload_keys, touched_sections) if touched_sections else []
+
+    # Frozen rest of the campus: everything except the ripped-up entries
+    occupancy = OccupancyIndex.load(*problem.grid.shape)
+    for _, day, slot, teacher_id, room_id, section_id in ripped:
+        occupancy.release(day, slot, teacher_id, room_id, section_id)
+
+    placements, errors = solve_greedy(problem, occupancy)
+
+    try:
+        if ripped:
+            db.session.execute(
+                delete(TimetableEntry)
+                .where(TimetableEntry.id.in_([r[0] for r in ripped]))
+                .execution_options(synchronize_session=False)
+            )
+        write_placements(dept_id, placements, chunk_size)
+        bump_timetable_version([dept_id])
+        owners = placement_owners(placements)
+        for _, _, _, teacher_id, room_id, section_id in ripped:
+            owners['teacher'].add(teacher_id)
+            owners['room'].add(room_id)
+            owners['section'].add(section_id)
+        refresh_projections(owners)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise GenerationError("Timetable changed during re-scheduling, please retry", 409)
+
+    return {
+        "status": "success" if not errors else "partial_success",
+        "sections": sorted(touched_sections),
+        "workloads": len(problem.workloads),
+        "removed": len(ripped),
+        "added": len(placements),
+        "errors": errors
+    }
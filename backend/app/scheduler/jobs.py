@@ -0,0 +1,181 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import or_, update
+from sqlalchemy.exc import OperationalError
+
+from .. import db
+from ..models import GenerationJob
+from .campus import generate_campus
+from .persistence import DEFAULT_CHUNK_SIZE
+from .pipeline import GenerationError, generate_department
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class _AppJobState:
+    def __init__(self):
+        self.executor = None
+        self.progress = {}
+        self.resumed = False
+        self.lock = threading.Lock()
+
+
+class JobRunner:
+    """
+    Runs generation jobs on a bounded thread pool (GENERATION_WORKERS threads,
+    created on first use; 0 runs jobs inline in the submitting request).
+
+    Rows in `generation_jobs` are the source of truth so queued work survives
+    a restart. Live progress of jobs running in this process is kept in
+    memory so the solver never writes while it works.
+
+    A running job is leased to the run that claimed it for
+    GENERATION_LEASE_SECONDS; a heartbeat thread renews the lease on its own
+    connection while the job runs. Only jobs whose lease has expired are
+    taken to be orphaned, so processes sharing the database never re-queue
+    each other's work.
+    """
+
+    def init_app(self, app):
+        app.extensions['generation_jobs'] = _AppJobState()
+        app.before_request(self._resume_once)
+
+    def _state(self, app=None):
+        return (app or current_app).extensions['generation_jobs']
+
+    def submit(self, job_id):
+        app = current_app._get_current_object()
+        state = self._state(app)
+        workers = app.config.get('GENERATION_WORKERS', 2)
+        if workers <= 0:
+            self._run(app, job_id)
+            return
+        with state.lock:
+            if state.executor is None:
+                state.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='generation')
+        state.executor.submit(self._run, app, job_id)
+
+    def progress(self, job_id):
+        """In-process progress of a running job, or None if it is not running here."""
+        return self._state().progress.get(job_id)
+
+    def resume_pending(self):
+        """
+        Re-queue jobs left behind by a dead process: queued jobs, and running
+        jobs whose lease has expired.
+        """
+        db.session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.state == 'running',
+                   or_(GenerationJob.lease_expires_at.is_(None), GenerationJob.lease_expires_at < _utcnow()))
+            .values(state='queued', progress=0.0, lease_owner=None, lease_expires_at=None)
+        )
+        db.session.commit()
+        pending = db.session.scalars(
+            db.select(GenerationJob.id).where(GenerationJob.state == 'queued').order_by(GenerationJob.id)
+        ).all()
+        for job_id in pending:
+            self.submit(job_id)
+        return pending
+
+    def _resume_once(self):
+        state = self._state()
+        with state.lock:
+            if state.resumed:
+                return
+            state.resumed = True
+        try:
+            self.resume_pending()
+        except OperationalError:
+            # generation_jobs table not migrated yet
+            db.session.rollback()
+
+    def _heartbeat(self, app, job_id, owner, stop):
+        """Renew the lease of `job_id` every third of its length until `stop` is set."""
+        lease = app.config.get('GENERATION_LEASE_SECONDS', 60)
+        with app.app_context():
+            while not stop.wait(lease / 3):
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(
+                            update(GenerationJob)
+                            .where(GenerationJob.id == job_id, GenerationJob.lease_owner == owner)
+                            .values(lease_expires_at=_utcnow() + timedelta(seconds=lease))
+                        )
+                except OperationalError:
+                    # Database busy; the lease outlives a missed beat
+                    logger.warning("Could not renew the lease of generation job %s", job_id)
+
+    def _run(self, app, job_id):
+        state = self._state(app)
+        with app.app_context():
+            # Claim the job atomically so two workers never run it twice
+            owner = uuid.uuid4().hex
+            lease = app.config.get('GENERATION_LEASE_SECONDS', 60)
+            now = _utcnow()
+            claimed = db.session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id, GenerationJob.state == 'queued')
+                .values(state='running', started_at=now, lease_owner=owner,
+                        lease_expires_at=now + timedelta(seconds=lease))
+            ).rowcount
+            db.session.commit()
+            if claimed != 1:
+                return
+
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(app, job_id, owner, stop),
+                                         name=f'generation-lease-{job_id}', daemon=True)
+            heartbeat.start()
+            job = db.session.get(GenerationJob, job_id)
+            params = dict(job.params or {})
+            state.progress[job_id] = 0.0
+            options = dict(
+                chunk_size=app.config.get('TIMETABLE_WRITE_CHUNK_SIZE', DEFAULT_CHUNK_SIZE),
+                progress=lambda fraction: state.progress.__setitem__(job_id, fraction),
+            )
+            try:
+                if job.department_id is None:
+                    # Campus-wide job: department list lives in params
+                    result = generate_campus(
+                        params.pop('department_ids', None),
+                        processes=app.config.get('CAMPUS_GENERATION_PROCESSES'),
+                        **options, **params
+                    )
+                else:
+                    result = generate_department(job.department_id, **options, **params)
+                outcome, error = 'succeeded', None
+            except GenerationError as e:
+                result, outcome, error = None, 'failed', e.message
+            except Exception as e:
+                logger.exception("Generation job %s failed", job_id)
+                db.session.rollback()
+                result, outcome, error = None, 'failed', str(e)
+            finally:
+                progress = state.progress.pop(job_id, 0.0)
+                stop.set()
+                heartbeat.join()
+
+            # Only the lease holder records the outcome; a job reclaimed meanwhile belongs to its new run
+            finished = db.session.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id, GenerationJob.lease_owner == owner)
+                .values(state=outcome, result=result, error=error,
+                        progress=1.0 if outcome == 'succeeded' else progress,
+                        finished_at=_utcnow(), lease_owner=None, lease_expires_at=None)
+            ).rowcount
+            db.session.commit()
+            if finished != 1:
+                logger.warning("Generation job %s lost its lease before finishing", job_id)
+
+
+generation_jobs = JobRunner()
@@ -0,0 +1,214 @@
+"""
+Local-search post-optimization of a solved timetable (simulated annealing).
+
+The objective is the soft-constraint quality the greedy pass only estimates:
+total room suitability of every placement minus the idle slots each section
+has between its first and last class of a day. A move sends one hour to
+another (cell, room); if one of our own hours already holds that (cell, room)
+the two are swapped, which also covers room swaps inside one cell. Bookings
+of other departments never move.
+
+Every move is scored by its delta alone: the room-score difference of the
+hours that move plus the gap change of the (at most two) section-days they
+touch, all read from the occupancy bitmaps. Accepted moves are journaled
+since the best objective seen, so the search ends on the best timetable by
+undoing the tail instead of copying snapshots.
+"""
+import math
+import random
+import time
+from collections import namedtuple
+
+from .domains import availability_mask
+from .rooms import RoomIndex
+
+DEFAULT_TIME_LIMIT = 2.0  # seconds
+# Annealing temperature, in objective points, at the start and the end of the budget
+START_TEMPERATURE = 2.0
+END_TEMPERATURE = 0.05
+# Moves between clock checks / temperature updates
+CHECK_EVERY = 2000
+
+OptimizeResult = namedtuple('OptimizeResult', 'placements before after evaluated accepted seconds')
+
+
+def day_gaps(bits):
+    """Idle slots between the first and last booked slot of one day's bitmap."""
+    if not bits:
+        return 0
+    low = (bits & -bits).bit_length() - 1
+    return bits.bit_length() - low - bits.bit_count()
+
+
+def section_gaps(section_mask, day_count, slot_count):
+    day_mask = (1 << slot_count) - 1
+    return sum(day_gaps(section_mask >> (day * slot_count) & day_mask) for day in range(day_count))
+
+
+def objective(problem, placements, occupancy, room_index=None):
+    """
+    Room suitability of every placement minus the section gaps, computed from
+    scratch (higher is better). Gaps are read from `occupancy`, which must
+    hold the placements.
+    """
+    if room_index is None:
+        room_index = RoomIndex.for_problem(problem)
+    students = {s.id: s.student_count for s in problem.sections}
+    total = 0
+    for p in placements:
+        eligible = room_index.eligible(problem.courses[p.course_id].course_type, students[p.section_id])
+        total += next(score for r, score in eligible if r.id == p.room_id)
+    for section_id in students:
+        total -= section_gaps(occupancy.sections.get(section_id, 0), occupancy.day_count, occupancy.slot_count)
+    return total
+
+
+def optimize(problem, occupancy, placements, room_index=None, time_limit=DEFAULT_TIME_LIMIT, seed=0):
+    """
+    Anneal `placements` (a solver result already booked in `occupancy`)
+    for `time_limit` seconds. `occupancy` is updated in place to match the
+    returned placements, which are never worse than the input.
+    """
+    start = time.perf_counter()
+    if room_index is None:
+        room_index = RoomIndex.for_problem(problem)
+    before = objective(problem, placements, occupancy, room_index)
+    n = len(placements)
+    if not n or time_limit <= 0:
+        return OptimizeResult(list(placements), before, before, 0, 0, 0.0)
+
+    rnd = random.Random(seed)
+    slot_count = occupancy.slot_count
+    size = occupancy.size
+    day_mask = (1 << slot_count) - 1
+    teachers, rooms, sections = occupancy.teachers, occupancy.rooms, occupancy.sections
+
+    # Per placement: current cell and room, fixed teacher/section/availability/room scores
+    students = {s.id: s.student_count for s in problem.sections}
+    scores_by_class, availability = {}, {}
+    cell, room, teacher, section, available, scores, room_ids = [], [], [], [], [], [], []
+    at = {}
+    for i, p in enumerate(placements):
+        course_type = problem.courses[p.course_id].course_type
+        key = ('Lab' if course_type == 'Lab' else 'Theory', students[p.section_id])
+        if key not in scores_by_class:
+            eligible = room_index.eligible(*key)
+            scores_by_class[key] = ({r.id: s for r, s in eligible}, [r.id for r, _ in eligible])
+        if p.teacher_id not in availability:
+            availability[p.teacher_id] = availability_mask(problem.teachers[p.teacher_id], occupancy)
+        c = occupancy.cell(p.day_index, p.slot_index)
+        cell.append(c)
+        room.append(p.room_id)
+        teacher.append(p.teacher_id)
+        section.append(p.section_id)
+        available.append(availability[p.teacher_id])
+        scores.append(scores_by_class[key][0])
+        room_ids.append(scores_by_class[key][1])
+        at[p.room_id, c] = i
+
+    def gap_delta(section_id, old, new):
+        """Objective change (negated gaps) of moving a section's hour from `old` to `new`."""
+        mask = sections[section_id]
+        moved = mask & ~(1 << old) | 1 << new
+        d_old, d_new = old // slot_count, new // slot_count
+        delta = (day_gaps(mask >> d_old * slot_count & day_mask)
+                 - day_gaps(moved >> d_old * slot_count & day_mask))
+        if d_new != d_old:
+            delta += (day_gaps(mask >> d_new * slot_count & day_mask)
+                      - day_gaps(moved >> d_new * slot_count & day_mask))
+        return delta
+
+    def apply(i, new_cell, new_room, j):
+        """Move hour i to (new_cell, new_room); hour j, if any, takes i's old place."""
+        old_cell, old_room = cell[i], room[i]
+        if j is None:
+            old_bit, new_bit = 1 << old_cell, 1 << new_cell
+            rooms[old_room] &= ~old_bit
+            rooms[new_room] = rooms.get(new_room, 0) | new_bit
+            if new_cell != old_cell:
+                teachers[teacher[i]] = teachers[teacher[i]] & ~old_bit | new_bit
+                sections[section[i]] = sections[section[i]] & ~old_bit | new_bit
+            del at[old_room, old_cell]
+            cell[i], room[i] = new_cell, new_room
+            at[new_room, new_cell] = i
+            return
+        # Rooms stay booked in both cells; only teachers and sections trade places
+        if new_cell != old_cell:
+            old_bit, new_bit = 1 << old_cell, 1 << new_cell
+            for table, a, b in ((teachers, teacher[i], teacher[j]), (sections, section[i], section[j])):
+                if a != b:
+                    table[a] = table[a] & ~old_bit | new_bit
+                    table[b] = table[b] & ~new_bit | old_bit
+            cell[i], cell[j] = new_cell, old_cell
+        room[i], room[j] = new_room, old_room
+        at[new_room, new_cell] = i
+        at[old_room, old_cell] = j
+
+    current = best = before
+    journal = []
+    evaluated = accepted = 0
+    temperature = START_TEMPERATURE
+    deadline = start + time_limit
+    cooling = math.log(END_TEMPERATURE / START_TEMPERATURE)
+    now = start
+
+    while now < deadline:
+        for _ in range(CHECK_EVERY):
+            i = rnd.randrange(n)
+            c1, r1 = cell[i], room[i]
+            if rnd.random() < 0.5:
+                c2, r2 = rnd.randrange(size), r1
+            else:
+                c2, r2 = c1, rnd.choice(room_ids[i])
+            if c2 == c1 and r2 == r1:
+                continue
+            evaluated += 1
+            j = at.get((r2, c2))
+            t_i, s_i = teacher[i], section[i]
+
+            if j is None:
+                if rooms.get(r2, 0) >> c2 & 1:
+                    continue  # booked by another department
+                delta = scores[i][r2] - scores[i][r1]
+                if c2 != c1:
+                    if (not available[i] >> c2 & 1 or teachers[t_i] >> c2 & 1
+                            or sections[s_i] >> c2 & 1):
+                        continue
+                    delta += gap_delta(s_i, c1, c2)
+            else:
+                score_j = scores[j].get(r1)
+                if score_j is None:
+                    continue
+                delta = scores[i][r2] - scores[i][r1] + score_j - scores[j][r2]
+                if c2 != c1:
+                    t_j, s_j = teacher[j], section[j]
+                    if (not available[i] >> c2 & 1 or not available[j] >> c1 & 1
+                            or (t_i != t_j and (teachers[t_i] >> c2 & 1 or teachers[t_j] >> c1 & 1))
+                            or (s_i != s_j and (sections[s_i] >> c2 & 1 or sections[s_j] >> c1 & 1))):
+                        continue
+                    if s_i != s_j:
+                        delta += gap_delta(s_i, c1, c2) + gap_delta(s_j, c2, c1)
+
+            if delta < 0 and rnd.random() >= math.exp(delta / temperature):
+                continue
+            apply(i, c2, r2, j)
+            accepted += 1
+            current += delta
+            if current > best:
+                best = current
+                journal.clear()
+            else:
+                journal.append((i, c1, r1, j))
+
+        now = time.perf_counter()
+        temperature = START_TEMPERATURE * math.exp(cooling * min(1.0, (now - start) / time_limit))
+
+    # Back to the best timetable seen
+    for i, c1, r1, j in reversed(journal):
+        apply(i, c1, r1, j)
+
+    optimized = [
+        p._replace(day_index=cell[i] // slot_count, slot_index=cell[i] % slot_count, room_id=room[i])
+        for i, p in enumerate(placements)
+    ]
+    return OptimizeResult(optimized, before, best, evaluated, accepted, round(time.perf_counter() - start, 4))
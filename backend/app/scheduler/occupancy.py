@@ -0,0 +1,116 @@
+from .. import db
+from ..models import TimetableEntry
+
+
+class OccupancyIndex:
+    """
+    In-memory view of which (day, timeslot) cells are taken for every
+    teacher, room and section.
+
+    Each resource maps to an integer bitmap over the day x timeslot grid
+    (bit ``day_index * slot_count + slot_index``), so a conflict check is a
+    dictionary lookup plus a bit test instead of a database round trip.
+    """
+
+    def __init__(self, day_count, slot_count):
+        self.day_count = day_count
+        self.slot_count = slot_count
+        self.teachers = {}
+        self.rooms = {}
+        self.sections = {}
+
+    @classmethod
+    def load(cls, day_count, slot_count, exclude_department_ids=()):
+        """
+        Build the index from every stored TimetableEntry in one query.
+        Bookings of all departments are included because rooms are shared
+        across the whole campus; `exclude_department_ids` leaves out the
+        timetables that are about to be replaced.
+        """
+        index = cls(day_count, slot_count)
+        rows = db.session.query(
+            TimetableEntry.day_index, TimetableEntry.slot_index,
+            TimetableEntry.teacher_id, TimetableEntry.room_id, TimetableEntry.section_id
+        )
+        if exclude_department_ids:
+            rows = rows.filter(TimetableEntry.department_id.not_in(list(exclude_department_ids)))
+        for day, slot, teacher_id, room_id, section_id in rows:
+            cell = index.cell(day, slot)
+            if cell is not None:
+                index.book_cell(cell, teacher_id, room_id, section_id)
+        return index
+
+    def copy(self):
+        clone = OccupancyIndex(self.day_count, self.slot_count)
+        clone.teachers = dict(self.teachers)
+        clone.rooms = dict(self.rooms)
+        clone.sections = dict(self.sections)
+        return clone
+
+    @property
+    def size(self):
+        return self.day_count * self.slot_count
+
+    @property
+    def full_mask(self):
+        return (1 << self.size) - 1
+
+    def cell(self, day, slot):
+        """Grid position of a (day_index, slot_index) pair, or None if it is off-grid."""
+        if 0 <= day < self.day_count and 0 <= slot < self.slot_count:
+            return day * self.slot_count + slot
+        return None
+
+    def position(self, cell):
+        """(day_index, slot_index) pair for a grid position."""
+        return divmod(cell, self.slot_count)
+
+    def mask_of(self, pairs):
+        """Bitmap of the given (day_index, slot_index) pairs; off-grid pairs are ignored."""
+        mask = 0
+        for day, slot in pairs:
+            cell = self.cell(day, slot)
+            if cell is not None:
+                mask |= 1 << cell
+        return mask
+
+    def conflict_cell(self, cell, teacher_id=None, room_id=None, section_id=None):
+        """Conflict message for a grid position ("Teacher occupied", ...), or None."""
+        bit = 1 << cell
+        if teacher_id and self.teachers.get(teacher_id, 0) & bit:
+            return "Teacher occupied"
+        if room_id and self.rooms.get(room_id, 0) & bit:
+            return "Room occupied"
+        if section_id and self.sections.get(section_id, 0) & bit:
+            return "Section occupied"
+        return None
+
+    def conflict(self, day, slot, teacher_id=None, room_id=None, section_id=None):
+        cell = self.cell(day, slot)
+        if cell is None:
+            return None
+        return self.conflict_cell(cell, teacher_id, room_id, section_id)
+
+    def book_cell(self, cell, teacher_id, room_id, section_id):
+        """Mark a cell as used by the given teacher, room and section."""
+        bit = 1 << cell
+        self.teachers[teacher_id] = self.teachers.get(teacher_id, 0) | bit
+        self.rooms[room_id] = self.rooms.get(room_id, 0) | bit
+        self.sections[section_id] = self.sections.get(section_id, 0) | bit
+
+    def book(self, day, slot, teacher_id, room_id, section_id):
+        cell = self.cell(day, slot)
+        if cell is not None:
+            self.book_cell(cell, teacher_id, room_id, section_id)
+
+    def release_cell(self, cell, teacher_id, room_id, section_id):
+        """Undo a booking, e.g. when an entry is moved or ripped up."""
+        mask = ~(1 << cell)
+        self.teachers[teacher_id] = self.teachers.get(teacher_id, 0) & mask
+        self.rooms[room_id] = self.rooms.get(room_id, 0) & mask
+        self.sections[section_id] = self.sections.get(section_id, 0) & mask
+
+    def release(self, day, slot, teacher_id, room_id, section_id):
+        cell = self.cell(day, slot)
+        if cell is not None:
+            self.release_cell(cell, teacher_id, room_id, section_id)
@@ -0,0 +1,67 @@
+import time
+from collections import namedtuple
+
+from sqlalchemy import delete, insert, update
+
+from .. import db
+from ..models import Department, TimetableEntry
+
+DEFAULT_CHUNK_SIZE = 1000
+
+WriteStats = namedtuple('WriteStats', 'rows chunks seconds peak_kb')
+
+
+def delete_department_entries(dept_id):
+    """Drop a department's timetable with one DELETE, skipping session synchronisation."""
+    result = db.session.execute(
+        delete(TimetableEntry)
+        .where(TimetableEntry.department_id == dept_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def bump_timetable_version(dept_ids):
+    """
+    Mark the timetables of `dept_ids` (a list or a select of ids) as changed,
+    invalidating their cached views. Call inside the writing transaction.
+    """
+    db.session.execute(
+        update(Department)
+        .where(Department.id.in_(dept_ids))
+        .values(timetable_version=Department.timetable_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def write_placements(dept_id, placements, chunk_size=DEFAULT_CHUNK_SIZE, profiler=None):
+    """
+    Insert solver placements as plain mappings, `chunk_size` rows per
+    executemany batch, without building ORM objects.
+    Returns WriteStats with the wall time of the stage; peak traced memory
+    is only measured under a stats.Profile and is None otherwise.
+    """
+    if profiler is not None:
+        profiler.reset_peak()
+    start = time.perf_counter()
+
+    chunks = 0
+    statement = insert(TimetableEntry)
+    for offset in range(0, len(placements), chunk_size):
+        db.session.execute(statement, [
+            {
+                'day_index': p.day_index,
+                'slot_index': p.slot_index,
+                'section_id': p.section_id,
+                'course_id': p.course_id,
+                'teacher_id': p.teacher_id,
+                'room_id': p.room_id,
+                'department_id': dept_id,
+            }
+            for p in placements[offset:offset + chunk_size]
+        ])
+        chunks += 1
+
+    seconds = time.perf_counter() - start
+    peak_kb = round(profiler.stage_peak() / 1024, 1) if profiler is not None else None
+    return WriteStats(len(placements), chunks, round(seconds, 4), peak_kb)
@@ -0,0 +1,115 @@
+from contextlib import nullcontext
+
+from sqlalchemy.exc import IntegrityError
+
+from .. import db
+from ..models import TimetableEntry
+from .backtracking import solve_backtracking
+from .domains import build_domains
+from .greedy import solve_greedy
+from .local_search import optimize
+from .occupancy import OccupancyIndex
+from .persistence import DEFAULT_CHUNK_SIZE, bump_timetable_version, delete_department_entries, write_placements
+from .projections import entry_owners, placement_owners, refresh_projections
+from .problem import build_problem
+from .rooms import RoomIndex
+from .stats import Profile, RunStats, log_stats
+
+
+class GenerationError(Exception):
+    """Generation could not run; carries the HTTP status the API should answer with."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+# Solver engines by name; each takes (problem, occupancy, room_index=, progress=, domains=, stats=)
+# and returns a SolveResult
+ENGINES = {
+    'greedy': solve_greedy,
+    'backtracking': solve_backtracking,
+}
+DEFAULT_ENGINE = 'greedy'
+
+
+def get_engine(name):
+    try:
+        return ENGINES[name]
+    except (KeyError, TypeError):
+        raise GenerationError(f"Unknown engine: {name}")
+
+
+def optimize_summary(result):
+    """The part of an OptimizeResult reported back to the API."""
+    return {
+        "before": result.before,
+        "after": result.after,
+        "moves_evaluated": result.evaluated,
+        "moves_accepted": result.accepted,
+        "seconds": result.seconds
+    }
+
+
+def generate_department(dept_id, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, engine=DEFAULT_ENGINE,
+                        optimize_seconds=0, profile=False):
+    """
+    Snapshot -> solve -> (optionally) optimize -> replace the department's timetable.
+    `optimize_seconds` > 0 runs the local-search stage on the solved timetable.
+    The solve runs before any write so the database is only locked for the
+    final delete + bulk insert + commit.
+    The result's "stats" holds phase timings and solver counters (see
+    stats.py); `profile` adds a cProfile/tracemalloc summary under "profile".
+    """
+    solve = get_engine(engine)
+    stats = RunStats()
+    with Profile() if profile else nullcontext() as profiler:
+        with stats.phase('load'):
+            problem = build_problem(dept_id)
+            if problem is None:
+                raise GenerationError('Department not found', 404)
+            # Every booking except the timetable being replaced, loaded once
+            occupancy = OccupancyIndex.load(*problem.grid.shape, exclude_department_ids=[dept_id])
+            room_index = RoomIndex.for_problem(problem)
+        with stats.phase('domains'):
+            domains = build_domains(problem, occupancy, room_index)
+        with stats.phase('solve'):
+            placements, errors = solve(problem, occupancy, room_index=room_index, progress=progress,
+                                       domains=domains, stats=stats)
+        optimized = None
+        if optimize_seconds > 0:
+            with stats.phase('optimize'):
+                optimized = optimize(problem, occupancy, placements, room_index, time_limit=optimize_seconds)
+            placements = optimized.placements
+            stats.count('moves_evaluated', optimized.evaluated)
+            stats.count('moves_accepted', optimized.accepted)
+
+        try:
+            with stats.phase('persistence'):
+                owners = entry_owners(TimetableEntry.department_id == dept_id)
+                delete_department_entries(dept_id)
+                write_stats = write_placements(dept_id, placements, chunk_size, profiler)
+                bump_timetable_version([dept_id])
+                refresh_projections(placement_owners(placements, owners))
+            with stats.phase('commit'):
+                db.session.commit()
+        except IntegrityError:
+            # Another writer booked one of our cells since the occupancy snapshot
+            db.session.rollback()
+            raise GenerationError("Timetable changed during generation, please retry", 409)
+
+    result = {
+        "status": "success" if not errors else "partial_success",
+        "entries": len(placements),
+        "errors": errors,
+        "warnings": domains.warnings,
+        "persistence": write_stats._asdict(),
+        "stats": stats.as_dict()
+    }
+    if optimized is not None:
+        result["objective"] = optimize_summary(optimized)
+    if profiler is not None:
+        result["profile"] = profiler.summary()
+    log_stats(engine=engine, department_id=dept_id, entries=len(placements), **result["stats"])
+    return result
@@ -0,0 +1,101 @@
+"""
+Feasibility pre-flight: aggregate capacity checks that need no placement.
+
+Each check compares a demand total against the supply it can never exceed,
+so a failing check proves the department cannot be fully scheduled. Passing
+every check does not prove the opposite; only a solver run can.
+"""
+import time
+
+from sqlalchemy import func
+
+from .. import db
+from ..models import Room, TimetableEntry
+from .domains import availability_mask
+from .occupancy import OccupancyIndex
+from .rooms import RoomIndex
+
+
+def _is_lab(room):
+    return 'lab' in room.room_type.lower()
+
+
+def check_problem(problem, teacher_busy=None, lab_busy=0):
+    """
+    Issues of a SchedulingProblem as a list of dicts. `teacher_busy` maps
+    teacher ids to cells booked outside the department, `lab_busy` counts
+    lab room-slots booked outside it.
+    """
+    teacher_busy = teacher_busy or {}
+    grid = OccupancyIndex(*problem.grid.shape)
+    room_index = RoomIndex(problem.rooms)
+    issues = []
+
+    teacher_hours = {}
+    lab_hours = 0
+    for section in problem.sections:
+        hours = sum(w.hours_per_week for w in section.workloads)
+        if hours > grid.size:
+            issues.append({"check": "section_hours", "section_id": section.id, "section": section.name,
+                           "required": hours, "available": grid.size})
+        course_types = []
+        for w in section.workloads:
+            teacher_hours[w.teacher_id] = teacher_hours.get(w.teacher_id, 0) + w.hours_per_week
+            course_type = 'Lab' if problem.courses[w.course_id].course_type == 'Lab' else 'Theory'
+            if course_type == 'Lab':
+                lab_hours += w.hours_per_week
+            if course_type not in course_types:
+                course_types.append(course_type)
+        for course_type in course_types:
+            if not room_index.eligible(course_type, section.student_count):
+                issues.append({"check": "room_capacity", "section_id": section.id, "section": section.name,
+                               "course_type": course_type, "student_count": section.student_count})
+
+    for teacher_id, hours in teacher_hours.items():
+        teacher = problem.teachers[teacher_id]
+        available = (availability_mask(teacher, grid) & ~teacher_busy.get(teacher_id, 0)).bit_count()
+        if hours > available:
+            issues.append({"check": "teacher_hours", "teacher_id": teacher_id, "teacher": teacher.name,
+                           "required": hours, "available": available})
+
+    lab_slots = sum(1 for room in problem.rooms if _is_lab(room)) * grid.size - lab_busy
+    if lab_hours > lab_slots:
+        issues.append({"check": "lab_capacity", "required": lab_hours, "available": lab_slots})
+    return issues, {"hours": sum(teacher_hours.values()), "lab_hours": lab_hours, "lab_room_slots": lab_slots}
+
+
+def preflight(problem):
+    """
+    Pre-flight report for a department snapshot. Bookings of other
+    departments take two queries: the cells of the department's teachers,
+    and a count of busy lab room-slots.
+    """
+    start = time.perf_counter()
+    grid = OccupancyIndex(*problem.grid.shape)
+    teacher_ids = list(problem.teachers)
+    teacher_busy = {}
+    if teacher_ids:
+        for teacher_id, day, slot in db.session.execute(
+            db.select(TimetableEntry.teacher_id, TimetableEntry.day_index, TimetableEntry.slot_index)
+            .where(TimetableEntry.department_id != problem.department_id,
+                   TimetableEntry.teacher_id.in_(teacher_ids))
+        ):
+            cell = grid.cell(day, slot)
+            if cell is not None:
+                teacher_busy[teacher_id] = teacher_busy.get(teacher_id, 0) | 1 << cell
+    lab_busy = db.session.scalar(
+        db.select(func.count(TimetableEntry.id))
+        .join(Room, Room.id == TimetableEntry.room_id)
+        .where(TimetableEntry.department_id != problem.department_id,
+               func.lower(Room.room_type).contains('lab'),
+               TimetableEntry.day_index < grid.day_count,
+               TimetableEntry.slot_index < grid.slot_count)
+    )
+
+    issues, totals = check_problem(problem, teacher_busy, lab_busy)
+    return {
+        "feasible": not issues,
+        "issues": issues,
+        "summary": {"sections": len(problem.sections), "workloads": len(problem.workloads), **totals},
+        "seconds": round(time.perf_counter() - start, 4)
+    }
@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy.orm import selectinload
+
+from .. import db
+from ..cache import reference_cache
+from ..models import Department, Program, Batch, Section, Teacher, Course, Room, teacher_qualifications
+from .availability import pack
+from .grid import load_grid
+
+
+@dataclass(frozen=True)
+class TeacherSpec:
+    id: int
+    name: str
+    # None means "always available", otherwise a bitmap over the problem's grid cells
+    availability: int = None
+    qualified_course_ids: frozenset = frozenset()
+
+
+@dataclass(frozen=True)
+class CourseSpec:
+    id: int
+    name: str
+    course_type: str
+
+
+@dataclass(frozen=True)
+class RoomSpec:
+    id: int
+    name: str
+    capacity: int
+    room_type: str
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    id: int
+    section_id: int
+    course_id: int
+    teacher_id: int
+    hours_per_week: int
+
+
+@dataclass(frozen=True)
+class SectionSpec:
+    id: int
+    name: str
+    student_count: int
+    workloads: tuple = ()
+
+
+@dataclass(frozen=True)
+class SchedulingProblem:
+    """Everything the solver needs for one department, detached from the session."""
+    department_id: int
+    grid: object             # GridSpec the department schedules on
+    sections: tuple          # SectionSpec in Program -> Batch -> Section order
+    teachers: MappingProxyType
+    courses: MappingProxyType
+    rooms: tuple             # every RoomSpec on campus, in id order
+
+    @property
+    def workloads(self):
+        return [w for section in self.sections for w in section.workloads]
+
+    def __reduce__(self):
+        # MappingProxyType cannot be pickled; ship plain dicts to worker processes
+        return (_restore_problem, (self.department_id, self.grid, self.sections,
+                                   dict(self.teachers), dict(self.courses), self.rooms))
+
+
+def _restore_problem(department_id, grid, sections, teachers, courses, rooms):
+    return SchedulingProblem(department_id, grid, sections,
+                             MappingProxyType(teachers), MappingProxyType(courses), rooms)
+
+
+def _section_spec(section, workload_ids=None):
+    workloads = tuple(
+        WorkloadSpec(w.id, w.section_id, w.course_id, w.teacher_id, w.hours_per_week)
+        for w in sorted(section.workloads, key=lambda w: w.id)
+        if workload_ids is None or w.id in workload_ids
+    )
+    return SectionSpec(section.id, section.name, section.student_count, workloads)
+
+
+def build_problem(dept_id, grid=None, section_ids=None, workload_ids=None):
+    """
+    Snapshot a department's scheduling input with a fixed number of queries:
+    the hierarchy is eager-loaded with selectinload and teachers, qualifications,
+    courses and rooms are each fetched with one set-based query.
+    `grid` defaults to the department's TimeGrid. `section_ids` /
+    `workload_ids` restrict the snapshot to part of the department (used by
+    incremental re-scheduling).
+    Returns None if the department does not exist.
+    """
+    if section_ids is not None:
+        if db.session.get(Department, dept_id) is None:
+            return None
+        dept_id = int(dept_id)
+        workload_ids = set(workload_ids) if workload_ids is not None else None
+        rows = db.session.execute(
+            db.select(Section)
+            .join(Batch).join(Program)
+            .where(Program.department_id == dept_id, Section.id.in_(list(section_ids)))
+            .order_by(Program.id, Batch.id, Section.id)
+            .options(selectinload(Section.workloads))
+        ).scalars()
+        sections = [_section_spec(section, workload_ids) for section in rows]
+        return _assemble(dept_id, sections, grid or load_grid(dept_id))
+
+    dept = db.session.execute(
+        db.select(Department)
+        .where(Department.id == dept_id)
+        .options(
+            selectinload(Department.programs)
+            .selectinload(Program.batches)
+            .selectinload(Batch.sections)
+            .selectinload(Section.workloads)
+        )
+    ).scalar_one_or_none()
+    if dept is None:
+        return None
+
+    sections = []
+    for program in sorted(dept.programs, key=lambda p: p.id):
+        for batch in sorted(program.batches, key=lambda b: b.id):
+            for section in sorted(batch.sections, key=lambda s: s.id):
+                sections.append(_section_spec(section))
+    return _assemble(dept.id, sections, grid or load_grid(dept.id))
+
+
+def _teacher_specs(grid):
+    """TeacherSpec of every teacher, availability resolved on `grid`."""
+    qualifications = {}
+    for teacher_id, course_id in db.session.execute(
+        db.select(teacher_qualifications.c.teacher_id, teacher_qualifications.c.course_id)
+    ):
+        qualifications.setdefault(teacher_id, set()).add(course_id)
+    return {
+        t_id: TeacherSpec(t_id, name, pack(mask, grid), frozenset(qualifications.get(t_id, ())))
+        for t_id, name, mask in db.session.execute(
+            db.select(Teacher.id, Teacher.name, Teacher.availability_mask)
+        )
+    }
+
+
+def _course_specs():
+    return {
+        c_id: CourseSpec(c_id, name, course_type)
+        for c_id, name, course_type in db.session.execute(
+            db.select(Course.id, Course.name, Course.course_type)
+        )
+    }
+
+
+def _room_specs():
+    return tuple(
+        RoomSpec(r_id, name, capacity, room_type or 'Classroom')
+        for r_id, name, capacity, room_type in db.session.execute(
+            db.select(Room.id, Room.name, Room.capacity, Room.room_type).order_by(Room.id)
+        )
+    )
+
+
+def _assemble(dept_id, sections, grid):
+    """
+    Attach teachers, qualifications, courses and rooms to a list of SectionSpecs.
+    Each table is read whole through the reference cache, so repeated
+    snapshots skip the database until one of them changes.
+    """
+    cache = reference_cache()
+    teacher_ids = {w.teacher_id for s in sections for w in s.workloads}
+    course_ids = {w.course_id for s in sections for w in s.workloads}
+
+    all_teachers = cache.get('teacher_specs', ('teacher', 'teacher_qualifications'),
+                             lambda: _teacher_specs(grid), grid)
+    all_courses = cache.get('course_specs', ('course',), _course_specs)
+    rooms = cache.get('room_specs', ('room',), _room_specs)
+
+    return SchedulingProblem(
+        department_id=dept_id,
+        grid=grid,
+        sections=tuple(sections),
+        teachers=MappingProxyType({t_id: all_teachers[t_id] for t_id in teacher_ids if t_id in all_teachers}),
+        courses=MappingProxyType({c_id: all_courses[c_id] for c_id in course_ids if c_id in all_courses}),
+        rooms=rooms,
+    )
@@ -0,0 +1,145 @@
+"""
+Materialized per-teacher, per-room and per-section timetables.
+
+Each projection is one `timetable_projections` row holding an owner's
+weekly grid, serialized and ready to serve, so a per-person view is a
+primary-key lookup that never reads `timetable_entries`. Writers keep them
+current inside their own transaction: they collect the owners of the
+entries they delete (entry_owners) and of the placements they insert
+(placement_owners), then rebuild only those projections
+(refresh_projections). A projection that is not in the table yet is built
+on its first read.
+"""
+import json
+
+from sqlalchemy import delete, insert
+from sqlalchemy.exc import IntegrityError
+
+from .. import db
+from ..models import Course, Room, Section, Teacher, TimetableEntry, TimetableProjection
+from .grid import load_grid
+from .views import timetable_row
+
+KINDS = ('teacher', 'room', 'section')
+OWNER_COLUMNS = {
+    'teacher': TimetableEntry.teacher_id,
+    'room': TimetableEntry.room_id,
+    'section': TimetableEntry.section_id,
+}
+OWNER_MODELS = {'teacher': Teacher, 'room': Room, 'section': Section}
+# Owners per IN query while rebuilding
+IN_CHUNK = 500
+
+
+def no_owners():
+    return {kind: set() for kind in KINDS}
+
+
+def entry_owners(*criteria, owners=None):
+    """Add the teachers, rooms and sections of the entries matching `criteria` to `owners`."""
+    owners = owners if owners is not None else no_owners()
+    for teacher_id, room_id, section_id in db.session.execute(
+        db.select(TimetableEntry.teacher_id, TimetableEntry.room_id, TimetableEntry.section_id)
+        .where(*criteria).distinct()
+    ):
+        owners['teacher'].add(teacher_id)
+        owners['room'].add(room_id)
+        owners['section'].add(section_id)
+    return owners
+
+
+def placement_owners(placements, owners=None):
+    """Add the teachers, rooms and sections of solver placements to `owners`."""
+    owners = owners if owners is not None else no_owners()
+    for p in placements:
+        owners['teacher'].add(p.teacher_id)
+        owners['room'].add(p.room_id)
+        owners['section'].add(p.section_id)
+    return owners
+
+
+def build_projections(kind, owner_ids):
+    """
+    {owner_id: (entry_count, body)} for `owner_ids`, from one joined query
+    per IN_CHUNK owners. Owners without entries get an empty week.
+    """
+    column = OWNER_COLUMNS[kind]
+    weeks = {owner_id: {} for owner_id in owner_ids}
+    counts = dict.fromkeys(owner_ids, 0)
+    serializers = {}
+    owner_ids = list(owner_ids)
+    for start in range(0, len(owner_ids), IN_CHUNK):
+        rows = db.session.execute(
+            db.select(TimetableEntry.id, TimetableEntry.day_index, TimetableEntry.slot_index,
+                      Section.name, Course.name, Teacher.name, Room.name,
+                      TimetableEntry.department_id, column)
+            .join(Section, Section.id == TimetableEntry.section_id)
+            .join(Course, Course.id == TimetableEntry.course_id)
+            .join(Teacher, Teacher.id == TimetableEntry.teacher_id)
+            .join(Room, Room.id == TimetableEntry.room_id)
+            .where(column.in_(owner_ids[start:start + IN_CHUNK]))
+            .order_by(TimetableEntry.day_index, TimetableEntry.slot_index)
+        )
+        for row in rows:
+            dept_id, owner_id = row[7], row[8]
+            if dept_id not in serializers:
+                serializers[dept_id] = timetable_row(load_grid(dept_id))
+            cell = serializers[dept_id](row[:7])
+            cell['department_id'] = dept_id
+            weeks[owner_id].setdefault(cell.pop('day'), []).append(cell)
+            counts[owner_id] += 1
+    return {
+        owner_id: (counts[owner_id], json.dumps({"kind": kind, "id": owner_id, "entries": counts[owner_id],
+                                                 "week": week}))
+        for owner_id, week in weeks.items()
+    }
+
+
+def refresh_projections(owners):
+    """Rebuild the projections of `owners` ({kind: ids}). Call inside the writing transaction."""
+    for kind, owner_ids in owners.items():
+        if not owner_ids:
+            continue
+        built = build_projections(kind, owner_ids)
+        drop_projections(kind, owner_ids)
+        db.session.execute(insert(TimetableProjection), [
+            {'kind': kind, 'owner_id': owner_id, 'entry_count': count, 'body': body}
+            for owner_id, (count, body) in built.items()
+        ])
+
+
+def drop_projections(kind=None, owner_ids=None):
+    """Delete projections: of `owner_ids` of `kind`, of a whole kind, or all of them."""
+    statement = delete(TimetableProjection).execution_options(synchronize_session=False)
+    if kind is not None:
+        statement = statement.where(TimetableProjection.kind == kind)
+    if owner_ids is None:
+        db.session.execute(statement)
+        return
+    owner_ids = list(owner_ids)
+    for start in range(0, len(owner_ids), IN_CHUNK):
+        db.session.execute(statement.where(TimetableProjection.owner_id.in_(owner_ids[start:start + IN_CHUNK])))
+
+
+def projection_body(kind, owner_id):
+    """
+    Serialized timetable of a teacher, room or section, or None if the
+    owner does not exist. Built and stored on the first read.
+    """
+    body = db.session.scalar(
+        db.select(TimetableProjection.body)
+        .where(TimetableProjection.kind == kind, TimetableProjection.owner_id == owner_id)
+    )
+    if body is not None:
+        return body
+    if db.session.get(OWNER_MODELS[kind], owner_id) is None:
+        return None
+    count, body = build_projections(kind, [owner_id])[owner_id]
+    try:
+        db.session.execute(insert(TimetableProjection),
+                           [{'kind': kind, 'owner_id': owner_id, 'entry_count': count, 'body': body}])
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent read or write stored it first
+        db.session.rollback()
+    return body
@@ -0,0 +1,77 @@
+def room_score(room, course_type, student_count):
+    """Calculate room suitability score (0 means the room cannot be used)"""
+    score = 0
+
+    # Capacity check (higher score for better fit)
+    if room.capacity >= student_count:
+        if room.capacity == student_count:
+            score += 10  # Perfect fit
+        elif room.capacity <= student_count * 1.2:
+            score += 5   # Good fit
+        else:
+            score += 2   # Too big but usable
+    else:
+        return 0  # Too small, cannot use
+
+    # Room type check
+    if course_type == 'Lab':
+        if 'lab' in room.room_type.lower():
+            score += 20  # Perfect for lab
+        else:
+            return 0  # Lab course in non-lab room - not allowed
+    else:
+        if 'lab' not in room.room_type.lower():
+            score += 10  # Perfect for theory
+        else:
+            score += 5   # Lab room for theory - acceptable but not ideal
+
+    return score
+
+
+class RoomIndex:
+    """
+    Room suitability resolved once per run.
+    Maps (course_type, student_count) to the eligible rooms sorted by score,
+    best first; rooms with equal scores keep their id order so the first
+    free room in the list is the one the exhaustive scan would have picked.
+    """
+
+    def __init__(self, rooms):
+        self.rooms = tuple(rooms)
+        self._eligible = {}
+        self._columns = {}
+
+    @classmethod
+    def for_problem(cls, problem):
+        index = cls(problem.rooms)
+        for section in problem.sections:
+            for workload in section.workloads:
+                index.eligible(problem.courses[workload.course_id].course_type, section.student_count)
+        return index
+
+    def eligible(self, course_type, student_count):
+        """List of (room, score) pairs usable for this course type and size."""
+        key = ('Lab' if course_type == 'Lab' else 'Theory', student_count)
+        ranked = self._eligible.get(key)
+        if ranked is None:
+            scored = [(room, room_score(room, key[0], student_count)) for room in self.rooms]
+            ranked = tuple(sorted(((r, s) for r, s in scored if s > 0), key=lambda rs: -rs[1]))
+            self._eligible[key] = ranked
+        return ranked
+
+    def columns(self, course_type, student_count):
+        """eligible() as parallel columns (rooms, room ids, scores), for the vectorized scorer."""
+        key = ('Lab' if course_type == 'Lab' else 'Theory', student_count)
+        columns = self._columns.get(key)
+        if columns is None:
+            ranked = self.eligible(*key)
+            columns = self._columns[key] = (tuple(r for r, _ in ranked), tuple(r.id for r, _ in ranked),
+                                            tuple(s for _, s in ranked))
+        return columns
+
+    def best_free(self, course_type, student_count, occupancy, cell):
+        """Highest-scoring room that is free in `cell`, as (room, score) or (None, 0)."""
+        for room, score in self.eligible(course_type, student_count):
+            if not occupancy.conflict_cell(cell, room_id=room.id):
+                return room, score
+        return None, 0
@@ -0,0 +1,90 @@
+"""
+Candidate-cell scoring for one workload.
+
+A scorer returns the cells a workload may use as (cell, room, score) tuples,
+best first. The score is the best free room's suitability minus the section's
+gap penalty; ties keep day-major grid order.
+"""
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+
+# uint64 lanes hold one bit per cell, so the vector path covers grids up to 64 cells
+MAX_VECTOR_CELLS = 64
+
+
+@lru_cache(maxsize=None)
+def _bit_positions(size):
+    return np.arange(size, dtype=np.uint64)
+
+
+def candidate_mask(occupancy, availability_mask, teacher_id, section_id):
+    """Cells where the teacher is available and neither teacher nor section is booked."""
+    return (availability_mask
+            & ~occupancy.teachers.get(teacher_id, 0)
+            & ~occupancy.sections.get(section_id, 0))
+
+
+def section_gap(section_mask, cell, slots_per_day):
+    """
+    Gap penalty of adding `cell` to a section: 0 if the section has nothing
+    on that day yet, otherwise the number of other unused slots that day.
+    """
+    day_start = (cell // slots_per_day) * slots_per_day
+    day_bits = (section_mask >> day_start) & ((1 << slots_per_day) - 1)
+    if not day_bits:
+        return 0
+    return slots_per_day - 1 - bin(day_bits & ~(1 << (cell - day_start))).count('1')
+
+
+def score_cells_scalar(occupancy, room_index, candidates, course_type, student_count, section_id):
+    """Reference implementation: one cell at a time, one room at a time."""
+    slots_per_day = occupancy.slot_count
+    section_mask = occupancy.sections.get(section_id, 0)
+    scored = []
+    for cell in range(occupancy.size):
+        if not candidates >> cell & 1:
+            continue
+        room, room_score = room_index.best_free(course_type, student_count, occupancy, cell)
+        if room:
+            scored.append((cell, room, room_score - section_gap(section_mask, cell, slots_per_day)))
+    scored.sort(key=lambda x: x[2], reverse=True)
+    return scored
+
+
+def score_cells_vectorized(occupancy, room_index, candidates, course_type, student_count, section_id):
+    """
+    Same result as score_cells_scalar, computed over the whole grid at once:
+    eligible rooms x cells free matrix -> first free room per cell (rooms are
+    pre-sorted by score), minus per-day gap penalties.
+    """
+    rooms, room_ids, scores = room_index.columns(course_type, student_count)
+    if not candidates or not rooms:
+        return []
+
+    slots_per_day = occupancy.slot_count
+    bits = _bit_positions(occupancy.size)
+
+    room_masks = np.fromiter(map(occupancy.rooms.get, room_ids, repeat(0)), dtype=np.uint64, count=len(rooms))
+    free = ((room_masks[:, None] >> bits) & np.uint64(1)) == 0
+    usable = free.any(axis=0) & (((np.uint64(candidates) >> bits) & np.uint64(1)) == 1)
+    cells = np.flatnonzero(usable)
+    if not cells.size:
+        return []
+    first_free = free[:, cells].argmax(axis=0)
+
+    section_bits = ((np.uint64(occupancy.sections.get(section_id, 0)) >> bits) & np.uint64(1)).astype(np.int64)
+    booked_per_day = section_bits.reshape(-1, slots_per_day).sum(axis=1)
+    gap_per_day = np.where(booked_per_day > 0, slots_per_day - 1 - booked_per_day, 0)
+
+    totals = np.asarray(scores, dtype=np.int64)[first_free] - gap_per_day[cells // slots_per_day]
+    order = np.argsort(-totals, kind='stable')
+    return [(int(cells[i]), rooms[first_free[i]], int(totals[i])) for i in order]
+
+
+def default_scorer(occupancy):
+    """Vectorized scoring whenever the grid fits in a uint64 bitmap."""
+    if occupancy.size <= MAX_VECTOR_CELLS:
+        return score_cells_vectorized
+    return score_cells_scalar
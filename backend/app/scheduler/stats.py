@@ -0,0 +1,130 @@
+"""
+Phase timings and counters of one generation run.
+
+The pipeline times its phases (load, domains, solve, optimize, persistence,
+commit; "seconds" is the whole run) and the solvers, when handed a RunStats, time their hot loops inside
+the solve phase and count the work they do:
+
+    conflict_checks       time computing teacher/section free-cell masks;
+                          one bitwise check covers every cell of a workload
+    workloads_considered  workloads such a mask was computed for
+    candidate_cells       cells those masks left open
+    rooms_scored          (room, cell) pairs the scorer weighed
+    room_scoring          time in the scorer; it also orders the cells it
+                          returns, so the greedy engine has no separate sort
+    slot_sorting          least-constraining-value reordering (backtracking)
+
+The solvers check `stats is not None` once per workload, so a run without
+stats pays nothing for them.
+"""
+import cProfile
+import json
+import logging
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Functions listed in a profile summary
+PROFILE_TOP = 15
+
+logger = logging.getLogger(__name__)
+
+# tracemalloc is process-wide: profiles running at once share it
+_tracer_lock = threading.Lock()
+_tracer_users = 0
+_tracer_owned = False
+
+
+class RunStats:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def as_dict(self):
+        return {
+            "seconds": round(time.perf_counter() - self.started, 4),
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class Profile:
+    """
+    cProfile and tracemalloc over a block of the run; `summary()` once it is
+    done. The tracer is started by the first profile and stopped by the last
+    one; tracing started elsewhere is never stopped or reset. While other
+    profiles overlap, peaks are process-wide rather than this run's own.
+    """
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.peak = 0
+
+    def __enter__(self):
+        global _tracer_users, _tracer_owned
+        with _tracer_lock:
+            if not _tracer_users and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _tracer_owned = True
+            _tracer_users += 1
+        self.reset_peak()
+        self.profiler.enable()
+        return self
+
+    def checkpoint(self):
+        """Keep the peak so far; call before a stage that resets tracemalloc's peak."""
+        self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+
+    def reset_peak(self):
+        """Start a new peak window, if no one else is using the tracer."""
+        self.checkpoint()
+        with _tracer_lock:
+            if _tracer_owned and _tracer_users == 1:
+                tracemalloc.reset_peak()
+
+    def stage_peak(self):
+        """Peak traced bytes since the last reset_peak()."""
+        return tracemalloc.get_traced_memory()[1]
+
+    def __exit__(self, *exc):
+        global _tracer_users, _tracer_owned
+        self.profiler.disable()
+        self.checkpoint()
+        with _tracer_lock:
+            _tracer_users -= 1
+            if not _tracer_users and _tracer_owned:
+                tracemalloc.stop()
+                _tracer_owned = False
+
+    def summary(self):
+        rows = pstats.Stats(self.profiler).stats.items()
+        top = []
+        for (filename, line, name), (_, calls, total, cumulative, _) in sorted(
+            rows, key=lambda item: -item[1][3]
+        )[:PROFILE_TOP]:
+            top.append({"function": f"{filename}:{line}({name})", "calls": calls,
+                        "total_seconds": round(total, 4), "cumulative_seconds": round(cumulative, 4)})
+        return {"peak_kb": round(self.peak / 1024, 1), "top_functions": top}
+
+
+def log_stats(**fields):
+    """One structured log line per run: JSON text, and the same dict as `extra["generation_stats"]`."""
+    logger.info("generation stats %s", json.dumps(fields, sort_keys=True), extra={"generation_stats": fields})
@@ -0,0 +1,59 @@
+"""
+Rendered timetable views, cached per department.
+
+A view is built with one joined query that projects only the columns it
+shows, serialized once, and kept in the app's `timetable_views` cache under
+the department's `timetable_version`. Every write path bumps that version in
+its own transaction, so a cached body is served until the timetable (or
+anything it displays) changes, at the cost of one primary-key lookup.
+"""
+import json
+
+from flask import current_app
+
+from .. import db
+from ..models import Course, Department, Room, Section, Teacher, TimetableEntry
+from .grid import load_grid
+
+
+def timetable_query(dept_id):
+    """Select of the department's entries as display columns, joined in one query."""
+    return (
+        db.select(TimetableEntry.id, TimetableEntry.day_index, TimetableEntry.slot_index,
+                  Section.name, Course.name, Teacher.name, Room.name)
+        .join(Section, Section.id == TimetableEntry.section_id)
+        .join(Course, Course.id == TimetableEntry.course_id)
+        .join(Teacher, Teacher.id == TimetableEntry.teacher_id)
+        .join(Room, Room.id == TimetableEntry.room_id)
+        .where(TimetableEntry.department_id == dept_id)
+    )
+
+
+def timetable_row(grid):
+    """Serializer of timetable_query() rows on `grid`."""
+    def serialize(row):
+        entry_id, day_index, slot_index, section, course, teacher, room = row
+        day, timeslot = grid.label(day_index, slot_index)
+        return {"id": entry_id, "day": day, "timeslot": timeslot, "section": section,
+                "course": course, "teacher": teacher, "room": room}
+    return serialize
+
+
+def _cache():
+    return current_app.extensions.setdefault('timetable_views', {})
+
+
+def render_timetable(dept_id):
+    """Serialized view of a department's timetable, from the cache when its version still matches."""
+    version = db.session.scalar(db.select(Department.timetable_version).where(Department.id == dept_id))
+    if version is None:
+        return '[]'
+    cache = _cache()
+    cached = cache.get(dept_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    serialize = timetable_row(load_grid(dept_id))
+    rows = db.session.execute(timetable_query(dept_id).order_by(TimetableEntry.id))
+    body = json.dumps([serialize(row) for row in rows])
+    cache[dept_id] = (version, body)
+    return body
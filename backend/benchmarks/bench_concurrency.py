@@ -0,0 +1,179 @@
+"""
+Read throughput of GET endpoints while a campus generation writes.
+
+Each journal mode runs in a fresh interpreter against its own SQLite file
+holding a synthetic university. Reader threads request listings and
+department views, first with the database idle and then for as long as a
+campus generation runs; the record has requests per second, latency
+percentiles and failed reads for both windows, so a mode whose readers
+wait on the writer shows it as lower throughput during generation.
+
+Usage (from backend/):
+    python -m benchmarks.bench_concurrency --sections 300 --readers 8 --output concurrency.json
+    python -m benchmarks.bench_concurrency --journal-modes wal delete
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmarks.bench_generate import _commit
+
+DEFAULT_JOURNAL_MODES = ('wal', 'delete')
+
+
+def _paths(departments):
+    """GET endpoints the readers cycle through."""
+    paths = ['/api/resources/sections?limit=100', '/api/resources/batches?limit=100',
+             '/api/resources/departments']
+    return paths + [f'/api/scheduling/view/{d}' for d in range(1, departments + 1)]
+
+
+def _read(app, paths, stop, latencies, failures):
+    client = app.test_client()
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            failed = client.get(paths[i % len(paths)]).status_code >= 500
+        except Exception:
+            failed = True
+        if failed:
+            failures.append(1)
+        else:
+            latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+def _window(app, paths, readers, until):
+    """Run `readers` threads until `until()` returns; summarize the reads they made."""
+    stop = threading.Event()
+    latencies, failures = [], []
+    threads = [threading.Thread(target=_read, args=(app, paths, stop, latencies, failures))
+               for _ in range(readers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    until()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2) if latencies else None
+
+    return {
+        "seconds": round(seconds, 3),
+        "reads": len(latencies),
+        "failed_reads": len(failures),
+        "reads_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+    }
+
+
+def run_mode(args):
+    """Populate, then read while idle and during one generation, in this process."""
+    from app import create_app, db
+    from app.scheduler.campus import generate_campus
+    from benchmarks.university import populate_university
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        instance = populate_university(sections=args.sections, seed=args.seed)
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+        db.session.remove()
+    paths = _paths(instance["departments"])
+
+    # Render every view once so both windows read the same (empty) timetables
+    with app.test_client() as client:
+        for path in paths:
+            client.get(path)
+
+    idle = _window(app, paths, args.readers, lambda: time.sleep(args.idle_seconds))
+
+    result = {}
+
+    def generate():
+        with app.app_context():
+            start = time.perf_counter()
+            result.update(generate_campus(processes=args.processes, engine=args.engine))
+            result["seconds"] = time.perf_counter() - start
+    during = _window(app, paths, args.readers, generate)
+
+    return {
+        "journal_mode": journal_mode,
+        "instance": instance,
+        "generate_seconds": round(result["seconds"], 3),
+        "entries": result["entries"],
+        "idle": idle,
+        "during_generation": during,
+    }
+
+
+def _child(mode, args, workdir):
+    """Run one journal mode in a fresh interpreter and return its record."""
+    command = [sys.executable, '-m', 'benchmarks.bench_concurrency', '--run-mode', mode,
+               '--sections', str(args.sections), '--readers', str(args.readers),
+               '--idle-seconds', str(args.idle_seconds), '--engine', args.engine, '--seed', str(args.seed)]
+    if args.processes is not None:
+        command += ['--processes', str(args.processes)]
+    env = dict(os.environ, FLASK_ENV='development', GENERATION_WORKERS='0', METRICS_ENABLED='0',
+               SQLITE_JOURNAL_MODE=mode,
+               DEV_DATABASE_URL=f"sqlite:///{os.path.join(workdir, f'concurrency-{mode}.db')}")
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--journal-modes', nargs='+', default=list(DEFAULT_JOURNAL_MODES))
+    parser.add_argument('--sections', type=int, default=300)
+    parser.add_argument('--readers', type=int, default=8, help="concurrent reader threads")
+    parser.add_argument('--idle-seconds', type=float, default=3.0, help="length of the idle read window")
+    parser.add_argument('--engine', default='greedy')
+    parser.add_argument('--processes', type=int, help="campus solver processes (default: one per core)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='bench-concurrency.json')
+    parser.add_argument('--run-mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode is not None:
+        print(json.dumps(run_mode(args)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode in args.journal_modes:
+            record = _child(mode, args, workdir)
+            results.append(record)
+            idle, during = record["idle"], record["during_generation"]
+            print(f"journal_mode={record['journal_mode']}: idle {idle['reads_per_second']} reads/s, "
+                  f"during generation {during['reads_per_second']} reads/s "
+                  f"(p95 {during['p95_ms']} ms, max {during['max_ms']} ms, {during['failed_reads']} failed), "
+                  f"generate {record['generate_seconds']}s")
+
+    report = {
+        "commit": _commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ('output', 'run_mode')},
+        "results": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Campus generation at several sizes of synthetic university.
+
+Each size runs in a fresh interpreter against its own SQLite file, so peak
+RSS and caches are per size. Records populate and generate wall time, SQL
+statements issued by the generation, peak RSS and the share of required
+hours placed, and writes them to a JSON file that can be compared with the
+file of another commit. Sizes default to 10, 100 and 1000 sections; 10000
+takes over ten minutes, so it runs only when passed to --sizes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_generate --sizes 10 100 1000 10000 --output bench.json
+    python -m benchmarks.bench_generate --sizes 10 100 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+DEFAULT_SIZES = (10, 100, 1000)
+
+
+def run_size(args):
+    """Populate and generate one instance in this process; returns its record."""
+    from sqlalchemy import event
+
+    from app import create_app, db
+    from app.scheduler.campus import generate_campus
+    from benchmarks.university import populate_university
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        instance = populate_university(
+            sections=args.run_size, departments=args.departments, programs=args.programs,
+            batches=args.batches, teachers=args.teachers, rooms=args.rooms,
+            availability_density=args.availability_density, lab_ratio=args.lab_ratio, seed=args.seed)
+        populate_seconds = time.perf_counter() - start
+
+        queries = 0
+
+        def count(*_):
+            nonlocal queries
+            queries += 1
+        event.listen(db.engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        result = generate_campus(processes=args.processes, engine=args.engine)
+        generate_seconds = time.perf_counter() - start
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    peak_kb = peak / 1024 if sys.platform == 'darwin' else peak
+    return {
+        "size": args.run_size,
+        "instance": instance,
+        "populate_seconds": round(populate_seconds, 3),
+        "generate_seconds": round(generate_seconds, 3),
+        "queries": queries,
+        "peak_rss_kb": int(peak_kb),
+        "entries": result["entries"],
+        "placement_rate": round(result["entries"] / instance["required_hours"], 4) if instance["required_hours"] else 1.0,
+        "status": result["status"],
+    }
+
+
+def _child(size, args, workdir):
+    """Run one size in a fresh interpreter and return its record."""
+    command = [sys.executable, '-m', 'benchmarks.bench_generate', '--run-size', str(size),
+               '--engine', args.engine, '--programs', str(args.programs), '--batches', str(args.batches),
+               '--availability-density', str(args.availability_density), '--lab-ratio', str(args.lab_ratio),
+               '--seed', str(args.seed)]
+    for flag, value in (('--departments', args.departments), ('--teachers', args.teachers),
+                        ('--rooms', args.rooms), ('--processes', args.processes)):
+        if value is not None:
+            command += [flag, str(value)]
+    env = dict(os.environ, FLASK_ENV='development', GENERATION_WORKERS='0',
+               DEV_DATABASE_URL=f"sqlite:///{os.path.join(workdir, f'bench-{size}.db')}")
+    output = subprocess.run(command, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous):
+    """Print per-size ratios of `current` to `previous` (lower is better except placement rate)."""
+    before = {r["size"]: r for r in previous["results"]}
+    print(f"vs {previous.get('commit') or 'previous run'}:")
+    for record in current["results"]:
+        old = before.get(record["size"])
+        if old is None:
+            continue
+        ratios = []
+        for key in ("generate_seconds", "queries", "peak_rss_kb"):
+            if old[key]:
+                ratios.append(f"{key}={record[key] / old[key]:.2f}x")
+        ratios.append(f"placement_rate={record['placement_rate'] - old['placement_rate']:+.4f}")
+        print(f"  size={record['size']}: " + " ".join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="sections per run")
+    parser.add_argument('--output', default='bench-generate.json')
+    parser.add_argument('--compare', help="earlier output file to compare against")
+    parser.add_argument('--engine', default='greedy')
+    parser.add_argument('--processes', type=int, help="campus solver processes (default: one per core)")
+    parser.add_argument('--departments', type=int)
+    parser.add_argument('--programs', type=int, default=2)
+    parser.add_argument('--batches', type=int, default=2)
+    parser.add_argument('--teachers', type=int)
+    parser.add_argument('--rooms', type=int)
+    parser.add_argument('--availability-density', type=float, default=1.0)
+    parser.add_argument('--lab-ratio', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--run-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size is not None:
+        print(json.dumps(run_size(args)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            record = _child(size, args, workdir)
+            results.append(record)
+            print(f"sections={size}: generate {record['generate_seconds']}s, {record['queries']} queries, "
+                  f"peak {record['peak_rss_kb'] / 1024:.0f} MB, placed {record['placement_rate']:.1%}")
+
+    report = {
+        "commit": _commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "engine": args.engine,
+        "parameters": {k: v for k, v in vars(args).items() if k not in ('sizes', 'output', 'compare', 'run_size')},
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Scalar vs. vectorized slot scoring on a synthetic in-memory instance.
+
+Each scorer's time is the best of --repeat greedy passes. The speedup
+depends on the machine and grows as eligible rooms get scarcer: about 2.5x
+with 250 rooms and about 5x with 80 on the machine the scorer was tuned on,
+less where NumPy's per-call overhead is higher.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scoring --workloads 5000
+"""
+import argparse
+import time
+
+from app.scheduler.greedy import solve_greedy
+from app.scheduler.occupancy import OccupancyIndex
+from app.scheduler.scoring import score_cells_scalar, score_cells_vectorized
+from tests.helpers import synthetic_problem
+
+
+def run(problem, scorer, repeat=1):
+    """Best wall time of `repeat` greedy passes, and the result of the last one."""
+    best = None
+    for _ in range(repeat):
+        occupancy = OccupancyIndex(*problem.grid.shape)
+        start = time.perf_counter()
+        result = solve_greedy(problem, occupancy, scorer=scorer)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workloads', type=int, default=5000)
+    parser.add_argument('--rooms', type=int, default=250)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="passes per scorer; the fastest counts")
+    args = parser.parse_args()
+
+    problem = synthetic_problem(args.workloads, rooms=args.rooms, seed=args.seed)
+    scalar_time, scalar = run(problem, score_cells_scalar, args.repeat)
+    vector_time, vector = run(problem, score_cells_vectorized, args.repeat)
+
+    assert scalar == vector, "vectorized scorer diverged from the scalar heuristic"
+    print(f"workloads={len(problem.workloads)} rooms={len(problem.rooms)} placed={len(vector.placements)}")
+    print(f"scalar:     {scalar_time:.3f}s")
+    print(f"vectorized: {vector_time:.3f}s")
+    print(f"speedup:    {scalar_time / vector_time:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
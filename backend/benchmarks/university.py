@@ -0,0 +1,156 @@
+"""
+Synthetic university: a parameterized, reproducible database instance.
+
+Departments own programs, programs own batches, and sections are spread
+evenly over all batches. Each department has its own courses (a `lab_ratio`
+share of them labs) and teachers qualified for a few of them; every section
+takes `workloads_per_section` of its department's courses, assigned to the
+least-loaded qualified teacher. Knobs left as None are sized from the
+number of sections so the instance stays solvable as it grows.
+
+Rows are written with Core executemany inserts and explicit ids, so the
+target database should be empty.
+"""
+import math
+import random
+
+from sqlalchemy import insert
+
+from app import db
+from app.cache import TRACKED_TABLES, bump_reference_versions, reference_cache
+from app.models import (Batch, Course, Department, Program, Room, Section, Teacher, Workload,
+                        teacher_departments, teacher_qualifications)
+from app.scheduler.availability import normalize
+from app.scheduler.grid import DEFAULT_GRID
+
+# Share of a teacher's or room's week that derived sizes plan to fill
+TARGET_LOAD = 0.6
+CHUNK_SIZE = 5000
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def populate_university(sections=100, departments=None, programs=2, batches=2, teachers=None, rooms=None,
+                        courses=10, workloads_per_section=5, availability_density=1.0, lab_ratio=0.2, seed=42):
+    """
+    Write a synthetic university to the current database and commit.
+    Returns a summary of what was created, including the weekly hours
+    required by all workloads.
+    """
+    rnd = random.Random(seed)
+    week = DEFAULT_GRID.shape[0] * DEFAULT_GRID.shape[1]
+    departments = departments or max(1, math.ceil(sections / 100))
+    workloads_per_section = min(workloads_per_section, courses)
+
+    dept_rows, program_rows, batch_rows, course_rows = [], [], [], []
+    dept_batches = {}
+    dept_courses = {}
+    for d in range(1, departments + 1):
+        dept_rows.append({'id': d, 'name': f"Department {d}", 'code': f"D{d}"})
+        dept_batches[d] = []
+        for p in range(programs):
+            program_id = len(program_rows) + 1
+            program_rows.append({'id': program_id, 'name': f"Program {d}.{p + 1}", 'code': f"P{d}.{p + 1}",
+                                 'department_id': d})
+            for b in range(batches):
+                batch_id = len(batch_rows) + 1
+                batch_rows.append({'id': batch_id, 'name': f"Batch {2024 + b}", 'academic_year': str(2024 + b),
+                                   'program_id': program_id})
+                dept_batches[d].append(batch_id)
+        dept_courses[d] = []
+        for c in range(courses):
+            course_id = len(course_rows) + 1
+            course_type = 'Lab' if rnd.random() < lab_ratio else 'Theory'
+            course_rows.append({'id': course_id, 'name': f"Course {d}.{c + 1}", 'code': f"C{d}.{c + 1}",
+                                'credits': 2 if course_type == 'Lab' else 4, 'course_type': course_type,
+                                'department_id': d})
+            dept_courses[d].append(course_id)
+    course_types = {row['id']: row['course_type'] for row in course_rows}
+
+    # Sections round-robin over departments, then over each department's batches
+    section_rows, section_depts = [], {}
+    for s in range(1, sections + 1):
+        d = (s - 1) % departments + 1
+        batch_id = dept_batches[d][(s - 1) // departments % len(dept_batches[d])]
+        section_rows.append({'id': s, 'name': f"S{s}", 'student_count': rnd.choice([30, 40, 50, 60]),
+                             'batch_id': batch_id})
+        section_depts[s] = d
+
+    demand = {}
+    section_courses = {}
+    for s, d in section_depts.items():
+        section_courses[s] = [(c, 2 if course_types[c] == 'Lab' else rnd.randint(2, 4))
+                              for c in rnd.sample(dept_courses[d], workloads_per_section)]
+        demand[d] = demand.get(d, 0) + sum(h for _, h in section_courses[s])
+    required_hours = sum(demand.values())
+
+    # Teachers per department: enough available hours for its demand
+    capacity = week * availability_density * TARGET_LOAD
+    if teachers is None:
+        dept_teachers = {d: max(courses // 3 + 1, math.ceil(demand.get(d, 0) / capacity)) for d in demand}
+    else:
+        dept_teachers = {d: max(1, teachers // departments) for d in range(1, departments + 1)}
+    teacher_rows, link_rows, qualification_rows = [], [], []
+    qualified = {}
+    for d, count in dept_teachers.items():
+        for i in range(count):
+            t = len(teacher_rows) + 1
+            availability = None
+            if availability_density < 1:
+                availability = {}
+                for day in DEFAULT_GRID.days:
+                    slots = [slot for slot in DEFAULT_GRID.slots if rnd.random() < availability_density]
+                    if slots:
+                        availability[day] = slots
+            availability, mask = normalize(availability, DEFAULT_GRID)
+            teacher_rows.append({'id': t, 'name': f"Teacher {t}", 'email': f"t{t}@synthetic.edu",
+                                 'availability': availability, 'availability_mask': mask})
+            link_rows.append({'teacher_id': t, 'department_id': d})
+            # The department's teachers cover its courses in turn, plus two at random each
+            picks = {*dept_courses[d][i::count], *rnd.sample(dept_courses[d], min(2, courses))}
+            for c in picks:
+                qualification_rows.append({'teacher_id': t, 'course_id': c})
+                qualified.setdefault(c, []).append(t)
+
+    load = {}
+    workload_rows = []
+    for s, picks in section_courses.items():
+        for c, hours in picks:
+            teacher_id = min(qualified[c], key=lambda t: load.get(t, 0))
+            load[teacher_id] = load.get(teacher_id, 0) + hours
+            workload_rows.append({'id': len(workload_rows) + 1, 'section_id': s, 'course_id': c,
+                                  'teacher_id': teacher_id, 'hours_per_week': hours})
+
+    lab_hours = sum(w['hours_per_week'] for w in workload_rows if course_types[w['course_id']] == 'Lab')
+    if rooms is None:
+        rooms = max(2, math.ceil(required_hours / (week * TARGET_LOAD)))
+    lab_rooms = min(rooms - 1, max(1 if lab_hours else 0, round(rooms * lab_hours / max(required_hours, 1))))
+    room_rows = [
+        {'id': r, 'name': f"R{r}", 'capacity': rnd.choice([60, 75, 90]),
+         'room_type': 'Lab' if r <= lab_rooms else 'Classroom'}
+        for r in range(1, rooms + 1)
+    ]
+
+    for model, rows in ((Department, dept_rows), (Program, program_rows), (Batch, batch_rows),
+                        (Course, course_rows), (Section, section_rows), (Teacher, teacher_rows),
+                        (teacher_departments, link_rows), (teacher_qualifications, qualification_rows),
+                        (Room, room_rows), (Workload, workload_rows)):
+        _insert(model, rows)
+    bump_reference_versions(TRACKED_TABLES)
+    db.session.commit()
+    reference_cache().invalidate('department', 'course', 'teacher', 'room',
+                                 'teacher_departments', 'teacher_qualifications')
+
+    return {
+        "departments": departments,
+        "sections": sections,
+        "teachers": len(teacher_rows),
+        "rooms": rooms,
+        "lab_rooms": lab_rooms,
+        "courses": len(course_rows),
+        "workloads": len(workload_rows),
+        "required_hours": required_hours,
+    }
@@ -0,0 +1,109 @@
+"""Added TimeGrid model and integer slot indices
+
+Revision ID: 7a5201e037eb
+Revises: 721d067d4fba
+Create Date: 2026-10-17 16:19:20.380270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a5201e037eb'
+down_revision = '721d067d4fba'
+branch_labels = None
+depends_on = None
+
+# The grid the string columns were implicitly written against
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+TIMESLOTS = ['09:00-10:00', '10:00-11:00', '11:00-12:00', '01:00-02:00', '02:00-03:00']
+
+entries = sa.table(
+    'timetable_entries',
+    sa.column('day', sa.String), sa.column('timeslot', sa.String),
+    sa.column('day_index', sa.SmallInteger), sa.column('slot_index', sa.SmallInteger),
+)
+
+
+def _to_index(column, labels):
+    return sa.case({label: i for i, label in enumerate(labels)}, value=column)
+
+
+def _to_label(column, labels):
+    return sa.case({i: label for i, label in enumerate(labels)}, value=column)
+
+
+def upgrade():
+    time_grids = op.create_table('time_grids',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('days', sa.JSON(), nullable=False),
+    sa.Column('periods', sa.JSON(), nullable=False),
+    sa.Column('breaks', sa.JSON(), nullable=False),
+    sa.Column('is_default', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.bulk_insert(time_grids, [
+        {'name': 'Default', 'days': DAYS, 'periods': TIMESLOTS, 'breaks': [], 'is_default': True}
+    ])
+
+    with op.batch_alter_table('department', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('time_grid_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_department_time_grid_id', 'time_grids', ['time_grid_id'], ['id'])
+
+    # 1. Add the index columns and backfill them from the labels
+    with op.batch_alter_table('timetable_entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('day_index', sa.SmallInteger(), nullable=True))
+        batch_op.add_column(sa.Column('slot_index', sa.SmallInteger(), nullable=True))
+
+    op.execute(entries.update().values(
+        day_index=_to_index(entries.c.day, DAYS),
+        slot_index=_to_index(entries.c.timeslot, TIMESLOTS),
+    ))
+    # 2. Entries on labels outside the grid cannot be represented; regenerate those departments
+    op.execute(entries.delete().where(sa.or_(entries.c.day_index.is_(None), entries.c.slot_index.is_(None))))
+
+    # 3. Swap the slot constraints over to the index columns
+    with op.batch_alter_table('timetable_entries', schema=None) as batch_op:
+        batch_op.alter_column('day_index', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.alter_column('slot_index', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.drop_constraint('uq_timetable_entries_room_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_timetable_entries_room_slot', ['day_index', 'slot_index', 'room_id'])
+        batch_op.drop_constraint('uq_timetable_entries_section_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_timetable_entries_section_slot', ['day_index', 'slot_index', 'section_id'])
+        batch_op.drop_constraint('uq_timetable_entries_teacher_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_timetable_entries_teacher_slot', ['day_index', 'slot_index', 'teacher_id'])
+        batch_op.drop_column('timeslot')
+        batch_op.drop_column('day')
+
+
+def downgrade():
+    with op.batch_alter_table('timetable_entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('day', sa.VARCHAR(length=10), nullable=True))
+        batch_op.add_column(sa.Column('timeslot', sa.VARCHAR(length=20), nullable=True))
+
+    op.execute(entries.update().values(
+        day=_to_label(entries.c.day_index, DAYS),
+        timeslot=_to_label(entries.c.slot_index, TIMESLOTS),
+    ))
+    op.execute(entries.delete().where(sa.or_(entries.c.day.is_(None), entries.c.timeslot.is_(None))))
+
+    with op.batch_alter_table('timetable_entries', schema=None) as batch_op:
+        batch_op.alter_column('day', existing_type=sa.VARCHAR(length=10), nullable=False)
+        batch_op.alter_column('timeslot', existing_type=sa.VARCHAR(length=20), nullable=False)
+        batch_op.drop_constraint('uq_timetable_entries_teacher_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_timetable_entries_teacher_slot', ['day', 'timeslot', 'teacher_id'])
+        batch_op.drop_constraint('uq_timetable_entries_section_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_timetable_entries_section_slot', ['day', 'timeslot', 'section_id'])
+        batch_op.drop_constraint('uq_timetable_entries_room_slot', type_='unique')
+        batch_op.create_unique_constraint('uq_timetable_entries_room_slot', ['day', 'timeslot', 'room_id'])
+        batch_op.drop_column('slot_index')
+        batch_op.drop_column('day_index')
+
+    with op.batch_alter_table('department', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_department_time_grid_id', type_='foreignkey')
+        batch_op.drop_column('time_grid_id')
+
+    op.drop_table('time_grids')
@@ -0,0 +1,88 @@
+"""Added teacher availability mask
+
+Revision ID: f3a9b2c71d04
+Revises: c6d31f0a8e47
+Create Date: 2026-10-17 23:12:40.518903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9b2c71d04'
+down_revision = 'c6d31f0a8e47'
+branch_labels = None
+depends_on = None
+
+# Must match app.scheduler.availability.SLOT_STRIDE
+SLOT_STRIDE = 32
+# The built-in grid, for databases without a default TimeGrid
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+TIMESLOTS = ['09:00-10:00', '10:00-11:00', '11:00-12:00', '01:00-02:00', '02:00-03:00']
+
+teacher = sa.table(
+    'teacher',
+    sa.column('id', sa.Integer), sa.column('availability', sa.JSON), sa.column('availability_mask', sa.LargeBinary),
+)
+teacher_departments = sa.table('teacher_departments', sa.column('teacher_id'), sa.column('department_id'))
+department = sa.table('department', sa.column('id'), sa.column('time_grid_id'))
+time_grids = sa.table('time_grids', sa.column('id'), sa.column('days', sa.JSON), sa.column('periods', sa.JSON),
+                      sa.column('breaks', sa.JSON), sa.column('is_default', sa.Boolean))
+
+
+def _index(value, labels):
+    if isinstance(value, int):
+        return value if 0 <= value < len(labels) else None
+    if str(value).isdigit():
+        return int(value) if int(value) < len(labels) else None
+    return labels.index(value) if value in labels else None
+
+
+def _mask(availability, days, slots):
+    # Cells off the teacher's grid were ignored by the loader; they are dropped here too
+    mask = 0
+    for day, day_slots in availability.items():
+        d = _index(day, days)
+        if d is None or not isinstance(day_slots, list):
+            continue
+        for slot in day_slots:
+            s = _index(slot, slots)
+            if s is not None and s < SLOT_STRIDE:
+                mask |= 1 << (d * SLOT_STRIDE + s)
+    return mask.to_bytes(max(1, (mask.bit_length() + 7) // 8), 'little')
+
+
+def upgrade():
+    with op.batch_alter_table('teacher', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('availability_mask', sa.LargeBinary(), nullable=True))
+
+    bind = op.get_bind()
+    grids, default = {}, None
+    for grid_id, days, periods, breaks, is_default in bind.execute(
+        sa.select(time_grids.c.id, time_grids.c.days, time_grids.c.periods, time_grids.c.breaks,
+                  time_grids.c.is_default).order_by(time_grids.c.id)
+    ):
+        grids[grid_id] = (days, [p for p in periods if p not in set(breaks or [])])
+        if is_default and default is None:
+            default = grids[grid_id]
+    default = default or (DAYS, TIMESLOTS)
+    # Each teacher's availability is read on the grid of their first department (lowest id, kept last)
+    first_grid = dict(bind.execute(
+        sa.select(teacher_departments.c.teacher_id, department.c.time_grid_id)
+        .join(department, department.c.id == teacher_departments.c.department_id)
+        .order_by(teacher_departments.c.department_id.desc())
+    ).all())
+    for teacher_id, availability in bind.execute(
+        sa.select(teacher.c.id, teacher.c.availability).where(teacher.c.availability.isnot(None))
+    ).all():
+        if not isinstance(availability, dict) or not availability:
+            continue
+        days, slots = grids.get(first_grid.get(teacher_id), default)
+        bind.execute(teacher.update().where(teacher.c.id == teacher_id)
+                     .values(availability_mask=_mask(availability, days, slots)))
+
+
+def downgrade():
+    with op.batch_alter_table('teacher', schema=None) as batch_op:
+        batch_op.drop_column('availability_mask')
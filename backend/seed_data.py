@@ -1,5 +1,6 @@
 from app import create_app, db
-from app.models import Department, Program, Batch, Section, Course, Teacher, Room
+from app.models import Department, Program, Batch, Section, Course, Teacher, Room, TimeGrid
+from app.scheduler.availability import set_availability
 
 app = create_app()
 
@@ -10,6 +11,17 @@ def seed():
         db.drop_all()
         db.create_all()
 
+        print("Seeding Time Grid...")
+        main_grid = TimeGrid(
+            name="Main Campus",
+            days=["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"],
+            periods=["09:00-10:00", "10:00-11:00", "11:00-12:00", "12:00-01:00", "01:00-02:00", "02:00-03:00"],
+            breaks=["12:00-01:00"],
+            is_default=True
+        )
+        db.session.add(main_grid)
+        db.session.commit()
+
         print("Seeding Departments...")
         it_dept = Department(name="Information Technology", code="IT")
         cs_dept = Department(name="Computer Science", code="CS")
@@ -42,10 +54,10 @@ def seed():
         prof_ajay.departments.append(it_dept)
         prof_ajay.qualified_courses.append(python_course)
         # Ajay is only available Monday and Tuesday morning
-        prof_ajay.availability = {
+        set_availability(prof_ajay, {
             "Monday": ["09:00-10:00", "10:00-11:00"],
             "Tuesday": ["09:00-10:00"]
-        }
+        })
         
         prof_kumar = Teacher(name="Prof. Kumar", email="kumar@university.edu")
         prof_kumar.departments.append(cs_dept)
@@ -8,8 +8,10 @@ Test script to demonstrate the production-ready scheduling features:
 
 from app import create_app, db
 from app.models import *
+from app.scheduler.grid import load_grid
 from datetime import datetime
 import json
+import time
 
 def test_production_features():
     app = create_app()
@@ -116,13 +118,16 @@ def test_production_features():
         # Test the enhanced scheduling
         print("🔧 Running Enhanced Scheduling Algorithm...")
         
-        from app.routes.scheduling import generate_timetable
-        
-        # Use the enhanced scheduling function
+        # Queue the generation job and wait for it to finish
         with app.test_client() as client:
             response = client.post('/api/scheduling/generate', 
                                  json={'department_id': it_dept.id})
-            result = response.get_json()
+            status_url = response.get_json()['status_url']
+            job = client.get(status_url).get_json()
+            while job['state'] in ('queued', 'running'):
+                time.sleep(0.1)
+                job = client.get(status_url).get_json()
+            result = job['result'] or {'status': 'failed', 'entries': 0, 'errors': [job['error']]}
             status_code = response.status_code
         
         print(f"📊 Scheduling Result: {result['status']}")
@@ -138,8 +143,10 @@ def test_production_features():
         print("=" * 60)
         
         entries = TimetableEntry.query.filter_by(department_id=it_dept.id).all()
+        grid = load_grid(it_dept.id)
         
         for entry in entries:
+            day, timeslot = grid.label(entry.day_index, entry.slot_index)
             section = db.session.get(Section, entry.section_id)
             course = db.session.get(Course, entry.course_id)
             teacher = db.session.get(Teacher, entry.teacher_id)
@@ -149,14 +156,14 @@ def test_production_features():
             print(f"   👥 Section: {section.name} ({section.student_count} students)")
             print(f"   👨‍🏫 Teacher: {teacher.name}")
             print(f"   🏫 Room: {room.name} (Capacity: {room.capacity}, Type: {room.room_type})")
-            print(f"   ⏰ Time: {entry.day} {entry.timeslot}")
+            print(f"   ⏰ Time: {day} {timeslot}")
             
             # Verify constraints
             print("   ✅ Checks:")
             
             # 1. Teacher availability check
             if teacher.availability:
-                if entry.timeslot in teacher.availability.get(entry.day, []):
+                if timeslot in teacher.availability.get(day, []):
                     print("      ✓ Teacher is available during this slot")
                 else:
                     print("      ✗ Teacher is NOT available during this slot!")
@@ -201,9 +208,10 @@ def test_production_features():
             # Group by day
             daily_slots = {}
             for entry in entries:
-                if entry.day not in daily_slots:
-                    daily_slots[entry.day] = []
-                daily_slots[entry.day].append(entry.timeslot)
+                day, timeslot = grid.label(entry.day_index, entry.slot_index)
+                if day not in daily_slots:
+                    daily_slots[day] = []
+                daily_slots[day].append(timeslot)
             
             all_slots = ['09:00-10:00', '10:00-11:00', '11:00-12:00', '01:00-02:00', '02:00-03:00']
             
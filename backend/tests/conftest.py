@@ -1,19 +1,27 @@
 import pytest
+from sqlalchemy import event
 from app import create_app, db
+from app.database import readonly_engine
 from app.models import Department, Program, Batch, Section, Teacher, Course, Room, Workload
 
 @pytest.fixture
-def app():
-    app = create_app()
-    app.config.update({
-        "TESTING": True,
-        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
-    })
+def database_path(tmp_path):
+    """SQLite file of the test's app: a file, so WAL and the read-only engine apply as in development."""
+    return tmp_path / 'test.db'
+
+@pytest.fixture
+def app(database_path):
+    # Settings that shape the engines must be in place before create_app builds them
+    app = create_app('testing', {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}"})
 
     with app.app_context():
         db.create_all()
         yield app
+        db.session.remove()
         db.drop_all()
+        for engine in (db.engine, readonly_engine()):
+            if engine is not None:
+                engine.dispose()
 
 @pytest.fixture
 def client(app):
@@ -23,6 +31,39 @@ def client(app):
 def runner(app):
     return app.test_cli_runner()
 
+@pytest.fixture
+def generate(client):
+    """Submit a generation job and return (job response, job status payload)."""
+    def _generate(**payload):
+        response = client.post('/api/scheduling/generate', json=payload)
+        if response.status_code != 202:
+            return response, None
+        return response, client.get(response.get_json()['status_url']).get_json()
+    return _generate
+
+@pytest.fixture
+def query_counter(app):
+    """Counts SQL statements issued, on either engine, while the `with` block is active."""
+    engines = [engine for engine in (db.engine, readonly_engine()) if engine is not None]
+
+    class Counter:
+        count = 0
+
+        def _on_execute(self, *args):
+            self.count += 1
+
+        def __enter__(self):
+            self.count = 0
+            for engine in engines:
+                event.listen(engine, 'before_cursor_execute', self._on_execute)
+            return self
+
+        def __exit__(self, *exc):
+            for engine in engines:
+                event.remove(engine, 'before_cursor_execute', self._on_execute)
+
+    return Counter()
+
 @pytest.fixture
 def sample_data(app):
     with app.app_context():
@@ -0,0 +1,44 @@
+"""Builders shared by the solver tests."""
+import random
+from types import MappingProxyType
+
+from app.scheduler.grid import DEFAULT_GRID
+from app.scheduler.problem import (
+    SchedulingProblem, TeacherSpec, CourseSpec, RoomSpec, WorkloadSpec, SectionSpec,
+)
+
+
+def synthetic_problem(workloads=5000, per_section=5, teachers=400, rooms=250,
+                      lab_ratio=0.3, availability_density=0.7, seed=42):
+    """Random department with `workloads` workloads spread over sections."""
+    rnd = random.Random(seed)
+    day_count, slot_count = DEFAULT_GRID.shape
+    cells = [(d, s) for d in range(day_count) for s in range(slot_count)]
+
+    teacher_specs = {}
+    for t in range(1, teachers + 1):
+        availability = None
+        if rnd.random() < 0.5:
+            availability = sum(1 << (d * slot_count + s) for d, s in cells if rnd.random() < availability_density)
+        teacher_specs[t] = TeacherSpec(t, f"T{t}", availability)
+
+    course_specs = {
+        c: CourseSpec(c, f"C{c}", 'Lab' if rnd.random() < lab_ratio else 'Theory')
+        for c in range(1, 101)
+    }
+    room_specs = tuple(
+        RoomSpec(r, f"R{r}", rnd.choice([30, 40, 60, 90]), 'Lab' if rnd.random() < lab_ratio else 'Classroom')
+        for r in range(1, rooms + 1)
+    )
+
+    sections = []
+    w_id = 0
+    for s_id in range(1, workloads // per_section + 1):
+        specs = []
+        for _ in range(per_section):
+            w_id += 1
+            specs.append(WorkloadSpec(w_id, s_id, rnd.randint(1, 100), rnd.randint(1, teachers), rnd.randint(2, 4)))
+        sections.append(SectionSpec(s_id, f"S{s_id}", rnd.choice([30, 40, 55]), tuple(specs)))
+
+    return SchedulingProblem(1, DEFAULT_GRID, tuple(sections),
+                             MappingProxyType(teacher_specs), MappingProxyType(course_specs), room_specs)
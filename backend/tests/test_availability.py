@@ -0,0 +1,90 @@
+import pytest
+
+from app import db
+from app.models import Department, Teacher
+from app.scheduler.availability import SLOT_STRIDE, AvailabilityError, normalize, pack
+from app.scheduler.grid import DEFAULT_GRID, GridSpec
+
+
+def test_normalize_packs_cells_by_index():
+    labels, mask = normalize({"Wednesday": [1, "09:00-10:00"], "0": ["02:00-03:00"]}, DEFAULT_GRID)
+    assert labels == {"Monday": ["02:00-03:00"], "Wednesday": ["09:00-10:00", "10:00-11:00"]}
+    assert mask == 1 << 4 | 1 << (2 * SLOT_STRIDE) | 1 << (2 * SLOT_STRIDE + 1)
+    assert normalize(None, DEFAULT_GRID) == normalize({}, DEFAULT_GRID) == (None, None)
+    assert normalize({"Monday": []}, DEFAULT_GRID) == ({}, 0)
+    for bad in ({"Sunday": [0]}, {"Monday": ["08:00-09:00"]}, {"Monday": [5]}, {"Monday": "09:00-10:00"}, ["Monday"]):
+        with pytest.raises(AvailabilityError):
+            normalize(bad, DEFAULT_GRID)
+
+    # Laid over a 2 x 2 grid, only the first two days and slots remain
+    small = GridSpec(None, 'Small', ('Mon', 'Tue'), ('a', 'b'))
+    assert pack(normalize({"0": [0, 4], "1": [1], "2": [0]}, DEFAULT_GRID)[1], small) == 0b1001
+    assert pack(None, small) is None
+
+
+def test_availability_is_validated_and_normalized_on_write(client, sample_data):
+    response = client.post('/api/resources/teachers', json={
+        "name": "Late", "email": "late@test.com", "availability": {"Monday": ["09:00-10:00", "08:00-09:00"]}})
+    assert response.status_code == 400
+    assert "08:00-09:00" in response.get_json()['error']
+
+    response = client.post('/api/resources/teachers', json={
+        "name": "Early", "email": "early@test.com", "department_ids": [1],
+        "availability": {"Tuesday": ["10:00-11:00", 0]}})
+    assert response.status_code == 201
+    teacher = db.session.get(Teacher, response.get_json()['id'])
+    assert teacher.availability == {"Tuesday": ["09:00-10:00", "10:00-11:00"]}
+    assert teacher.availability_mask == 0b11 << SLOT_STRIDE
+
+    url = f'/api/resources/teachers/{teacher.id}/availability'
+    assert client.put(url, json={"availability": {"Moonday": [0]}}).status_code == 400
+    assert client.put(url, json={}).status_code == 400
+    assert client.put('/api/resources/teachers/999/availability', json={"availability": None}).status_code == 404
+    response = client.put(url, json={"availability": None})
+    assert response.get_json() == {"id": teacher.id, "availability": None}
+    db.session.expire_all()
+    assert db.session.get(Teacher, teacher.id).availability_mask is None
+
+
+def test_availability_uses_the_department_grid(client, sample_data, generate):
+    grid_id = client.post('/api/resources/time-grids', json={
+        "name": "Lunch", "days": list(DEFAULT_GRID.days),
+        "periods": ["09:00-10:00", "10:00-11:00", "11:00-12:00", "12:00-01:00", "01:00-02:00", "02:00-03:00"],
+        "breaks": ["12:00-01:00"]
+    }).get_json()['id']
+    db.session.get(Department, 1).time_grid_id = grid_id
+    teacher = db.session.get(Teacher, 1)
+    teacher.departments.append(db.session.get(Department, 1))
+    db.session.commit()
+
+    # The break is a period of the grid, but nobody is available in it
+    assert client.put('/api/resources/teachers/1/availability',
+                      json={"availability": {"Monday": ["12:00-01:00"]}}).status_code == 400
+    assert client.put('/api/resources/teachers/1/availability',
+                      json={"availability": {"Friday": ["01:00-02:00"]}}).status_code == 200
+
+    client.post('/api/scheduling/workloads', json={
+        "teacher_id": 1, "course_id": 1, "section_id": 1, "hours_per_week": 2})
+    result = generate(department_id=1)[1]['result']
+    assert result['entries'] == 1
+    rows = client.get('/api/scheduling/view/1').get_json()
+    assert [(r['day'], r['timeslot']) for r in rows] == [("Friday", "01:00-02:00")]
+
+
+def test_bulk_teachers_normalize_availability(client, sample_data):
+    response = client.post('/api/resources/teachers/bulk', json=[
+        {"name": "A", "email": "a@bulk.edu", "availability": {"Friday": ["02:00-03:00"]}},
+        {"name": "B", "email": "b@bulk.edu", "availability": {"Friday": ["06:00-07:00"]}},
+        {"name": "C", "email": "c@bulk.edu", "department_ids": [1]},
+    ])
+    data = response.get_json()
+    assert (data['inserted'], [e['row'] for e in data['errors']]) == (2, [1])
+    rows = dict(db.session.execute(
+        db.select(Teacher.email, Teacher.availability_mask).where(Teacher.email.like('%@bulk.edu'))).tuples().all())
+    assert rows == {"a@bulk.edu": 1 << (4 * SLOT_STRIDE + 4), "c@bulk.edu": None}
+
+
+def test_time_grid_slots_must_fit_the_mask(client):
+    response = client.post('/api/resources/time-grids', json={
+        "name": "Too fine", "days": ["Mon"], "periods": [f"p{i}" for i in range(SLOT_STRIDE + 1)]})
+    assert response.status_code == 400
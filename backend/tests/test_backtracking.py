@@ -0,0 +1,63 @@
+from types import MappingProxyType
+
+from app.models import TimetableEntry
+from app.scheduler import OccupancyIndex, solve_backtracking, solve_greedy
+from app.scheduler.greedy import allocation_errors
+from app.scheduler.grid import DEFAULT_GRID
+from app.scheduler.problem import (
+    SchedulingProblem, TeacherSpec, CourseSpec, RoomSpec, WorkloadSpec, SectionSpec,
+)
+from tests.helpers import synthetic_problem
+
+
+def _scarce_lab_problem():
+    """One lab room; the second section's teacher can only come on Monday morning."""
+    teachers = {
+        1: TeacherSpec(1, "Anytime"),
+        2: TeacherSpec(2, "Monday", 0b111),
+    }
+    sections = (
+        SectionSpec(1, "A", 30, (WorkloadSpec(1, 1, 1, 1, 3),)),
+        SectionSpec(2, "B", 30, (WorkloadSpec(2, 2, 1, 2, 3),)),
+    )
+    return SchedulingProblem(1, DEFAULT_GRID, sections, MappingProxyType(teachers),
+                             MappingProxyType({1: CourseSpec(1, "Lab", 'Lab')}),
+                             (RoomSpec(1, "L1", 40, 'Lab'),))
+
+
+def test_backtracking_gives_scarce_cells_to_tightest_workload():
+    problem = _scarce_lab_problem()
+    greedy = solve_greedy(problem, OccupancyIndex(*problem.grid.shape))
+    assert len(greedy.placements) == 3
+
+    result = solve_backtracking(problem, OccupancyIndex(*problem.grid.shape))
+    assert len(result.placements) == 6
+    assert result.errors == []
+
+
+def test_backtracking_keeps_the_greedy_contract():
+    problem = synthetic_problem(workloads=300, teachers=60, rooms=15, seed=5)
+    occupancy = OccupancyIndex(*problem.grid.shape)
+    result = solve_backtracking(problem, occupancy, time_limit=2.0)
+
+    assert result.placements
+    assert result.errors == allocation_errors(problem, result.placements)
+    for key in ('room_id', 'teacher_id', 'section_id'):
+        cells = [(p.day_index, p.slot_index, getattr(p, key)) for p in result.placements]
+        assert len(cells) == len(set(cells))
+    for p in result.placements:
+        assert occupancy.conflict(p.day_index, p.slot_index, room_id=p.room_id) == "Room occupied"
+
+
+def test_generate_with_backtracking_engine(client, sample_data, generate):
+    client.post('/api/scheduling/workloads', json={
+        "teacher_id": 1, "course_id": 1, "section_id": 1, "hours_per_week": 4
+    })
+    response, job = generate(department_id=1, engine="backtracking")
+    assert response.status_code == 202
+    assert job['state'] == 'succeeded'
+    assert job['result']['entries'] == 4
+    assert TimetableEntry.query.count() == 4
+
+    response, _ = generate(department_id=1, engine="simplex")
+    assert response.status_code == 400
@@ -0,0 +1,59 @@
+import io
+
+from app import db
+from app.models import Course, Room, Teacher, Workload, teacher_departments
+
+
+def test_bulk_rooms_report_row_errors_and_insert_the_rest(client, sample_data):
+    response = client.post('/api/resources/rooms/bulk', json=[
+        {"name": "201", "capacity": 60},
+        {"name": "101", "capacity": 30},            # exists
+        {"name": "201", "capacity": 40},            # repeats row 0
+        {"name": "Lab 1", "capacity": "x"},
+        {"name": "Lab 2", "capacity": 25, "room_type": "Lab"},
+    ])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["inserted"] == 2 and body["error_count"] == 3
+    assert [e["row"] for e in body["errors"]] == [1, 2, 3]
+    assert "already exists" in body["errors"][0]["errors"][0]
+    assert db.session.scalar(db.select(db.func.count(Room.id))) == 3
+    # Core inserts bypass flush events; the cached listing must still be rebuilt
+    assert len(client.get('/api/resources/rooms').get_json()) == 3
+
+
+def test_bulk_teachers_from_csv_link_departments(client, sample_data):
+    csv_text = "name,email,department_ids\nAda,ada@x.edu,1\nBob,bob@x.edu,1;99\nCy,cy@x.edu,\n"
+    response = client.post('/api/resources/teachers/bulk',
+                           data={"file": (io.BytesIO(csv_text.encode()), "teachers.csv")},
+                           content_type='multipart/form-data')
+    body = response.get_json()
+    assert body["inserted"] == 2
+    assert body["errors"] == [{"row": 1, "errors": ["department_ids not found: [99]"]}]
+    ada = db.session.scalar(db.select(Teacher).where(Teacher.email == "ada@x.edu"))
+    assert [d.code for d in ada.departments] == ["IT"]
+    assert db.session.scalar(db.select(db.func.count()).select_from(teacher_departments)) == 1
+
+
+def test_bulk_workloads_check_qualifications_set_wise(client, sample_data):
+    client.post('/api/resources/courses/bulk', data="name,code,credits,department_id\nC,IT2,3,1\n",
+                content_type='text/csv')
+    course = db.session.scalar(db.select(Course).where(Course.code == "IT2"))
+    response = client.post('/api/scheduling/workloads/bulk', json={"rows": [
+        {"teacher_id": 1, "course_id": 1, "section_id": 1, "hours_per_week": 3},
+        {"teacher_id": 1, "course_id": course.id, "section_id": 1},
+    ]})
+    assert response.get_json()["errors"][0]["row"] == 1
+
+    client.post('/api/resources/qualifications/bulk', json=[{"teacher_id": 1, "course_id": course.id}])
+    response = client.post('/api/scheduling/workloads/bulk', json=[
+        {"teacher_id": 1, "course_id": course.id, "section_id": 1},
+    ])
+    assert response.status_code == 201
+    assert db.session.scalar(db.select(db.func.count(Workload.id))) == 2
+
+
+def test_bulk_rejects_unreadable_upload(client, sample_data):
+    response = client.post('/api/resources/rooms/bulk', json={"name": "x"})
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
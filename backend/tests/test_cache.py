@@ -0,0 +1,67 @@
+from app import create_app, db
+from app.cache import ReferenceCache, reference_cache
+from app.database import readonly_engine
+from app.models import Room, Workload
+from app.scheduler import build_problem
+
+
+def test_lru_is_bounded_and_keyed_by_table_version():
+    cache = ReferenceCache(maxsize=2)
+    loads = []
+    load = lambda: loads.append(1) or len(loads)
+
+    assert cache.get('rooms', ('room',), load) == 1
+    assert cache.get('rooms', ('room',), load) == 1
+    cache.invalidate('room')
+    assert cache.get('rooms', ('room',), load) == 2
+    cache.get('a', (), load)
+    cache.get('b', (), load)
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_snapshot_reads_reference_data_from_cache(client, sample_data, query_counter):
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.commit()
+    build_problem(1)
+    with query_counter as counter:
+        build_problem(1)
+    warm = counter.count
+
+    # A new room is flushed through the ORM: the rooms entry must be rebuilt
+    db.session.add(Room(name="102", capacity=40, room_type="Classroom"))
+    db.session.commit()
+    with query_counter as counter:
+        problem = build_problem(1)
+    assert [r.name for r in problem.rooms] == ["101", "102"]
+    assert counter.count == warm + 1
+
+
+def test_room_listing_is_cached_until_a_write(client, sample_data, query_counter):
+    client.get('/api/resources/rooms')
+    with query_counter as counter:
+        assert len(client.get('/api/resources/rooms').get_json()) == 1
+    assert counter.count == 1  # the stored version of `room`, nothing else
+
+    client.post('/api/resources/rooms', json={"name": "102", "capacity": 40})
+    assert len(client.get('/api/resources/rooms').get_json()) == 2
+    stats = client.get('/api/resources/cache').get_json()
+    assert stats['hits'] >= 1 and stats['misses'] >= 2
+
+
+def test_writes_by_another_process_invalidate_the_cache(app, client, sample_data, database_path):
+    """A second app on the same database stands in for another worker process."""
+    assert len(client.get('/api/resources/rooms').get_json()) == 1
+    local = reference_cache().stats()['versions']['room']
+
+    other = create_app('testing', {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{database_path}"})
+    with other.app_context():
+        db.session.add(Room(name="102", capacity=40, room_type="Classroom"))
+        db.session.commit()
+        db.session.remove()
+        for engine in (db.engine, readonly_engine()):
+            engine.dispose()
+
+    assert [r['name'] for r in client.get('/api/resources/rooms').get_json()] == ["101", "102"]
+    # Seen through the stored version alone: this process wrote nothing
+    assert reference_cache().stats()['versions']['room'] == local
@@ -0,0 +1,80 @@
+from dataclasses import replace
+
+from app import db
+from app.models import Department, GenerationJob, Program, Batch, Section, Workload, TimetableEntry
+from app.scheduler import OccupancyIndex
+from app.scheduler.campus import partition_ledger, solve_campus
+from tests.helpers import synthetic_problem
+
+
+def _two_departments():
+    first = synthetic_problem(workloads=150, teachers=20, rooms=12, seed=1)
+    second = synthetic_problem(workloads=150, teachers=20, rooms=12, seed=2)
+    # Same campus rooms and teacher pool, disjoint sections and workloads
+    second = replace(second, department_id=2, rooms=first.rooms, teachers=first.teachers, sections=tuple(
+        replace(s, id=s.id + 1000, workloads=tuple(
+            replace(w, id=w.id + 1000, section_id=s.id + 1000) for w in s.workloads))
+        for s in second.sections
+    ))
+    return [first, second]
+
+
+def test_partition_ledger_is_disjoint():
+    problems = _two_departments()
+    occupancy = OccupancyIndex(*problems[0].grid.shape)
+    views = partition_ledger(problems, occupancy)
+    for room in problems[0].rooms:
+        free = [occupancy.full_mask & ~view.rooms.get(room.id, 0) for view in views.values()]
+        assert free[0] & free[1] == 0
+        assert free[0] | free[1] == occupancy.full_mask
+
+
+def test_solve_campus_never_double_books():
+    problems = _two_departments()
+    results = []
+    for processes in (1, 2):
+        occupancy = OccupancyIndex(*problems[0].grid.shape)
+        results.append(solve_campus(problems, occupancy, processes=processes))
+    assert results[0] == results[1]
+
+    placements = [p for placed in results[1].values() for p in placed]
+    for key in ('room_id', 'teacher_id', 'section_id'):
+        cells = [(p.day_index, p.slot_index, getattr(p, key)) for p in placements]
+        assert len(cells) == len(set(cells))
+
+
+def test_generate_all_departments(client, sample_data, generate):
+    cs = Department(name="CS", code="CS")
+    db.session.add(cs)
+    db.session.commit()
+    program = Program(name="BSc", code="BSC", department_id=cs.id)
+    db.session.add(program)
+    db.session.commit()
+    batch = Batch(name="B23", academic_year="2023", program_id=program.id)
+    db.session.add(batch)
+    db.session.commit()
+    section = Section(name="A", batch_id=batch.id, student_count=30)
+    db.session.add(section)
+    db.session.commit()
+    # Both departments compete for the single room and teacher
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=section.id, hours_per_week=3))
+    db.session.commit()
+
+    response, job = generate(department_ids="all")
+    assert response.status_code == 202
+    assert job['state'] == 'succeeded'
+    assert job['result']['entries'] == 6
+    assert set(job['result']['departments']) == {"1", str(cs.id)}
+    assert TimetableEntry.query.filter_by(department_id=cs.id).count() == 3
+
+    assert generate(department_ids=[1, 99])[0].status_code == 404
+    for bad in ([{}], [1, True], ["1"], {"id": 1}):
+        assert generate(department_ids=bad)[0].status_code == 400, bad
+
+    # A repeated department is generated once
+    response, job = generate(department_ids=[cs.id, cs.id])
+    assert job['state'] == 'succeeded'
+    assert list(job['result']['departments']) == [str(cs.id)]
+    assert db.session.get(GenerationJob, job['id']).params['department_ids'] == [cs.id]
+    assert TimetableEntry.query.filter_by(department_id=cs.id).count() == 3
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import event, exc
+
+from app import db
+from app.database import engine_options, readonly_engine, readonly_url
+
+
+def test_sqlite_connections_get_configured_pragmas(app, database_path):
+    assert db.engine.url.database == str(database_path)
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == app.config['SQLITE_PRAGMAS']['busy_timeout']
+    # WAL is persistent: the file itself says so to any other connection
+    with sqlite3.connect(database_path) as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+
+
+def test_server_database_gets_pool_settings(app):
+    options = engine_options(app.config, 'postgresql://scheduler@db/timetable')
+    assert options['pool_size'] == app.config['DATABASE_POOL_SIZE']
+    assert options['max_overflow'] == app.config['DATABASE_MAX_OVERFLOW']
+    assert options['pool_recycle'] == app.config['DATABASE_POOL_RECYCLE']
+    assert options['pool_pre_ping'] is True
+    assert engine_options(app.config, 'sqlite:///:memory:') == {}
+    # Reads stay on a server primary unless a replica is configured
+    assert readonly_url('postgresql://scheduler@db/timetable', {}) is None
+    replica = readonly_url('postgresql://scheduler@db/timetable',
+                           {'READONLY_DATABASE_URI': 'postgresql://reader@replica/timetable'})
+    assert replica.host == 'replica'
+
+
+def test_readonly_engine_rejects_writes(app, database_path):
+    url = readonly_engine().url
+    assert (url.database, url.query['mode']) == (f'file:{database_path}', 'ro')
+    with readonly_engine().connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA query_only').scalar() == 1
+        with pytest.raises(exc.OperationalError):
+            conn.exec_driver_sql('CREATE TABLE scratch (id INTEGER)')
+
+
+def test_read_only_views_query_the_readonly_engine(client, sample_data):
+    client.get('/api/resources/departments')  # first request also resumes jobs on the primary
+    primary, reader = [], []
+
+    def on_primary(conn, cursor, statement, *args):
+        primary.append(statement)
+
+    def on_reader(conn, cursor, statement, *args):
+        reader.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_primary)
+    event.listen(readonly_engine(), 'before_cursor_execute', on_reader)
+    try:
+        response = client.get('/api/resources/sections')
+        assert response.status_code == 200
+        assert [s['name'] for s in response.get_json()] == ['A']
+        assert reader and not primary
+
+        reader.clear()
+        assert client.post('/api/resources/departments', json={'name': 'Maths', 'code': 'MA'}).status_code == 201
+        assert primary and not reader
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_primary)
+        event.remove(readonly_engine(), 'before_cursor_execute', on_reader)
@@ -0,0 +1,38 @@
+from types import MappingProxyType
+
+from app.scheduler import OccupancyIndex
+from app.scheduler.domains import build_domains
+from app.scheduler.grid import DEFAULT_GRID
+from app.scheduler.problem import (
+    SchedulingProblem, TeacherSpec, CourseSpec, RoomSpec, WorkloadSpec, SectionSpec,
+)
+
+
+def _problem(workloads, teachers):
+    courses = {1: CourseSpec(1, "Theory", 'Theory'), 2: CourseSpec(2, "Lab", 'Lab')}
+    rooms = (RoomSpec(1, "101", 40, 'Classroom'), RoomSpec(2, "L1", 40, 'Lab'))
+    return SchedulingProblem(1, DEFAULT_GRID, (SectionSpec(1, "A", 30, tuple(workloads)),),
+                             MappingProxyType(teachers), MappingProxyType(courses), rooms)
+
+
+def test_forced_workload_prunes_its_section():
+    teachers = {1: TeacherSpec(1, "Anytime"), 2: TeacherSpec(2, "Monday", 0b11)}
+    problem = _problem([WorkloadSpec(1, 1, 1, 1, 3), WorkloadSpec(2, 1, 1, 2, 2)], teachers)
+    occupancy = OccupancyIndex(*problem.grid.shape)
+
+    domains = build_domains(problem, occupancy)
+    assert domains.masks[2] == 0b11
+    assert domains.masks[1] == occupancy.full_mask & ~0b11
+    assert domains.warnings == []
+
+
+def test_scarce_lab_cells_are_flagged():
+    teachers = {1: TeacherSpec(1, "Anytime")}
+    problem = _problem([WorkloadSpec(1, 1, 2, 1, 4)], teachers)
+    occupancy = OccupancyIndex(*problem.grid.shape)
+    # Another department holds the lab room in all but three cells
+    occupancy.rooms[2] = occupancy.full_mask & ~0b111
+
+    domains = build_domains(problem, occupancy)
+    assert domains.masks[1] == 0b111
+    assert domains.warnings == ["Lab in A needs 4 hours but only 3 cells are feasible"]
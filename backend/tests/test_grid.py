@@ -0,0 +1,84 @@
+from app import db
+from app.models import Department, Workload
+from app.scheduler.grid import DEFAULT_DAYS, DEFAULT_GRID, DEFAULT_TIMESLOTS, load_grid
+
+# The default grid with a lunch break listed among its periods
+LUNCH_PERIODS = [*DEFAULT_TIMESLOTS[:3], "12:00-01:00", *DEFAULT_TIMESLOTS[3:]]
+
+
+def test_grid_positions_accept_labels_and_indices():
+    availability = {"Monday": ["09:00-10:00", 4], "2": [1], "Sunday": ["09:00-10:00"]}
+    assert DEFAULT_GRID.positions(availability) == {(0, 0), (0, 4), (2, 1)}
+    assert DEFAULT_GRID.label(4, 3) == ("Friday", "01:00-02:00")
+
+
+def test_department_time_grid_drives_generation(client, sample_data, generate):
+    response = client.post('/api/resources/time-grids', json={
+        "name": "Lunch", "days": list(DEFAULT_DAYS), "periods": LUNCH_PERIODS, "breaks": ["12:00-01:00"]
+    })
+    assert response.status_code == 201
+    db.session.get(Department, 1).time_grid_id = response.get_json()['id']
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=4))
+    db.session.commit()
+
+    grid = load_grid(1)
+    assert (grid.name, grid.shape, grid.breaks) == ("Lunch", (5, 5), ("12:00-01:00",))
+    assert generate(department_id=1)[1]['result']['entries'] == 4
+    rows = client.get('/api/scheduling/view/1').get_json()
+    assert len(rows) == 4 and all(r['timeslot'] != "12:00-01:00" for r in rows)
+
+
+def test_department_grids_must_match_the_default_grid(client, sample_data):
+    """Departments share teachers and rooms by cell index, so every grid needs the same cells."""
+    evening = client.post('/api/resources/time-grids', json={
+        "name": "Evening", "days": ["Sat", "Sun"], "periods": ["17:00-18:00", "18:30-19:30"]
+    }).get_json()['id']
+    lunch = client.post('/api/resources/time-grids', json={
+        "name": "Lunch", "days": list(DEFAULT_DAYS), "periods": LUNCH_PERIODS, "breaks": ["12:00-01:00"]
+    }).get_json()['id']
+
+    response = client.post('/api/resources/departments', json={"name": "Night", "code": "NT", "time_grid_id": evening})
+    assert response.status_code == 400
+    assert "days" in response.get_json()['error']
+    assert client.post('/api/resources/departments',
+                       json={"name": "Night", "code": "NT", "time_grid_id": 99}).status_code == 404
+    assert client.post('/api/resources/departments',
+                       json={"name": "Arts", "code": "AR", "time_grid_id": lunch}).status_code == 201
+
+    # A new default grid may not strand the departments on their variants
+    response = client.post('/api/resources/time-grids', json={
+        "name": "Six day", "days": [*DEFAULT_DAYS, "Saturday"], "periods": list(DEFAULT_TIMESLOTS), "is_default": True
+    })
+    assert response.status_code == 400
+    assert load_grid(None) == DEFAULT_GRID
+    assert client.post('/api/resources/time-grids', json={
+        "name": "Main", "days": list(DEFAULT_DAYS), "periods": list(DEFAULT_TIMESLOTS), "is_default": True
+    }).status_code == 201
+
+
+def test_default_grid_keeps_the_cells_stored_data_refers_to(client, sample_data, generate):
+    fewer = {"name": "Short", "days": list(DEFAULT_DAYS), "periods": list(DEFAULT_TIMESLOTS[:3]), "is_default": True}
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=4))
+    db.session.commit()
+    assert generate(department_id=1)[1]['result']['entries'] == 4
+
+    response = client.post('/api/resources/time-grids', json=fewer)
+    assert response.status_code == 400
+    assert "teachable periods" in response.get_json()['error']
+    assert client.get('/api/scheduling/view/1').status_code == 200
+    assert client.get('/api/scheduling/teachers/1/timetable').status_code == 200
+
+    # Same cells, new break layout: accepted
+    assert client.post('/api/resources/time-grids', json={
+        "name": "Lunch", "days": list(DEFAULT_DAYS), "periods": LUNCH_PERIODS, "breaks": ["12:00-01:00"],
+        "is_default": True}).status_code == 201
+
+
+def test_time_grid_labels_are_validated(client):
+    grid = {"name": "Bad", "days": ["Mon"], "periods": ["a", "b"]}
+    for bad in ({"breaks": [[1]]}, {"breaks": None}, {"days": ["Mon", 2]}, {"days": ["Mon", "Mon"]},
+                {"periods": ["a", ""]}, {"periods": "ab"}):
+        response = client.post('/api/resources/time-grids', json={**grid, **bad})
+        assert response.status_code == 400, bad
+    assert client.post('/api/resources/time-grids', json=["Mon"]).status_code == 400
+    assert client.post('/api/resources/time-grids', json={**grid, "breaks": ["b"]}).status_code == 201
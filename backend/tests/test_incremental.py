@@ -0,0 +1,59 @@
+from app import db
+from app.models import Section, Teacher, Course, TimetableEntry, Workload
+
+
+def _entries(**filters):
+    return {(e.id, e.day_index, e.slot_index, e.room_id) for e in TimetableEntry.query.filter_by(**filters)}
+
+
+def _second_section():
+    section = Section(name="B", batch_id=1, student_count=30)
+    teacher = Teacher(name="Second Teacher", email="second@test.com")
+    teacher.qualified_courses.append(db.session.get(Course, 1))
+    db.session.add_all([section, teacher])
+    db.session.commit()
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.add(Workload(teacher_id=teacher.id, course_id=1, section_id=section.id, hours_per_week=3))
+    db.session.commit()
+    return section, teacher
+
+
+def test_reschedule_new_workload_keeps_other_entries(client, sample_data, generate):
+    section_b, teacher_b = _second_section()
+    generate(department_id=1)
+    before_a, before_b = _entries(section_id=1), _entries(section_id=section_b.id)
+
+    workload = Workload(teacher_id=teacher_b.id, course_id=1, section_id=1, hours_per_week=2)
+    db.session.add(workload)
+    db.session.commit()
+
+    response = client.post('/api/scheduling/reschedule', json={"department_id": 1, "workload_ids": [workload.id]})
+    data = response.get_json()
+    assert response.status_code == 200
+    assert (data['removed'], data['added']) == (0, 2)
+    assert before_a < _entries(section_id=1)
+    assert _entries(section_id=section_b.id) == before_b
+
+
+def test_reschedule_teacher_availability_change(client, sample_data, generate):
+    section_b, teacher_b = _second_section()
+    generate(department_id=1)
+    untouched = _entries(teacher_id=1)
+
+    response = client.put(f'/api/resources/teachers/{teacher_b.id}/availability',
+                          json={"availability": {"Friday": ["09:00-10:00", "10:00-11:00", "11:00-12:00"]}})
+    assert response.status_code == 200
+
+    data = client.post('/api/scheduling/reschedule',
+                       json={"department_id": 1, "teacher_ids": [teacher_b.id]}).get_json()
+    assert (data['removed'], data['added']) == (3, 3)
+    assert {e.day_index for e in TimetableEntry.query.filter_by(teacher_id=teacher_b.id)} == {4}
+    assert _entries(teacher_id=1) == untouched
+
+
+def test_reschedule_validation(client, sample_data):
+    assert client.post('/api/scheduling/reschedule', json={"department_id": 1}).status_code == 400
+    assert client.post('/api/scheduling/reschedule',
+                       json={"department_id": 1, "section_ids": "1"}).status_code == 400
+    assert client.post('/api/scheduling/reschedule',
+                       json={"department_id": 99, "section_ids": [1]}).status_code == 404
@@ -0,0 +1,61 @@
+import json
+
+from app import db
+from app.models import Room, Workload
+
+
+def test_rooms_keyset_pagination(client, sample_data):
+    db.session.add_all([Room(name=f"R{i}", capacity=30) for i in range(5)])
+    db.session.commit()
+
+    first = client.get('/api/resources/rooms?limit=4')
+    assert [r['name'] for r in first.get_json()] == ["101", "R0", "R1", "R2"]
+    after = first.headers['X-Next-After']
+    second = client.get(f'/api/resources/rooms?limit=4&after={after}')
+    assert [r['name'] for r in second.get_json()] == ["R3", "R4"]
+    assert 'X-Next-After' not in second.headers
+
+    assert client.get('/api/resources/rooms?limit=zero').status_code == 400
+
+
+def test_ndjson_streams_rows(client, sample_data, generate):
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.commit()
+    generate(department_id=1)
+
+    response = client.get('/api/scheduling/view/1', headers={'Accept': 'application/x-ndjson'})
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert rows == client.get('/api/scheduling/view/1').get_json()
+
+    page = client.get(f"/api/scheduling/view/1?after={rows[0]['id']}&limit=1").get_json()
+    assert page == rows[1:2]
+
+    teachers = client.get('/api/resources/teachers', headers={'Accept': 'application/x-ndjson'})
+    assert json.loads(teachers.get_data(as_text=True))['qualifications'] == ["Python"]
+
+
+def test_teacher_listing_query_count_is_constant(client, sample_data, query_counter):
+    from app.models import Course, Department, Teacher
+    dept = db.session.get(Department, 1)
+    course = db.session.get(Course, 1)
+
+    def add_teachers(start, count):
+        for i in range(start, start + count):
+            teacher = Teacher(name=f"T{i}", email=f"t{i}@test.com")
+            teacher.departments.append(dept)
+            teacher.qualified_courses.append(course)
+            db.session.add(teacher)
+        db.session.commit()
+
+    client.get('/api/resources/rooms')  # first request also resumes pending jobs
+    counts = []
+    for start, count in ((0, 3), (3, 40)):
+        add_teachers(start, count)
+        db.session.expire_all()
+        with query_counter as counter:
+            rows = client.get('/api/resources/teachers?department_id=1').get_json()
+        assert all(r['departments'] == ["IT"] and r['qualifications'] == ["Python"] for r in rows)
+        counts.append(counter.count)
+    assert len(rows) == 43
+    assert counts[0] == counts[1]
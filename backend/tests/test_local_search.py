@@ -0,0 +1,46 @@
+from app.scheduler import OccupancyIndex, solve_greedy
+from app.scheduler.local_search import day_gaps, objective, optimize
+from tests.helpers import synthetic_problem
+
+
+def test_day_gaps():
+    assert day_gaps(0) == 0
+    assert day_gaps(0b00110) == 0
+    assert day_gaps(0b10011) == 2
+
+
+def test_optimize_improves_without_breaking_constraints():
+    problem = synthetic_problem(workloads=300, teachers=40, rooms=60, seed=3)
+    occupancy = OccupancyIndex(*problem.grid.shape)
+    placements = solve_greedy(problem, occupancy).placements
+
+    result = optimize(problem, occupancy, placements, time_limit=0.5)
+    assert result.after > result.before
+    assert result.evaluated > result.accepted > 0
+
+    # Incremental deltas add up to the objective recomputed from scratch
+    rebuilt = OccupancyIndex(*problem.grid.shape)
+    for p in result.placements:
+        rebuilt.book(p.day_index, p.slot_index, p.teacher_id, p.room_id, p.section_id)
+    assert objective(problem, result.placements, rebuilt) == result.after
+    assert rebuilt.sections == {k: v for k, v in occupancy.sections.items() if v}
+
+    for key in ('room_id', 'teacher_id', 'section_id'):
+        cells = [(p.day_index, p.slot_index, getattr(p, key)) for p in result.placements]
+        assert len(cells) == len(set(cells))
+    for p in result.placements:
+        availability = problem.teachers[p.teacher_id].availability
+        assert availability is None or availability >> rebuilt.cell(p.day_index, p.slot_index) & 1
+
+
+def test_generate_reports_objective(client, sample_data, generate):
+    client.post('/api/scheduling/workloads', json={
+        "teacher_id": 1, "course_id": 1, "section_id": 1, "hours_per_week": 4
+    })
+    response, job = generate(department_id=1, optimize_seconds=0.05)
+    assert job['state'] == 'succeeded'
+    objective = job['result']['objective']
+    assert objective['after'] >= objective['before']
+
+    response, _ = generate(department_id=1, optimize_seconds="fast")
+    assert response.status_code == 400
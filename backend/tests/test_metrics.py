@@ -0,0 +1,57 @@
+from flask import Flask
+
+from app import metrics
+from app.metrics import Metrics, normalize_sql
+
+
+def _samples(client):
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in response.get_data(as_text=True).splitlines() if not line.startswith('#')}
+
+
+def test_requests_are_attributed_to_their_endpoint(client, sample_data):
+    client.get('/api/resources/rooms')  # the first request also resumes queued jobs
+    client.get('/api/resources/teachers?limit=10')
+    client.get('/api/resources/teachers?limit=10')
+    client.get('/api/resources/nothing-here')
+    samples = _samples(client)
+
+    labels = '{endpoint="/api/resources/teachers",method="GET"}'
+    assert samples['http_requests_total{endpoint="/api/resources/teachers",method="GET",status="200"}'] == 2
+    assert samples[f'http_request_duration_seconds_count{labels}'] == 2
+    assert samples['http_request_duration_seconds_bucket'
+                   '{endpoint="/api/resources/teachers",method="GET",le="+Inf"}'] == 2
+    # A page of teachers: the rows plus one IN query per eager-loaded relationship
+    assert samples[f'http_request_db_queries_total{labels}'] == 6
+    assert samples['http_requests_total{endpoint="unmatched",method="GET",status="404"}'] == 1
+    assert samples['db_queries_total'] >= 6
+
+
+def test_slow_statements_are_grouped_by_normalized_sql():
+    collector = Metrics(slow_seconds=0.5, max_slow=2)
+    collector.record_statement("SELECT room.id FROM room WHERE room.id IN (?, ?, ?)", 0.6)
+    collector.record_statement("SELECT room.id FROM room\n WHERE room.id IN (?, ?)", 0.9)
+    collector.record_statement("SELECT 1", 0.1)
+    collector.record_statement("SELECT course.id FROM course", 0.7)
+    collector.record_statement("SELECT teacher.id FROM teacher", 0.8)
+
+    assert collector.queries == 5
+    assert set(collector.slow) == {"SELECT room.id FROM room WHERE room.id IN (...)",
+                                   "SELECT teacher.id FROM teacher"}
+    assert collector.slow["SELECT room.id FROM room WHERE room.id IN (...)"][:1] == [2]
+    text = collector.render()
+    assert 'db_slow_statement_seconds_max{statement="SELECT room.id FROM room WHERE room.id IN (...)"} 0.9' in text
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?) RETURNING id") == \
+        "INSERT INTO t (a, b) VALUES (...) RETURNING id"
+
+
+def test_disabled_metrics_install_nothing():
+    app = Flask(__name__)
+    app.config['METRICS_ENABLED'] = False
+    metrics.init_app(app)
+    assert 'metrics' not in app.extensions
+    assert not app.before_request_funcs
+    assert 'metrics' not in app.view_functions
@@ -0,0 +1,45 @@
+from app import db
+from app.models import Department, TimetableEntry, Workload
+from app.scheduler import OccupancyIndex
+
+
+def test_occupancy_book_and_release():
+    index = OccupancyIndex(2, 2)
+    index.book(1, 1, teacher_id=1, room_id=2, section_id=3)
+
+    assert index.conflict(1, 1, teacher_id=1) == "Teacher occupied"
+    assert index.conflict(1, 1, room_id=2) == "Room occupied"
+    assert index.conflict(1, 1, section_id=3) == "Section occupied"
+    assert index.conflict(0, 1, teacher_id=1, room_id=2, section_id=3) is None
+
+    index.release(1, 1, teacher_id=1, room_id=2, section_id=3)
+    assert index.conflict(1, 1, teacher_id=1, room_id=2, section_id=3) is None
+
+
+def test_occupancy_load_includes_other_departments(app, sample_data):
+    other = Department(name="CS", code="CS")
+    db.session.add(other)
+    db.session.commit()
+    db.session.add(TimetableEntry(day_index=0, slot_index=0, section_id=1,
+                                  course_id=1, teacher_id=1, room_id=1, department_id=other.id))
+    db.session.commit()
+
+    index = OccupancyIndex.load(2, 2)
+    assert index.conflict(0, 0, room_id=1) == "Room occupied"
+    assert index.conflict(0, 1, room_id=1) is None
+
+
+def test_generate_skips_cells_booked_by_other_departments(sample_data, generate):
+    other = Department(name="CS", code="CS")
+    db.session.add(other)
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=2))
+    db.session.commit()
+    # Another department holds the room, teacher and section for all of Monday
+    for slot in range(5):
+        db.session.add(TimetableEntry(day_index=0, slot_index=slot, section_id=1, course_id=1,
+                                      teacher_id=1, room_id=1, department_id=other.id))
+    db.session.commit()
+
+    assert generate(department_id=1)[1]['result']['entries'] == 2
+    placed = TimetableEntry.query.filter_by(department_id=1).all()
+    assert all(e.day_index != 0 for e in placed)
@@ -0,0 +1,36 @@
+from app import db
+from app.models import Course, Room, Workload
+
+
+def test_preflight_reports_capacity_issues(client, sample_data):
+    lab = Course(name="Networks Lab", code="IT2", credits=2, department_id=1, course_type="Lab")
+    db.session.add(lab)
+    db.session.commit()
+    # 30 hours for a teacher on a 25-cell grid, and no lab room at all
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=20))
+    db.session.add(Workload(teacher_id=1, course_id=lab.id, section_id=1, hours_per_week=10))
+    db.session.commit()
+
+    response = client.post('/api/scheduling/preflight', json={"department_id": 1})
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['feasible'] is False
+    checks = {issue['check']: issue for issue in report['issues']}
+    assert checks['teacher_hours']['required'] == 30
+    assert checks['teacher_hours']['available'] == 25
+    assert checks['section_hours']['required'] == 30
+    assert checks['lab_capacity'] == {"check": "lab_capacity", "required": 10, "available": 0}
+    assert checks['room_capacity']['course_type'] == 'Lab'
+
+
+def test_preflight_passes_feasible_department(client, sample_data):
+    db.session.add(Room(name="L1", capacity=40, room_type="Lab"))
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=4))
+    db.session.commit()
+
+    report = client.post('/api/scheduling/preflight', json={"department_id": 1}).get_json()
+    assert report['feasible'] is True
+    assert report['summary']['hours'] == 4
+    assert report['summary']['lab_room_slots'] == 25
+
+    assert client.post('/api/scheduling/preflight', json={"department_id": 99}).status_code == 404
@@ -0,0 +1,55 @@
+from app import db
+from app.models import Batch, Section, Teacher, Course, Workload
+from app.cache import reference_cache
+from app.scheduler import build_problem
+from app.scheduler.availability import set_availability
+
+
+def _add_sections(batch_id, course, count):
+    for i in range(count):
+        section = Section(name=f"S{i}", batch_id=batch_id, student_count=30)
+        teacher = Teacher(name=f"T{i}", email=f"t{i}-{batch_id}@test.com")
+        set_availability(teacher, {"Monday": ["09:00-10:00"]})
+        teacher.qualified_courses.append(course)
+        db.session.add_all([section, teacher])
+        db.session.flush()
+        db.session.add(Workload(section_id=section.id, course_id=course.id,
+                                teacher_id=teacher.id, hours_per_week=2))
+    db.session.commit()
+
+
+def test_build_problem_snapshot(app, sample_data):
+    db.session.add(Workload(section_id=1, course_id=1, teacher_id=1, hours_per_week=3))
+    db.session.commit()
+
+    problem = build_problem(1)
+    assert [s.name for s in problem.sections] == ["A"]
+    assert problem.workloads[0].hours_per_week == 3
+    assert problem.teachers[1].availability is None
+    assert problem.teachers[1].qualified_course_ids == {1}
+    assert problem.courses[1].course_type == "Theory"
+    assert [r.name for r in problem.rooms] == ["101"]
+    assert build_problem(999) is None
+
+
+def test_build_problem_query_count_is_constant(app, sample_data, query_counter):
+    course = db.session.get(Course, 1)
+    _add_sections(1, course, 2)
+    # Compare cold snapshots: the reference cache would otherwise skip unchanged tables
+    reference_cache().clear()
+    with query_counter:
+        small = build_problem(1)
+    small_count = query_counter.count
+
+    batch = Batch(name="B24", academic_year="2024", program_id=1)
+    db.session.add(batch)
+    db.session.commit()
+    _add_sections(batch.id, course, 20)
+    db.session.expire_all()
+    reference_cache().clear()
+    with query_counter:
+        large = build_problem(1)
+
+    assert len(large.sections) == len(small.sections) + 20
+    assert large.teachers[large.workloads[-1].teacher_id].availability == 0b1
+    assert query_counter.count == small_count
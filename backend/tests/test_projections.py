@@ -0,0 +1,65 @@
+from sqlalchemy import event
+
+from app import db
+from app.models import Room, TimetableProjection, Workload
+
+
+def _entry_reads(app):
+    """Statements touching timetable_entries while the returned list is live."""
+    seen = []
+
+    def record(conn, cursor, statement, *args):
+        if 'timetable_entries' in statement:
+            seen.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return seen
+
+
+def _week(client, kind, owner_id):
+    response = client.get(f'/api/scheduling/{kind}/{owner_id}/timetable')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_generation_materializes_owner_timetables(app, client, sample_data, generate):
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.commit()
+    generate(department_id=1)
+    assert db.session.scalar(db.select(db.func.count()).select_from(TimetableProjection)) == 3
+
+    reads = _entry_reads(app)
+    teacher = _week(client, 'teachers', 1)
+    room = _week(client, 'rooms', 1)
+    section = _week(client, 'sections', 1)
+    assert reads == []
+    assert teacher["entries"] == room["entries"] == section["entries"] == 3
+    cells = [cell for day in teacher["week"].values() for cell in day]
+    assert {cell["course"] for cell in cells} == {"Python"}
+    assert all(cell["department_id"] == 1 for cell in cells)
+
+
+def test_reschedule_and_room_deletion_refresh_projections(client, sample_data, generate):
+    db.session.add(Room(name="102", capacity=40, room_type="Classroom"))
+    workload = Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=2)
+    db.session.add(workload)
+    db.session.commit()
+    generate(department_id=1)
+    assert _week(client, 'teachers', 1)["entries"] == 2
+
+    workload.hours_per_week = 4
+    db.session.commit()
+    client.post('/api/scheduling/reschedule', json={"department_id": 1, "workload_ids": [workload.id]})
+    assert _week(client, 'teachers', 1)["entries"] == 4
+
+    used = {cell["room"] for day in _week(client, 'teachers', 1)["week"].values() for cell in day}
+    room_id = db.session.scalar(db.select(Room.id).where(Room.name == sorted(used)[0]))
+    before = _week(client, 'rooms', room_id)["entries"]
+    client.delete(f'/api/resources/rooms/{room_id}')
+    assert _week(client, 'teachers', 1)["entries"] == 4 - before
+    assert client.get(f'/api/scheduling/rooms/{room_id}/timetable').status_code == 404
+
+
+def test_missing_projection_is_built_on_first_read(client, sample_data):
+    assert _week(client, 'sections', 1) == {"kind": "section", "id": 1, "entries": 0, "week": {}}
+    assert db.session.get(TimetableProjection, ('section', 1)) is not None
+    assert client.get('/api/scheduling/teachers/99/timetable').status_code == 404
@@ -0,0 +1,31 @@
+from app.scheduler import OccupancyIndex, RoomIndex, room_score
+from app.scheduler.problem import RoomSpec
+
+ROOMS = [
+    RoomSpec(1, "Hall", 100, "Classroom"),
+    RoomSpec(2, "101", 30, "Classroom"),
+    RoomSpec(3, "102", 30, "Classroom"),
+    RoomSpec(4, "Lab 1", 35, "Lab"),
+]
+
+
+def test_room_score_bands():
+    assert room_score(ROOMS[1], 'Theory', 30) == 20
+    assert room_score(ROOMS[3], 'Theory', 30) == 10
+    assert room_score(ROOMS[0], 'Lab', 30) == 0
+    assert room_score(ROOMS[1], 'Theory', 31) == 0
+
+
+def test_eligible_rooms_sorted_by_score_then_id():
+    index = RoomIndex(ROOMS)
+    assert [(r.id, s) for r, s in index.eligible('Theory', 30)] == [(2, 20), (3, 20), (1, 12), (4, 10)]
+    assert [r.id for r, _ in index.eligible('Lab', 30)] == [4]
+
+
+def test_best_free_walks_past_booked_rooms():
+    index = RoomIndex(ROOMS)
+    occupancy = OccupancyIndex(1, 1)
+    occupancy.book(0, 0, teacher_id=9, room_id=2, section_id=9)
+    room, score = index.best_free('Theory', 30, occupancy, 0)
+    assert (room.id, score) == (3, 20)
+    assert index.best_free('Lab', 40, occupancy, 0) == (None, 0)
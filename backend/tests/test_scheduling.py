@@ -1,5 +1,12 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.exc import IntegrityError
 from app.models import TimetableEntry, Workload
 from app import db
+from app.scheduler.stats import Profile
 
 def test_create_workload_success(client, sample_data):
     """Test successful workload assignment."""
@@ -28,7 +35,7 @@ def test_create_workload_unqualified(client, sample_data):
     assert response.status_code == 400
     assert "not qualified" in response.get_json()['error']
 
-def test_generate_timetable(client, sample_data):
+def test_generate_timetable(client, sample_data, generate):
     """Test the full generation algorithm."""
     # 1. Setup a valid workload first
     client.post('/api/scheduling/workloads', json={
@@ -39,9 +46,132 @@ def test_generate_timetable(client, sample_data):
     })
     
     # 2. Trigger generation
-    response = client.post('/api/scheduling/generate', json={
-        "department_id": 1
-    })
-    assert response.status_code == 200
-    assert response.get_json()['entries'] == 2
+    response, job = generate(department_id=1)
+    assert response.status_code == 202
+    assert job['state'] == 'succeeded'
+    assert job['result']['entries'] == 2
     assert TimetableEntry.query.count() == 2
+
+def test_timetable_entries_reject_double_booking(app, sample_data):
+    """The database refuses a second entry for the same room and cell."""
+    entry = dict(day_index=0, slot_index=0, section_id=1, course_id=1, department_id=1)
+    db.session.add(TimetableEntry(teacher_id=1, room_id=1, **entry))
+    db.session.commit()
+    db.session.add(TimetableEntry(teacher_id=2, room_id=1, **{**entry, 'section_id': 2}))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+def test_generate_writes_in_chunks(app, sample_data, generate):
+    """Bulk write path honours the configured chunk size and reports its stats."""
+    app.config['TIMETABLE_WRITE_CHUNK_SIZE'] = 2
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=5))
+    db.session.commit()
+
+    result = generate(department_id=1)[1]['result']
+    assert result['entries'] == 5
+    assert result['persistence']['rows'] == 5
+    assert result['persistence']['chunks'] == 3
+    # Memory is only traced when profiling
+    assert result['persistence']['peak_kb'] is None and not tracemalloc.is_tracing()
+
+    # Regenerating replaces the department's entries instead of adding to them
+    generate(department_id=1)
+    assert TimetableEntry.query.count() == 5
+
+def test_generate_reports_phase_stats(app, sample_data, generate, caplog):
+    """Phase timings and solver counters come back under "stats" and in the log."""
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.commit()
+
+    with caplog.at_level('INFO', logger='app.scheduler.stats'):
+        result = generate(department_id=1)[1]['result']
+    stats = result['stats']
+    phases = {'load', 'domains', 'solve', 'room_scoring', 'conflict_checks', 'persistence', 'commit'}
+    assert phases <= set(stats['phases'])
+    assert stats['counters']['placements'] == 3
+    assert stats['counters']['workloads_considered'] == 1
+    assert stats['counters']['candidate_cells'] == 25
+    assert stats['counters']['rooms_scored'] == 25
+    assert 'profile' not in result
+    logged = [r.generation_stats for r in caplog.records if hasattr(r, 'generation_stats')]
+    assert logged[-1]['department_id'] == 1 and logged[-1]['counters'] == stats['counters']
+
+    profiled = generate(department_id=1, profile=True)[1]['result']
+    profile = profiled['profile']
+    assert profile['peak_kb'] > 0 and profiled['persistence']['peak_kb'] > 0
+    top = profile['top_functions']
+    assert top and top[0]['cumulative_seconds'] >= top[-1]['cumulative_seconds']
+    assert not tracemalloc.is_tracing()
+
+def test_profile_shares_the_memory_tracer():
+    """Overlapping profiles keep tracing until the last exits; outside tracing is left running."""
+    outer, inner = Profile(), Profile()
+    outer.__enter__()
+    inner.__enter__()
+    outer.__exit__(None, None, None)
+    assert tracemalloc.is_tracing()
+    inner.__exit__(None, None, None)
+    assert not tracemalloc.is_tracing()
+
+    tracemalloc.start()
+    try:
+        with Profile():
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_generate_validation(client, sample_data):
+    assert client.post('/api/scheduling/generate', json={}).status_code == 400
+    assert client.post('/api/scheduling/generate', json={"department_id": 99}).status_code == 404
+    assert client.post('/api/scheduling/generate', json={"department_id": 1, "profile": "yes"}).status_code == 400
+    assert client.get('/api/scheduling/jobs/99').status_code == 404
+
+def test_queued_jobs_resume_after_restart(app, client, sample_data):
+    """A job persisted as queued/running by a dead process is picked up again."""
+    from app.models import GenerationJob
+    from app.scheduler.jobs import generation_jobs
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=2))
+    db.session.add(GenerationJob(department_id=1, state='queued', params={}))
+    db.session.commit()
+
+    assert generation_jobs.resume_pending() == [1]
+    job = client.get('/api/scheduling/jobs/1').get_json()
+    assert job['state'] == 'succeeded'
+    assert job['progress'] == 1.0
+    assert job['result']['entries'] == 2
+
+def test_only_expired_leases_are_reclaimed(app, sample_data, monkeypatch):
+    """A running job is left alone while another process keeps its lease alive."""
+    from app.models import GenerationJob
+    from app.scheduler.jobs import generation_jobs
+    submitted = []
+    monkeypatch.setattr(generation_jobs, 'submit', submitted.append)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.session.add_all([
+        GenerationJob(department_id=1, state='running', lease_owner='other', lease_expires_at=now + timedelta(minutes=1)),
+        GenerationJob(department_id=1, state='running', lease_owner='dead', lease_expires_at=now - timedelta(seconds=1)),
+        GenerationJob(department_id=1, state='running'),
+    ])
+    db.session.commit()
+
+    assert generation_jobs.resume_pending() == submitted == [2, 3]
+    job = db.session.get(GenerationJob, 1)
+    db.session.refresh(job)
+    assert (job.state, job.lease_owner) == ('running', 'other')
+
+def test_jobs_run_on_worker_threads(app, client, sample_data, caplog):
+    app.config['GENERATION_WORKERS'] = 2
+    client.post('/api/scheduling/workloads', json={
+        "teacher_id": 1, "course_id": 1, "section_id": 1, "hours_per_week": 2})
+    status_url = client.post('/api/scheduling/generate', json={"department_id": 1}).get_json()['status_url']
+
+    deadline = time.monotonic() + 30
+    job = client.get(status_url).get_json()
+    while job['state'] in ('queued', 'running') and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(status_url).get_json()
+    assert job['state'] == 'succeeded', job
+    assert job['result']['entries'] == 2
+    assert "lost its lease" not in caplog.text
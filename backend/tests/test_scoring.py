@@ -0,0 +1,19 @@
+from app.scheduler import OccupancyIndex, solve_greedy
+from app.scheduler.scoring import score_cells_scalar, score_cells_vectorized, section_gap
+from tests.helpers import synthetic_problem
+
+
+def test_section_gap():
+    # Section has Monday slots 0 and 1 booked on a 5-slot day
+    assert section_gap(0b00011, 3, 5) == 2
+    assert section_gap(0b00011, 7, 5) == 0
+
+
+def test_vectorized_scoring_matches_scalar():
+    problem = synthetic_problem(workloads=400, teachers=40, rooms=25, seed=7)
+    results = []
+    for scorer in (score_cells_scalar, score_cells_vectorized):
+        occupancy = OccupancyIndex(*problem.grid.shape)
+        results.append(solve_greedy(problem, occupancy, scorer=scorer))
+    assert results[0].placements
+    assert results[0] == results[1]
@@ -0,0 +1,27 @@
+from app import db
+from app.models import Section, Workload
+from app.scheduler.campus import generate_campus
+from benchmarks.university import populate_university
+
+
+def test_synthetic_university_is_sized_and_solvable(app):
+    instance = populate_university(sections=30, departments=3, availability_density=0.8, lab_ratio=0.3, seed=1)
+    assert instance["departments"] == 3
+    assert db.session.scalar(db.select(db.func.count(Section.id))) == 30
+    hours = db.session.scalar(db.select(db.func.sum(Workload.hours_per_week)))
+    assert hours == instance["required_hours"]
+
+    # Derived teacher and room counts leave slack: nearly every hour fits
+    result = generate_campus(processes=1)
+    assert result["entries"] >= 0.95 * instance["required_hours"]
+
+
+def test_synthetic_university_is_reproducible(app):
+    first = populate_university(sections=20, seed=7)
+    rows = db.session.execute(db.select(Workload.section_id, Workload.course_id, Workload.teacher_id,
+                                        Workload.hours_per_week).order_by(Workload.id)).all()
+    db.drop_all()
+    db.create_all()
+    assert populate_university(sections=20, seed=7) == first
+    assert db.session.execute(db.select(Workload.section_id, Workload.course_id, Workload.teacher_id,
+                                        Workload.hours_per_week).order_by(Workload.id)).all() == rows
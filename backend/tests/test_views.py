@@ -0,0 +1,25 @@
+from app import db
+from app.models import Workload
+
+
+def test_view_is_cached_until_timetable_changes(client, sample_data, generate, query_counter):
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=3))
+    db.session.commit()
+    generate(department_id=1)
+
+    with query_counter as counter:
+        rows = client.get('/api/scheduling/view/1').get_json()
+    assert len(rows) == 3
+    assert rows[0]['section'] == "A" and rows[0]['room'] == "101"
+    # Version lookup, grid lookups and a single joined entries query
+    assert counter.count <= 4
+
+    with query_counter as counter:
+        assert client.get('/api/scheduling/view/1').get_json() == rows
+    assert counter.count == 1
+
+    db.session.add(Workload(teacher_id=1, course_id=1, section_id=1, hours_per_week=1))
+    db.session.commit()
+    generate(department_id=1)
+    assert len(client.get('/api/scheduling/view/1').get_json()) == 4
+    assert client.get('/api/scheduling/view/99').get_json() == []